@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from collections import Counter, defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Iterable, Mapping
 from uuid import UUID
 
@@ -22,6 +22,15 @@ FEATURE_FIELDS = [
     "instrumentalness",
 ]
 
+# Windowed scopes only read recent listens, which lets PostgreSQL prune
+# listen_events down to the monthly partitions covering the window.
+SCOPE_WINDOWS: dict[str, timedelta] = {
+    "last_7_days": timedelta(days=7),
+    "last_30_days": timedelta(days=30),
+    "last_90_days": timedelta(days=90),
+    "last_365_days": timedelta(days=365),
+}
+
 
 @dataclass
 class TasteFingerprint:
@@ -133,7 +142,11 @@ def compute_user_taste_profile(
 ) -> TasteProfile:
     """Compute and upsert a taste profile for the given user."""
 
-    listens = db.scalars(select(ListenEvent).where(ListenEvent.user_id == user_id)).all()
+    query = select(ListenEvent).where(ListenEvent.user_id == user_id)
+    window = SCOPE_WINDOWS.get(scope)
+    if window is not None:
+        query = query.where(ListenEvent.played_at >= datetime.now(timezone.utc) - window)
+    listens = db.scalars(query).all()
     track_ids = {listen.track_id for listen in listens}
     features: list[TrackFeature] = []
     if track_ids:
@@ -0,0 +1,183 @@
+"""Operational commands for the API service.
+
+Run with ``python -m apps.api.cli --help``.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import typer
+
+from apps.api.config import get_settings
+from apps.api.db import init_engine, session_scope
+from apps.api.schemas import ListenEventCreate
+
+app = typer.Typer(help="Operational commands for the Sidetrack API.", no_args_is_help=True)
+
+
+@app.callback()
+def main() -> None:
+    """Operational commands for the Sidetrack API."""
+
+
+def _init() -> None:
+    init_engine(get_settings().database_url)
+
+
+def _read_listens(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield validated listen rows from a JSON array or NDJSON file."""
+
+    with path.open(encoding="utf-8") as handle:
+        first = handle.read(1)
+        while first and first.isspace():
+            first = handle.read(1)
+        if first == "[":
+            handle.seek(0)
+            records = json.load(handle)
+        else:
+            handle.seek(0)
+            records = (json.loads(line) for line in handle if line.strip())
+        for record in records:
+            yield ListenEventCreate.model_validate(record).model_dump(by_alias=True)
+
+
+@app.command("load-listens")
+def load_listens(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="JSON or NDJSON file."),
+    batch_size: int = typer.Option(5000, min=1, help="Rows per insert on non-COPY backends."),
+) -> None:
+    """Bulk load listen events, skipping rows that already exist."""
+
+    from apps.api.services.bulk_load import bulk_load_listen_events
+
+    _init()
+    with session_scope() as db:
+        result = bulk_load_listen_events(db, _read_listens(path), batch_size=batch_size)
+    typer.echo(
+        f"received={result.received} inserted={result.inserted} skipped={result.skipped}"
+    )
+
+
+@app.command("maintain-partitions")
+def maintain_partitions(
+    months_ahead: int = typer.Option(3, min=0, help="Future months to pre-create."),
+    detach_before: Optional[datetime] = typer.Option(
+        None, help="Detach partitions that end on/before this date."
+    ),
+    drop: bool = typer.Option(False, help="Drop detached partitions instead of keeping them."),
+) -> None:
+    """Create upcoming listen_events partitions and retire old ones."""
+
+    from apps.api.services.partitions import (
+        detach_listen_event_partitions,
+        ensure_listen_event_partitions,
+    )
+
+    _init()
+    with session_scope() as db:
+        created = ensure_listen_event_partitions(db, months_ahead=months_ahead)
+        detached = (
+            detach_listen_event_partitions(db, older_than=detach_before, drop=drop)
+            if detach_before
+            else []
+        )
+    typer.echo(f"created={created} detached={detached}")
+
+
+
+@app.command("rebuild-album-stats")
+def rebuild_album_stats() -> None:
+    """Recompute album_rating_stats from the ratings table."""
+
+    from apps.api.services.album_stats import rebuild_album_rating_stats
+
+    _init()
+    with session_scope() as db:
+        albums = rebuild_album_rating_stats(db)
+        db.commit()
+    typer.echo(f"albums={albums}")
+
+
+@app.command("rebuild-feeds")
+def rebuild_feeds(
+    listen_days: int = typer.Option(
+        30, min=0, help="Replay listens from this many days back; 0 replays all of them."
+    ),
+) -> None:
+    """Recompute follower counts and every feed timeline from the source tables."""
+
+    from apps.api.services.feed import rebuild_feeds as rebuild
+
+    since = (
+        datetime.now(timezone.utc) - timedelta(days=listen_days) if listen_days else None
+    )
+    _init()
+    with session_scope() as db:
+        entries = rebuild(db, listens_since=since)
+        db.commit()
+    typer.echo(f"entries={entries}")
+
+
+
+@app.command("rebuild-trending")
+def rebuild_trending() -> None:
+    """Recompute trending scores from recent listens and ratings."""
+
+    from apps.api.services.trending import rebuild_trending as rebuild
+
+    _init()
+    with session_scope() as db:
+        rows = rebuild(db)
+        db.commit()
+    typer.echo(f"rows={rows}")
+
+
+@app.command("rebuild-listen-sketches")
+def rebuild_listen_sketches(
+    days: int = typer.Option(90, min=1, help="Recompute summaries for this many days back."),
+) -> None:
+    """Recompute the per-day listen chart summaries from listen_events."""
+
+    from apps.api.services.listen_charts import rebuild_listen_sketches as rebuild
+
+    since = datetime.now(timezone.utc) - timedelta(days=days - 1)
+    _init()
+    with session_scope() as db:
+        written = rebuild(db, since=since)
+        db.commit()
+    typer.echo(f"days={written}")
+
+
+@app.command("snapshot-trending")
+def snapshot_trending() -> None:
+    """Publish a new trending snapshot for /trending and retire old ones."""
+
+    from apps.api.services.trending import publish_trending_snapshot
+
+    _init()
+    with session_scope() as db:
+        snapshot = publish_trending_snapshot(db)
+        db.commit()
+        typer.echo(f"snapshot={snapshot.id} entries={snapshot.entry_count}")
+
+
+@app.command("decay-trending")
+def decay_trending() -> None:
+    """Re-anchor trending scores at the current time and prune faded rows."""
+
+    from apps.api.services.trending import decay_trending as decay
+
+    _init()
+    with session_scope() as db:
+        pruned = decay(db)
+        db.commit()
+    typer.echo(f"pruned={pruned}")
+
+
+if __name__ == "__main__":
+    app()
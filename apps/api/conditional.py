@@ -0,0 +1,47 @@
+"""Version-based ETags and ``If-None-Match`` handling for polled endpoints.
+
+Tags are derived from cheap version markers (``week_stats.version`` and
+friends) rather than from the response body, so a matching request is
+answered with ``304 Not Modified`` before the body is built. Tags are weak:
+the same version may be rendered by different code paths (e.g. the
+PostgreSQL JSON path and the ORM path of ``GET /weeks/{id}``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+# Clients and proxies may store responses but must revalidate each time.
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """Return a weak ETag for the representation identified by ``parts``."""
+
+    raw = "\x1f".join(str(part) for part in parts).encode()
+    return f'W/"{hashlib.blake2b(raw, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` on ``request`` matches ``etag`` (weak comparison)."""
+
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
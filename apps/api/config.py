@@ -15,6 +15,33 @@ class Settings(BaseSettings):
     lastfm_api_key: str | None = None
     lastfm_api_secret: str | None = None
     listenbrainz_user_agent: str | None = None
+    # Search
+    search_section_timeout_ms: int = 800
+    # Best matches per section that /search ranks and pages through; a
+    # section's results end there.
+    search_candidate_limit: int = 500
+    search_suggest_refresh_seconds: float = 30
+    search_suggest_rebuild_seconds: float = 900
+    # Feed: activity of users with more followers is merged at read time.
+    feed_fanout_cap: int = 500
+    feed_stream_backlog: int = 1000
+    feed_stream_heartbeat_seconds: float = 15
+    # Trending: decay windows ("<n>h" / "<n>d"), rating weight relative to a
+    # listen, and the decayed score below which rows are pruned.
+    trending_windows: list[str] = ["24h", "7d", "30d"]
+    trending_rating_weight: float = 3.0
+    trending_min_score: float = 0.05
+    # Trending snapshots: ranked entries kept per window and type, and how
+    # many published snapshots to retain for readers paging an older one.
+    trending_snapshot_size: int = 100
+    trending_snapshot_keep: int = 3
+    # Listen charts: counters kept per day summary (error <= plays / (capacity + 1))
+    # and club-wide rows per day that concurrent ingest spreads over.
+    listen_sketch_capacity: int = 200
+    listen_sketch_shards: int = 4
+    # Observability
+    sql_instrumentation_enabled: bool = True
+    sql_n_plus_one_threshold: int = 5
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-from collections.abc import Generator
-from typing import Optional
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Any, Optional
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session, sessionmaker
 
 _engine = None
@@ -47,3 +49,28 @@ def get_engine() -> Engine:
         raise RuntimeError("Database engine is not initialized. Call init_engine() first.")
 
     return _engine
+
+
+@contextmanager
+def session_scope() -> Generator[Session, None, None]:
+    """Yield a standalone session for CLI commands and background work."""
+
+    if _SessionLocal is None:
+        raise RuntimeError("Database engine is not initialized. Call init_engine() first.")
+
+    db = _SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def dialect_insert(bind: Session | Connection | Engine) -> Callable[..., Any]:
+    """Return the dialect-specific ``insert`` construct supporting ON CONFLICT."""
+
+    dialect = bind.get_bind().dialect if isinstance(bind, Session) else bind.dialect
+    if dialect.name == "postgresql":
+        return postgresql.insert
+    if dialect.name == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"ON CONFLICT inserts are not supported for {dialect.name}")
@@ -0,0 +1,205 @@
+"""Per-request SQL instrumentation with N+1 detection.
+
+SQLAlchemy cursor events feed a request-scoped :class:`QueryStats` collector
+held in a context variable. The HTTP middleware reports the totals through a
+``Server-Timing`` header, records them in an in-process metrics registry, and
+logs statements that repeat often enough within one request to look like an
+N+1 access pattern.
+
+A streamed body (the ratings export, the feed's event stream) runs its queries
+after the headers are sent, so those responses carry no SQL headers; their
+totals are recorded and checked once the body finishes.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterable, AsyncIterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("sql_query_stats", default=None)
+
+
+@dataclass
+class QueryStats:
+    """Statement count and database time collected for a single request."""
+
+    count: int = 0
+    duration_ms: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        # Sync routes run in the threadpool with a copied context, so the same
+        # collector may be updated from more than one thread.
+        with self._lock:
+            self.count += 1
+            self.duration_ms += duration_ms
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Return statements executed at least ``threshold`` times."""
+
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+
+@dataclass
+class RouteSqlMetrics:
+    requests: int = 0
+    queries: int = 0
+    db_time_ms: float = 0.0
+    max_queries: int = 0
+    n_plus_one_requests: int = 0
+
+
+class SqlMetricsRegistry:
+    """Aggregate SQL counters per route template for the ``/metrics`` endpoint."""
+
+    def __init__(self) -> None:
+        self._routes: dict[str, RouteSqlMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, stats: QueryStats, *, flagged: bool) -> None:
+        with self._lock:
+            metrics = self._routes.setdefault(route, RouteSqlMetrics())
+            metrics.requests += 1
+            metrics.queries += stats.count
+            metrics.db_time_ms += stats.duration_ms
+            metrics.max_queries = max(metrics.max_queries, stats.count)
+            if flagged:
+                metrics.n_plus_one_requests += 1
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                route: {
+                    "requests": m.requests,
+                    "queries": m.queries,
+                    "avg_queries": round(m.queries / m.requests, 2) if m.requests else 0.0,
+                    "max_queries": m.max_queries,
+                    "db_time_ms": round(m.db_time_ms, 3),
+                    "n_plus_one_requests": m.n_plus_one_requests,
+                }
+                for route, m in sorted(self._routes.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+sql_metrics = SqlMetricsRegistry()
+
+_instrumented_engines: set[int] = set()
+
+
+def current_query_stats() -> QueryStats | None:
+    """Return the collector for the active request, if any."""
+
+    return _current_stats.get()
+
+
+def install_sql_instrumentation(engine: Engine) -> None:
+    """Attach cursor listeners that feed the request-scoped collector.
+
+    Installing twice on the same engine is a no-op.
+    """
+
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            conn.info.setdefault("sql_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        starts = conn.info.get("sql_query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        stats.record(statement, elapsed_ms)
+
+
+def _route_label(request: Request) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or request.url.path
+    return f"{request.method} {path}"
+
+
+class SqlInstrumentationMiddleware(BaseHTTPMiddleware):
+    """Expose per-request SQL counts/time and flag likely N+1 patterns."""
+
+    def __init__(self, app, *, n_plus_one_threshold: int = 5) -> None:
+        super().__init__(app)
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        route = _route_label(request)
+        # BaseHTTPMiddleware hands every body back as a stream; only responses
+        # without a Content-Length are still producing theirs.
+        if isinstance(response, StreamingResponse) and "content-length" not in response.headers:
+            response.body_iterator = self._report_after(response.body_iterator, route, stats)
+            return response
+
+        repeated = self._report(route, stats)
+        timing = [f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries"']
+        if repeated:
+            timing.append(f'n1;desc="{len(repeated)} repeated statements"')
+        existing = response.headers.get("Server-Timing")
+        if existing:
+            timing.insert(0, existing)
+        response.headers["Server-Timing"] = ", ".join(timing)
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        return response
+
+    async def _report_after(
+        self, body: AsyncIterable[str | bytes], route: str, stats: QueryStats
+    ) -> AsyncIterator[str | bytes]:
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            self._report(route, stats)
+
+    def _report(self, route: str, stats: QueryStats) -> dict[str, int]:
+        """Log likely N+1 statements and record the request; returns the repeats."""
+
+        repeated = stats.repeated(self.n_plus_one_threshold)
+        if repeated:
+            worst_sql, worst_count = max(repeated.items(), key=lambda item: item[1])
+            logger.warning(
+                "Possible N+1 on %s: %d statements repeated; worst ran %d times: %s",
+                route,
+                len(repeated),
+                worst_count,
+                " ".join(worst_sql.split())[:200],
+            )
+
+        sql_metrics.record(route, stats, flagged=bool(repeated))
+        return repeated
@@ -7,8 +7,15 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from apps.api.config import get_settings
-from apps.api.db import get_db, init_engine
+from apps.api.db import get_db, get_engine, init_engine
+from apps.api.instrumentation import (
+    SqlInstrumentationMiddleware,
+    install_sql_instrumentation,
+    sql_metrics,
+)
 from apps.api.routes import register_routes
+from apps.api.services.search_index import install_sqlite_search_index
+from apps.api.services.suggest import get_suggestion_index
 
 
 def create_app() -> FastAPI:
@@ -16,10 +23,22 @@ def create_app() -> FastAPI:
 
     settings = get_settings()
     init_engine(settings.database_url)
+    install_sqlite_search_index(get_engine())
 
     app = FastAPI(title=settings.app_name, version="0.1.0")
     register_routes(app)
 
+    @app.on_event("startup")
+    def warm_search_suggestions() -> None:
+        get_suggestion_index().refresh_in_background()
+
+    if settings.sql_instrumentation_enabled:
+        install_sql_instrumentation(get_engine())
+        app.add_middleware(
+            SqlInstrumentationMiddleware,
+            n_plus_one_threshold=settings.sql_n_plus_one_threshold,
+        )
+
     @app.get("/health")
     def health(db: Session = Depends(get_db)) -> dict[str, object]:
         """Simple health endpoint with database connectivity probe."""
@@ -35,6 +54,12 @@ def create_app() -> FastAPI:
 
         return {"status": status, "details": details}
 
+    @app.get("/metrics")
+    def metrics() -> dict[str, object]:
+        """Per-route SQL statement counts and database time."""
+
+        return {"sql": sql_metrics.snapshot()}
+
     return app
 
 
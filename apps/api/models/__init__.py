@@ -1,10 +1,26 @@
 """Model package wiring for the canonical Sidetrack API schema."""
 
 from .base import Base
-from .club import Nomination, Rating, Vote, Week
-from .listening import ListenEvent, ListenSource
-from .music import Album, Track, TrackFeature
-from .social import Compatibility, Follow, TasteProfile, UserRecommendation
+from .club import (
+    AlbumRatingStats,
+    Nomination,
+    NominationStats,
+    Rating,
+    Vote,
+    Week,
+    WeekStats,
+)
+from .listening import ListenEvent, ListenSketch, ListenSource
+from .music import (
+    Album,
+    Track,
+    TrackFeature,
+    TrendingScore,
+    TrendingSnapshot,
+    TrendingSnapshotEntry,
+    TrendingSpan,
+)
+from .social import Compatibility, FeedEntry, Follow, TasteProfile, UserRecommendation
 from .user import LinkedAccount, ProviderType, User
 
 metadata = Base.metadata
@@ -12,22 +28,31 @@ all_metadata = [metadata]
 
 __all__ = [
     "Album",
+    "AlbumRatingStats",
     "all_metadata",
     "Compatibility",
     "Base",
+    "FeedEntry",
     "Follow",
     "ListenEvent",
+    "ListenSketch",
     "ListenSource",
     "LinkedAccount",
     "Nomination",
+    "NominationStats",
     "ProviderType",
     "Rating",
     "TasteProfile",
     "Track",
     "TrackFeature",
+    "TrendingScore",
+    "TrendingSnapshot",
+    "TrendingSnapshotEntry",
+    "TrendingSpan",
     "User",
     "UserRecommendation",
     "Vote",
     "Week",
+    "WeekStats",
     "metadata",
 ]
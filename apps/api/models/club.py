@@ -8,12 +8,15 @@ from datetime import datetime, timezone
 from sqlalchemy import (
     BigInteger,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
     Text,
     UniqueConstraint,
+    func,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -54,6 +57,9 @@ class Week(Base):
 
 class Nomination(Base):
     __tablename__ = "nominations"
+    __table_args__ = (
+        UniqueConstraint("week_id", "user_id", "album_id", name="uq_nomination_week_user_album"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -117,6 +123,11 @@ class Rating(Base):
     __tablename__ = "ratings"
     __table_args__ = (
         UniqueConstraint("week_id", "user_id", name="uq_rating_week_user"),
+        # Covers per-album avg/count aggregates without touching the heap.
+        Index("ix_ratings_album_id_value", "album_id", "value"),
+        # Keyset order of GET /ratings, unfiltered and per user.
+        Index("ix_ratings_created_at_id", "created_at", "id"),
+        Index("ix_ratings_user_id_created_at", "user_id", "created_at", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -148,3 +159,91 @@ class Rating(Base):
     week: Mapped[Week] = relationship(back_populates="ratings")
     album: Mapped["Album"] = relationship(back_populates="ratings")
     nomination: Mapped[Nomination | None] = relationship(back_populates="ratings")
+
+
+class WeekStats(Base):
+    """Materialized per-week aggregates, kept current by club writes.
+
+    ``version`` increases on every change to the week, its nominations, votes
+    or ratings, so readers can cache anything derived from it by
+    ``(week_id, version)``.
+    """
+
+    __tablename__ = "week_stats"
+
+    week_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("weeks.id", ondelete="CASCADE"), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    nomination_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    vote_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class NominationStats(Base):
+    """Materialized vote and rating aggregates for one nomination."""
+
+    __tablename__ = "nomination_stats"
+
+    nomination_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("nominations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    week_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("weeks.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    points: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_place: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    second_place: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_votes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class AlbumRatingStats(Base):
+    """Materialized per-album rating aggregates, kept current by rating writes.
+
+    ``rating_sum_sq`` allows variance/stddev without rescanning ratings.
+    Rebuild with ``python -m apps.api.cli rebuild-album-stats``.
+    """
+
+    __tablename__ = "album_rating_stats"
+    __table_args__ = (
+        # Club fallback of /recommendations: highest rating counts first.
+        Index("ix_album_rating_stats_rating_count", "rating_count"),
+    )
+
+    album_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("albums.id", ondelete="CASCADE"), primary_key=True
+    )
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    rating_sum_sq: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    last_rated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+# Expression indexes matching the case-insensitive lookups in routes/weeks.py.
+Index("ix_weeks_lower_label", func.lower(Week.label))
+# Winner announcements in the club-wide feed, newest first.
+Index("ix_weeks_created_at_id", Week.created_at, Week.id)
+# SQLite rejects NULLS LAST in index definitions.
+Index(
+    "ix_weeks_week_number_created_at",
+    Week.week_number.desc().nulls_last(),
+    Week.created_at.desc(),
+).ddl_if(dialect="postgresql")
+Index("ix_nominations_lower_genre_week_id", func.lower(Nomination.genre), Nomination.week_id)
+Index("ix_nominations_lower_decade_week_id", func.lower(Nomination.decade), Nomination.week_id)
+Index(
+    "ix_nominations_lower_country_week_id", func.lower(Nomination.country), Nomination.week_id
+)
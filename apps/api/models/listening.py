@@ -6,9 +6,18 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, JSON
+from sqlalchemy import (
+    DateTime,
+    Enum as SAEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
 
 from .base import Base
 
@@ -21,7 +30,26 @@ class ListenSource(str, Enum):
 
 
 class ListenEvent(Base):
+    """A single play; range-partitioned by month on ``played_at`` in PostgreSQL.
+
+    The partition key must be part of every unique constraint, so the table
+    key is ``(id, played_at)`` while the ORM keeps identifying rows by ``id``.
+    """
+
     __tablename__ = "listen_events"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "track_id", "played_at", name="uq_listen_events_user_track_played"
+        ),
+        Index("ix_listen_events_played_at_brin", "played_at", postgresql_using="brin"),
+        Index("ix_listen_events_user_source_played_at", "user_id", "source", "played_at"),
+        Index("ix_listen_events_track_id", "track_id"),
+        {"postgresql_partition_by": "RANGE (played_at)"},
+    )
+
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict:
+        return {"primary_key": [cls.__table__.c.id]}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -33,9 +61,19 @@ class ListenEvent(Base):
         UUID(as_uuid=True), ForeignKey("tracks.id", ondelete="CASCADE"), nullable=False
     )
     played_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        primary_key=True,
+        index=True,
+    )
+    source: Mapped[ListenSource] = mapped_column(
+        SAEnum(
+            ListenSource,
+            name="listen_source",
+            values_callable=lambda enum: [member.value for member in enum],
+        ),
+        nullable=False,
     )
-    source: Mapped[ListenSource] = mapped_column(SAEnum(ListenSource), nullable=False)
     metadata_: Mapped[dict | None] = mapped_column("metadata", JSON)
     ingested_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
@@ -44,3 +82,32 @@ class ListenEvent(Base):
     user: Mapped["User"] = relationship(back_populates="listen_events")
     track: Mapped["Track"] = relationship(back_populates="listen_events")
 
+
+
+# Serves "recent listens for user" (user filter + played_at DESC ordering).
+Index(
+    "ix_listen_events_user_played_at",
+    ListenEvent.user_id,
+    ListenEvent.played_at.desc(),
+)
+
+
+class ListenSketch(Base):
+    """Bounded-size heavy-hitter summary of one day of listens.
+
+    ``scope`` is ``"club"`` or a user id and ``dimension`` is ``"track"`` or
+    ``"artist"``. Club-wide summaries are split over a few ``shard`` rows so
+    concurrent ingest does not queue on one row; readers merge every shard
+    and bucket they need (see ``services.listen_charts``).
+    """
+
+    __tablename__ = "listen_sketches"
+
+    scope: Mapped[str] = mapped_column(String(40), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    counters: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -5,7 +5,7 @@ from __future__ import annotations
 import uuid
 from typing import Optional
 
-from sqlalchemy import ForeignKey, Integer, String, Text
+from sqlalchemy import ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import JSON, Float, DateTime
@@ -14,8 +14,23 @@ from datetime import datetime, timezone
 from .base import Base
 
 
+def _trigram_index(table: str, column: str) -> Index:
+    """GIN trigram index serving ``ILIKE '%term%'`` search on PostgreSQL."""
+
+    return Index(
+        f"ix_{table}_{column}_trgm",
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+
+
 class Album(Base):
     __tablename__ = "albums"
+    __table_args__ = (
+        _trigram_index("albums", "title"),
+        _trigram_index("albums", "artist_name"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -26,6 +41,12 @@ class Album(Base):
     musicbrainz_id: Mapped[str | None] = mapped_column(String(64), unique=True)
     spotify_id: Mapped[str | None] = mapped_column(String(64), unique=True)
     cover_url: Mapped[str | None] = mapped_column(Text)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
 
     tracks: Mapped[list["Track"]] = relationship(
         back_populates="album", cascade="all, delete-orphan"
@@ -40,6 +61,10 @@ class Album(Base):
 
 class Track(Base):
     __tablename__ = "tracks"
+    __table_args__ = (
+        _trigram_index("tracks", "title"),
+        _trigram_index("tracks", "artist_name"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -52,6 +77,12 @@ class Track(Base):
     duration_ms: Mapped[int | None] = mapped_column(Integer)
     musicbrainz_id: Mapped[str | None] = mapped_column(String(64), unique=True)
     spotify_id: Mapped[str | None] = mapped_column(String(64), unique=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
 
     album: Mapped[Album] = relationship(
         back_populates="tracks",
@@ -84,3 +115,69 @@ class TrackFeature(Base):
     )
 
     track: Mapped[Track] = relationship(back_populates="features")
+
+
+class TrendingSpan(Base):
+    """Reference time of a trending window's stored scores.
+
+    Scores are stored as ``Σ weight · e^((t - anchor_at) / window)``; the
+    decayed score at ``now`` is that times ``e^(-(now - anchor_at) / window)``.
+    """
+
+    __tablename__ = "trending_spans"
+
+    span: Mapped[str] = mapped_column(String(8), primary_key=True)
+    anchor_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class TrendingScore(Base):
+    """Exponentially decayed activity of one album, track or artist in one window.
+
+    ``entity_key`` is the album/track id, or the artist name for artists.
+    Kept current by listen and rating writes (see ``services.trending``).
+    """
+
+    __tablename__ = "trending_scores"
+    __table_args__ = (
+        # Ranked lists: highest score first within a window and entity type.
+        Index("ix_trending_scores_rank", "span", "entity_type", "score", "entity_key"),
+    )
+
+    span: Mapped[str] = mapped_column(String(8), primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(8), primary_key=True)
+    entity_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    artist_name: Mapped[str | None] = mapped_column(String(255))
+    score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class TrendingSnapshot(Base):
+    """One published set of trending rankings; the newest row is current.
+
+    Written in a single transaction by ``python -m apps.api.cli
+    snapshot-trending``, so readers switch from one snapshot to the next
+    atomically when it commits.
+    """
+
+    __tablename__ = "trending_snapshots"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class TrendingSnapshotEntry(Base):
+    """A ranked album, track or artist within a snapshot, window and entity type."""
+
+    __tablename__ = "trending_snapshot_entries"
+
+    snapshot_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("trending_snapshots.id", ondelete="CASCADE"), primary_key=True
+    )
+    span: Mapped[str] = mapped_column(String(8), primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(8), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    entity_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    artist_name: Mapped[str | None] = mapped_column(String(255))
+    score: Mapped[float] = mapped_column(Float, nullable=False)
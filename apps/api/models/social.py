@@ -5,7 +5,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Float, ForeignKey, JSON, String, Text, UniqueConstraint
+from sqlalchemy import DateTime, Float, ForeignKey, Index, JSON, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -36,6 +36,10 @@ class Follow(Base):
     __tablename__ = "follows"
     __table_args__ = (
         UniqueConstraint("follower_id", "followee_id", name="uq_follows_pair"),
+        # Feed fan-out: every follower of an actor (created in 0001).
+        Index("ix_follows_followee_id", "followee_id"),
+        # Follow events in the club-wide feed, newest first.
+        Index("ix_follows_created_at_id", "created_at", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -59,6 +63,40 @@ class Follow(Base):
     )
 
 
+class FeedEntry(Base):
+    """One item in a user's home timeline, written when the activity happens.
+
+    Each activity lands in the actor's own timeline and, unless the actor has
+    more than ``feed_fanout_cap`` followers, in every follower's timeline.
+    Items of those widely followed users and club-wide announcements
+    (``owner_id`` NULL) are merged in at read time instead. ``payload`` holds
+    the rendered feed item, so reads never join back to the source tables.
+    """
+
+    __tablename__ = "feed_entries"
+    __table_args__ = (
+        UniqueConstraint("owner_id", "kind", "subject_id", name="uq_feed_entries_owner_subject"),
+        # Home timeline reads: newest entries of one owner.
+        Index("ix_feed_entries_owner_id_occurred_at", "owner_id", "occurred_at", "id"),
+        # Read-time merge of widely followed actors and unfollow cleanup.
+        Index("ix_feed_entries_actor_id_occurred_at", "actor_id", "occurred_at", "id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    owner_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
+    )
+    actor_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
+    )
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    subject_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+
 class Compatibility(Base):
     __tablename__ = "compatibility"
     __table_args__ = (
@@ -0,0 +1,36 @@
+"""Opaque keyset cursors shared by paginated endpoints.
+
+A cursor is URL-safe base64 of a small JSON object holding the sort key of
+the last row served. Clients treat it as an opaque token; a malformed or
+mismatched cursor is a 400.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *, kind: str | None = None) -> dict[str, Any]:
+    """Decode ``cursor``; when ``kind`` is given its ``k`` field must match."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        payload = None
+    if not isinstance(payload, dict) or (kind is not None and payload.get("k") != kind):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
+    return payload
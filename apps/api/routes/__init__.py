@@ -19,6 +19,7 @@ from . import (
     playlists,
     ingest,
     feed,
+    charts,
 )
 
 
@@ -42,5 +43,6 @@ def register_routes(app: FastAPI) -> None:
         playlists.router,
         ingest.router,
         feed.router,
+        charts.router,
     ):
         app.include_router(router)
@@ -3,13 +3,14 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, select
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from apps.api.db import get_db
 from apps.api.models import Album
 from apps.api.schemas import AlbumCreate, AlbumRead
+from apps.api.services.search_index import text_search_clause
 
 router = APIRouter(prefix="/albums", tags=["albums"])
 
@@ -38,10 +39,10 @@ async def search_albums(
         query = query.where(Album.spotify_id == spotify_id)
     if release_year:
         query = query.where(Album.release_year == release_year)
-    if title:
-        query = query.where(func.lower(Album.title).like(f"%{_normalize(title)}%"))
-    if artist_name:
-        query = query.where(func.lower(Album.artist_name).like(f"%{_normalize(artist_name)}%"))
+    if title and title.strip():
+        query = query.where(text_search_clause(Album, title.strip(), Album.title))
+    if artist_name and artist_name.strip():
+        query = query.where(text_search_clause(Album, artist_name.strip(), Album.artist_name))
 
     albums = db.scalars(query.limit(limit)).all()
     return albums
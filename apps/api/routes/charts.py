@@ -0,0 +1,109 @@
+"""Approximate listen charts served from per-day heavy-hitter summaries."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from apps.api.db import get_db
+from apps.api.models import Track
+from apps.api.services.listen_charts import load_chart
+
+router = APIRouter(prefix="/charts", tags=["charts"])
+
+
+class ChartEntry(BaseModel):
+    """A charted track or artist; the true play count lies in ``[count, max_count]``."""
+
+    id: str
+    title: str
+    artist_name: str | None = None
+    count: int
+    max_count: int
+
+
+class ListenChart(BaseModel):
+    """Top items of a listen chart.
+
+    ``error`` bounds every count: unlisted items have at most ``error``
+    plays, and ``error <= total / (LISTEN_SKETCH_CAPACITY + 1)``.
+    """
+
+    since: datetime
+    total: int
+    error: int
+    items: list[ChartEntry]
+
+
+def _chart_params(
+    user_id: UUID | None = Query(None, description="Chart one user's listens instead of the club's."),
+    days: int = Query(30, ge=1, le=365, description="UTC days to cover, today included."),
+    limit: int = Query(10, ge=1, le=100),
+) -> tuple[UUID | None, int, int]:
+    return user_id, days, limit
+
+
+@router.get("/tracks", response_model=ListenChart)
+async def get_track_chart(
+    params: tuple[UUID | None, int, int] = Depends(_chart_params),
+    db: Session = Depends(get_db),
+) -> ListenChart:
+    """Most played tracks, club-wide or for one user."""
+
+    user_id, days, limit = params
+    chart = load_chart(db, "track", user_id=user_id, days=days)
+    top = chart.summary.top(limit)
+    tracks = {
+        str(row.id): row
+        for row in db.execute(
+            select(Track.id, Track.title, Track.artist_name).where(
+                Track.id.in_([UUID(track_id) for track_id, _count in top])
+            )
+        )
+    }
+    return ListenChart(
+        since=chart.since,
+        total=chart.summary.total,
+        error=chart.summary.error,
+        items=[
+            ChartEntry(
+                id=track_id,
+                title=tracks[track_id].title,
+                artist_name=tracks[track_id].artist_name,
+                count=count,
+                max_count=count + chart.summary.error,
+            )
+            for track_id, count in top
+            if track_id in tracks
+        ],
+    )
+
+
+@router.get("/artists", response_model=ListenChart)
+async def get_artist_chart(
+    params: tuple[UUID | None, int, int] = Depends(_chart_params),
+    db: Session = Depends(get_db),
+) -> ListenChart:
+    """Most played artists, club-wide or for one user."""
+
+    user_id, days, limit = params
+    chart = load_chart(db, "artist", user_id=user_id, days=days)
+    return ListenChart(
+        since=chart.since,
+        total=chart.summary.total,
+        error=chart.summary.error,
+        items=[
+            ChartEntry(
+                id=artist_name,
+                title=artist_name,
+                count=count,
+                max_count=count + chart.summary.error,
+            )
+            for artist_name, count in chart.summary.top(limit)
+        ],
+    )
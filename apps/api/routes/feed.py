@@ -2,22 +2,46 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator
 from datetime import datetime
 from enum import Enum
+from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import select, union_all
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Float,
+    Integer,
+    String,
+    Text,
+    and_,
+    cast,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.orm import InstrumentedAttribute, Session, aliased
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
 
-from apps.api.db import get_db
-from apps.api.models import User, Album
+from apps.api.config import get_settings
+from apps.api.db import get_db, session_scope
+from apps.api.models import Album, Follow, ListenEvent, Track, User
 from apps.api.models.club import Rating, Week
+from apps.api.pagination import decode_cursor, encode_cursor
+from apps.api.services.feed import timeline_query
+from apps.api.services.feed_stream import FeedBroker, get_feed_broker
 
 
 class FeedEventType(str, Enum):
     RATING = "rating"
+    NOMINATION = "nomination"
     LISTEN = "listen"
     CLUB = "club"
     FOLLOW = "follow"
@@ -40,73 +64,378 @@ class FeedItem(BaseModel):
 
 router = APIRouter(tags=["feed"])
 
+_ID = Week.id.type
+# Branch projections take mapped attributes as well as SQL expressions.
+_Column = ColumnElement[Any] | InstrumentedAttribute[Any]
+
+
+def _typed_null(type_: Any) -> ColumnElement[Any]:
+    # UNION columns need matching types on PostgreSQL; a bare NULL is text.
+    return cast(null(), type_)
+
+
+def _event(
+    kind: FeedEventType,
+    item_id: _Column,
+    ts: _Column,
+    *,
+    actor_id: _Column | None = None,
+    actor_name: _Column | None = None,
+    title: _Column | None = None,
+    artist: _Column | None = None,
+    album_id: _Column | None = None,
+    ref_id: _Column | None = None,
+    ref_label: _Column | None = None,
+    value: _Column | None = None,
+    number: _Column | None = None,
+    note: _Column | None = None,
+    extra: _Column | None = None,
+) -> tuple[ColumnElement[Any], ...]:
+    """Project one event type onto the narrow column list shared by the union."""
+
+    def column(expr: _Column | None, type_: Any, name: str) -> ColumnElement[Any]:
+        return (expr if expr is not None else _typed_null(type_)).label(name)
+
+    return (
+        literal(kind.value).label("kind"),
+        item_id.label("id"),
+        ts.label("ts"),
+        column(actor_id, _ID, "actor_id"),
+        column(actor_name, String(), "actor_name"),
+        column(title, String(), "title"),
+        column(artist, String(), "artist"),
+        column(album_id, _ID, "album_id"),
+        column(ref_id, _ID, "ref_id"),
+        column(ref_label, String(), "ref_label"),
+        column(value, Float(), "value"),
+        column(number, Integer(), "number"),
+        column(note, Text(), "note"),
+        column(extra, String(), "extra"),
+    )
+
+
+def _feed_branches() -> list[tuple[Select, _Column, _Column]]:
+    """One ``(select, ts, id)`` per event type, each servable from an index.
+
+    Adding an event type means adding a branch here and a case to
+    :func:`_render`; the feed stays one statement.
+    """
+
+    rater = aliased(User)
+    follower = aliased(User)
+    followee = aliased(User)
+    listener = aliased(User)
+    return [
+        (
+            select(
+                *_event(
+                    FeedEventType.RATING,
+                    Rating.id,
+                    Rating.created_at,
+                    actor_id=Rating.user_id,
+                    actor_name=func.coalesce(rater.display_name, rater.handle),
+                    title=Album.title,
+                    artist=Album.artist_name,
+                    album_id=Rating.album_id,
+                    ref_id=Rating.week_id,
+                    ref_label=Week.label,
+                    value=Rating.value,
+                    note=func.substr(Rating.review, 1, 100),
+                    extra=Rating.favorite_track,
+                )
+            )
+            .join(rater, rater.id == Rating.user_id)
+            .join(Album, Album.id == Rating.album_id)
+            .join(Week, Week.id == Rating.week_id),
+            Rating.created_at,
+            Rating.id,
+        ),
+        (
+            select(
+                *_event(
+                    FeedEventType.CLUB,
+                    Week.id,
+                    Week.created_at,
+                    title=Album.title,
+                    artist=Album.artist_name,
+                    album_id=Album.id,
+                    ref_id=Week.id,
+                    ref_label=Week.label,
+                    number=Week.week_number,
+                )
+            ).join(Album, Album.id == Week.winner_album_id),
+            Week.created_at,
+            Week.id,
+        ),
+        (
+            select(
+                *_event(
+                    FeedEventType.FOLLOW,
+                    Follow.id,
+                    Follow.created_at,
+                    actor_id=Follow.follower_id,
+                    actor_name=func.coalesce(follower.display_name, follower.handle),
+                    ref_id=Follow.followee_id,
+                    ref_label=func.coalesce(followee.display_name, followee.handle),
+                )
+            )
+            .join(follower, follower.id == Follow.follower_id)
+            .join(followee, followee.id == Follow.followee_id),
+            Follow.created_at,
+            Follow.id,
+        ),
+        (
+            select(
+                *_event(
+                    FeedEventType.LISTEN,
+                    ListenEvent.id,
+                    ListenEvent.played_at,
+                    actor_id=ListenEvent.user_id,
+                    actor_name=func.coalesce(listener.display_name, listener.handle),
+                    title=Track.title,
+                    artist=Track.artist_name,
+                    album_id=Track.album_id,
+                    ref_id=ListenEvent.track_id,
+                    extra=cast(ListenEvent.source, String()),
+                )
+            )
+            .join(listener, listener.id == ListenEvent.user_id)
+            .join(Track, Track.id == ListenEvent.track_id),
+            ListenEvent.played_at,
+            ListenEvent.id,
+        ),
+    ]
+
+
+def _decode_feed_cursor(cursor: str) -> tuple[datetime, UUID]:
+    payload = decode_cursor(cursor, kind="feed")
+    try:
+        return datetime.fromisoformat(payload["t"]), UUID(payload["id"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        ) from exc
+
+
+def _before(ts: _Column, item_id: _Column, after: tuple[datetime, UUID]) -> ColumnElement[bool]:
+    # The leading ``ts <=`` bound becomes an index condition (and prunes
+    # listen_events partitions) even where the index does not cover ``id``.
+    return and_(ts <= after[0], or_(ts < after[0], item_id < after[1]))
+
+
+def feed_query(limit: int, after: tuple[datetime, UUID] | None = None) -> Select:
+    """The club-wide feed page after ``after`` as a single ``UNION ALL``.
+
+    Every branch applies the cursor and its own ``ORDER BY ... LIMIT``, so
+    each reads at most ``limit`` rows off its ``(timestamp, id)`` index no
+    matter how deep the page is.
+    """
+
+    branches = []
+    for query, ts, item_id in _feed_branches():
+        if after is not None:
+            query = query.where(_before(ts, item_id, after))
+        branches.append(query.order_by(ts.desc(), item_id.desc()).limit(limit))
+    # SQLite only accepts ORDER BY/LIMIT inside a compound SELECT via subqueries.
+    merged = union_all(*(select(branch.subquery()) for branch in branches)).subquery()
+    return select(merged).order_by(merged.c.ts.desc(), merged.c.id.desc()).limit(limit)
+
+
+def _render(row: Any) -> FeedItem:
+    kind = FeedEventType(row.kind)
+    album = f"{row.title} — {row.artist}" if row.title else None
+    actor_id = str(row.actor_id) if row.actor_id else None
+    actor = row.actor_name or "Anonymous"
+    if kind is FeedEventType.RATING:
+        return FeedItem(
+            id=f"rating-{row.id}",
+            type=kind,
+            actor=actor,
+            actor_id=actor_id,
+            action="rated",
+            target=album,
+            target_link=f"/club/weeks/{row.ref_id}",
+            rating=row.value,
+            timestamp=row.ts,
+            metadata={
+                "album_id": str(row.album_id),
+                "week_id": str(row.ref_id),
+                "week_label": row.ref_label,
+                "review": row.note,
+                "favorite_track": row.extra,
+            },
+        )
+    if kind is FeedEventType.CLUB:
+        return FeedItem(
+            id=f"club-{row.id}",
+            type=kind,
+            actor="bot",
+            action=f"announced winner for {row.ref_label}",
+            target=album,
+            target_link=f"/club/weeks/{row.ref_id}",
+            timestamp=row.ts,
+            metadata={"week_number": row.number, "album_id": str(row.album_id)},
+        )
+    if kind is FeedEventType.FOLLOW:
+        return FeedItem(
+            id=f"follow-{row.id}",
+            type=kind,
+            actor=actor,
+            actor_id=actor_id,
+            action="followed",
+            target=row.ref_label,
+            target_link=f"/u/{row.ref_id}",
+            timestamp=row.ts,
+            metadata={"followee_id": str(row.ref_id)},
+        )
+    return FeedItem(
+        id=f"listen-{row.id}",
+        type=kind,
+        actor=actor,
+        actor_id=actor_id,
+        action="listened to",
+        target=f"{row.title} · {row.artist}",
+        timestamp=row.ts,
+        metadata={
+            "track_id": str(row.ref_id),
+            "album_id": str(row.album_id) if row.album_id else None,
+            "source": row.extra,
+        },
+    )
+
+
+def _set_next_cursor(response: Response, ts: datetime, item_id: UUID) -> None:
+    response.headers["X-Next-Cursor"] = encode_cursor(
+        {"k": "feed", "t": ts.isoformat(), "id": str(item_id)}
+    )
+
 
 @router.get("/feed", response_model=list[FeedItem])
 async def get_feed(
+    response: Response,
     db: Session = Depends(get_db),
-    user_id: str | None = Query(None, description="User ID for personalized feed"),
+    user_id: UUID | None = Query(None, description="User ID for personalized feed"),
     limit: int = Query(20, ge=1, le=100, description="Number of feed items to return"),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page."),
 ) -> list[FeedItem]:
-    """Return recent activity feed combining ratings, listens, and club events."""
-    feed_items: list[FeedItem] = []
-
-    # Fetch recent ratings with user and album data
-    rating_stmt = (
-        select(Rating, User, Album, Week)
-        .join(User, Rating.user_id == User.id)
-        .join(Album, Rating.album_id == Album.id)
-        .join(Week, Rating.week_id == Week.id)
-        .order_by(Rating.created_at.desc())
-        .limit(limit)
-    )
-    for rating, user, album, week in db.execute(rating_stmt).all():
-        feed_items.append(
+    """Return recent activity: ratings, club winners, follows and listens, newest first.
+
+    With ``user_id`` the feed is that user's home timeline: their own
+    activity, the ratings, nominations and listens of users they follow, and
+    club announcements, read from ``feed_entries``. When more items exist,
+    ``X-Next-Cursor`` holds the cursor for the next page.
+    """
+    after = _decode_feed_cursor(cursor) if cursor else None
+
+    if user_id is not None:
+        entries = db.execute(timeline_query(user_id, limit + 1, after)).scalars().all()
+        if len(entries) > limit:
+            entries = entries[:limit]
+            _set_next_cursor(response, entries[-1].occurred_at, entries[-1].id)
+        return [
             FeedItem(
-                id=f"rating-{rating.id}",
-                type=FeedEventType.RATING,
-                actor=user.display_name or user.handle or "Anonymous",
-                actor_id=str(user.id),
-                action="rated",
-                target=f"{album.title} — {album.artist_name}",
-                target_link=f"/club/weeks/{week.id}",
-                rating=rating.value,
-                timestamp=rating.created_at,
-                metadata={
-                    "album_id": str(album.id),
-                    "week_id": str(week.id),
-                    "week_label": week.label,
-                    "review": rating.review[:100] if rating.review else None,
-                    "favorite_track": rating.favorite_track,
-                },
+                id=f"{entry.kind}-{entry.subject_id}",
+                type=FeedEventType(entry.kind),
+                timestamp=entry.occurred_at,
+                **entry.payload,
             )
-        )
+            for entry in entries
+        ]
 
-    # Fetch recent weeks with winners (club announcements)
-    week_stmt = (
-        select(Week, Album)
-        .outerjoin(Album, Week.winner_album_id == Album.id)
-        .where(Week.winner_album_id.is_not(None))
-        .order_by(Week.created_at.desc())
-        .limit(5)
-    )
-    for week, album in db.execute(week_stmt).all():
-        if album:
-            feed_items.append(
-                FeedItem(
-                    id=f"club-{week.id}",
-                    type=FeedEventType.CLUB,
-                    actor="bot",
-                    action=f"announced winner for {week.label}",
-                    target=f"{album.title} — {album.artist_name}",
-                    target_link=f"/club/weeks/{week.id}",
-                    timestamp=week.created_at,
-                    metadata={
-                        "week_number": week.week_number,
-                        "album_id": str(album.id),
-                    },
-                )
-            )
+    rows = db.execute(feed_query(limit + 1, after)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        _set_next_cursor(response, rows[-1].ts, rows[-1].id)
+    return [_render(row) for row in rows]
 
-    # Sort all items by timestamp descending and limit
-    feed_items.sort(key=lambda x: x.timestamp, reverse=True)
-    return feed_items[:limit]
+
+# Reconnect delay suggested to EventSource clients, in milliseconds.
+STREAM_RETRY_MS = 3000
+
+
+def _sse(event_id: str, item: dict[str, Any]) -> str:
+    data = FeedItem.model_validate(item).model_dump_json()
+    return f"id: {event_id}\nevent: feed\ndata: {data}\n\n"
+
+
+async def _stream_events(
+    broker: FeedBroker,
+    last_event_id: str | None,
+    actors: set[str] | None,
+    heartbeat: float,
+) -> AsyncIterator[str]:
+    def visible(item: dict[str, Any]) -> bool:
+        return actors is None or item.get("actor_id") is None or item["actor_id"] in actors
+
+    # Subscribe once the response starts, and before reading the buffer so
+    # nothing published in between is lost.
+    subscription = broker.subscribe()
+    try:
+        backlog: list[tuple[int, dict[str, Any]]] | None = []
+        if last_event_id:
+            after_seq = broker.parse_event_id(last_event_id)
+            backlog = broker.replay(after_seq) if after_seq is not None else None
+
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        if backlog is None:
+            # Items since Last-Event-ID are gone; the client reloads GET /feed.
+            yield "event: reset\ndata: {}\n\n"
+        last_seq = 0
+        for seq, item in backlog or []:
+            last_seq = seq
+            if visible(item):
+                yield _sse(broker.event_id(seq), item)
+
+        while True:
+            try:
+                seq, item = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if seq > last_seq and visible(item):
+                yield _sse(broker.event_id(seq), item)
+            if subscription.overflowed and subscription.queue.empty():
+                # Too slow to keep up: end the stream so the client resumes
+                # from the ring buffer with Last-Event-ID.
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/feed/stream", response_class=StreamingResponse)
+async def stream_feed(
+    user_id: UUID | None = Query(
+        None, description="Only activity by this user, users they follow, and the club."
+    ),
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """Push new feed items as Server-Sent Events (``event: feed``).
+
+    Each event's ``data`` is a feed item as returned by ``GET /feed`` and
+    its ``id`` can be sent back as ``Last-Event-ID`` to resume: recent items
+    are replayed from an in-memory buffer. ``event: reset`` means the
+    requested position is no longer buffered and the client should reload
+    ``GET /feed``. A comment line is sent every
+    ``FEED_STREAM_HEARTBEAT_SECONDS`` to keep idle connections open.
+    """
+
+    actors: set[str] | None = None
+    if user_id is not None:
+        # A short session of its own: the request's session would hold a
+        # pooled connection for as long as the stream stays open.
+        with session_scope() as db:
+            following = db.scalars(
+                select(Follow.followee_id).where(Follow.follower_id == user_id)
+            ).all()
+        actors = {str(user_id), *(str(followee_id) for followee_id in following)}
+
+    return StreamingResponse(
+        _stream_events(
+            get_feed_broker(),
+            last_event_id,
+            actors,
+            get_settings().feed_stream_heartbeat_seconds,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -11,6 +11,9 @@ from sqlalchemy.orm import Session
 from apps.api.db import get_db
 from apps.api.models import ListenEvent, ListenSource, Track, User
 from apps.api.schemas import ListenEventCreate, ListenEventRead
+from apps.api.services.feed import listen_activities, publish_activities
+from apps.api.services.listen_charts import record_listen_sketches
+from apps.api.services.trending import listen_trending_events, record_trending
 
 router = APIRouter(prefix="/listen-events", tags=["listen-events"])
 
@@ -88,6 +91,7 @@ async def upsert_listen_events(
 
     ingested_at = datetime.now(timezone.utc)
     stored: list[ListenEvent] = []
+    created: list[ListenEvent] = []
 
     for listen in payload.listens:
         _ensure_user_and_track(db, listen.user_id, listen.track_id)
@@ -104,7 +108,12 @@ async def upsert_listen_events(
         record = ListenEvent(**listen_data)
         db.add(record)
         stored.append(record)
+        created.append(record)
 
+    db.flush()
+    publish_activities(db, listen_activities(db, created))
+    record_trending(db, listen_trending_events(db, created))
+    record_listen_sketches(db, created)
     db.commit()
     for record in stored:
         db.refresh(record)
@@ -1,54 +1,199 @@
-"""Nomination endpoints with static responses."""
+"""Nomination endpoints: filtered listing and bulk creation for bot replays."""
+
+from __future__ import annotations
 
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql.elements import ColumnElement
 
-from apps.api.db import get_db
-from apps.api.schemas import NominationRead
+from apps.api.db import dialect_insert, get_db
+from apps.api.models import Album, Nomination, User, Week
+from apps.api.pagination import decode_cursor, encode_cursor
+from apps.api.schemas import NominationCreate, NominationRead
+from apps.api.services.feed import nomination_activities, publish_activities
+from apps.api.services.week_stats import refresh_week_stats
 
 router = APIRouter(prefix="/nominations", tags=["nominations"])
 
+MAX_BULK_NOMINATIONS = 500
+
+_NOMINATION_KEY = (Nomination.week_id, Nomination.user_id, Nomination.album_id)
+
+
+class NominationsPayload(BaseModel):
+    nominations: list[NominationCreate] = Field(
+        ...,
+        max_length=MAX_BULK_NOMINATIONS,
+        description="Nominations to create; existing (week, user, album) entries are kept.",
+    )
+
+
+class NominationBulkResult(BaseModel):
+    created: list[NominationRead]
+    existing: list[NominationRead]
+
+
+def _missing_ids(db: Session, id_column: InstrumentedAttribute[UUID], ids: set[UUID]) -> list[str]:
+    found = set(db.scalars(select(id_column).where(id_column.in_(ids))))
+    return sorted(str(missing) for missing in ids - found)
+
+
+def _after_cursor(cursor: str) -> ColumnElement[bool]:
+    payload = decode_cursor(cursor, kind="nominations")
+    try:
+        submitted_at = datetime.fromisoformat(payload["t"])
+        last_id = UUID(payload["id"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        ) from exc
+    return or_(
+        Nomination.submitted_at < submitted_at,
+        and_(Nomination.submitted_at == submitted_at, Nomination.id < last_id),
+    )
+
 
 @router.get("/", response_model=list[NominationRead])
-async def list_nominations(db: Session = Depends(get_db)) -> list[NominationRead]:
-    """Return placeholder nominations."""
-
-    _ = db
-    return [
-        NominationRead(
-            id=uuid4(),
-            week_id=uuid4(),
-            user_id=uuid4(),
-            album_id=uuid4(),
-            pitch="A classic electronic record everyone should revisit",
-            pitch_track_url="https://open.spotify.com/track/example",
-            genre="electronic",
-            decade="2000s",
-            country="France",
-            submitted_at=datetime(2024, 6, 30, 12, 0, tzinfo=timezone.utc),
+async def list_nominations(
+    response: Response,
+    db: Session = Depends(get_db),
+    week_id: UUID | None = Query(None, description="Only nominations for this week."),
+    user_id: UUID | None = Query(None, description="Only nominations by this user."),
+    album_id: UUID | None = Query(None, description="Only nominations of this album."),
+    genre: str | None = Query(None, description="Case-insensitive genre match."),
+    decade: str | None = Query(None, description="Case-insensitive decade match."),
+    country: str | None = Query(None, description="Case-insensitive country match."),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of nominations to return."),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page."),
+) -> list[NominationRead]:
+    """Return nominations, newest first.
+
+    When more nominations match, ``X-Next-Cursor`` holds the cursor for the
+    next page.
+    """
+
+    query = select(Nomination)
+    if week_id:
+        query = query.where(Nomination.week_id == week_id)
+    if user_id:
+        query = query.where(Nomination.user_id == user_id)
+    if album_id:
+        query = query.where(Nomination.album_id == album_id)
+    if genre:
+        query = query.where(func.lower(Nomination.genre) == genre.lower())
+    if decade:
+        query = query.where(func.lower(Nomination.decade) == decade.lower())
+    if country:
+        query = query.where(func.lower(Nomination.country) == country.lower())
+    if cursor:
+        query = query.where(_after_cursor(cursor))
+
+    nominations = list(
+        db.execute(
+            query.order_by(Nomination.submitted_at.desc(), Nomination.id.desc()).limit(limit + 1)
         )
-    ]
+        .scalars()
+        .all()
+    )
+    if len(nominations) > limit:
+        nominations = nominations[:limit]
+        last = nominations[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            {"k": "nominations", "t": last.submitted_at.isoformat(), "id": str(last.id)}
+        )
+    return [NominationRead.model_validate(nomination) for nomination in nominations]
 
 
 @router.get("/{nomination_id}", response_model=NominationRead)
 async def get_nomination(
     nomination_id: UUID, db: Session = Depends(get_db)
 ) -> NominationRead:
-    """Return a single nomination placeholder."""
-
-    _ = db
-    return NominationRead(
-        id=nomination_id,
-        week_id=uuid4(),
-        user_id=uuid4(),
-        album_id=uuid4(),
-        pitch="A shimmering slice of nu-disco",
-        pitch_track_url="https://open.spotify.com/track/another-example",
-        genre="disco",
-        decade="2010s",
-        country="UK",
-        submitted_at=datetime(2024, 6, 30, 13, 0, tzinfo=timezone.utc),
+    nomination = db.get(Nomination, nomination_id)
+    if not nomination:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nomination not found.")
+    return NominationRead.model_validate(nomination)
+
+
+@router.post(
+    "/bulk", response_model=NominationBulkResult, status_code=status.HTTP_201_CREATED
+)
+async def bulk_create_nominations(
+    payload: NominationsPayload, db: Session = Depends(get_db)
+) -> NominationBulkResult:
+    """Create many nominations at once, e.g. when the bot replays a thread.
+
+    Weeks, users and albums are checked with one query each and rows are
+    inserted in a single ``INSERT ... ON CONFLICT DO NOTHING``; nominations
+    that already exist for the same (week, user, album) are returned under
+    ``existing`` unchanged.
+    """
+
+    items: dict[tuple[UUID, UUID, UUID], NominationCreate] = {}
+    for item in payload.nominations:
+        items.setdefault((item.week_id, item.user_id, item.album_id), item)
+    if not items:
+        return NominationBulkResult(created=[], existing=[])
+
+    for id_column, ids, label in (
+        (Week.id, {key[0] for key in items}, "Weeks"),
+        (User.id, {key[1] for key in items}, "Users"),
+        (Album.id, {key[2] for key in items}, "Albums"),
+    ):
+        missing = _missing_ids(db, id_column, ids)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{label} not found: {', '.join(missing)}",
+            )
+
+    submitted_at = datetime.now(timezone.utc)
+    rows = [
+        {
+            **item.model_dump(),
+            "id": uuid4(),
+            "submitted_at": item.submitted_at or submitted_at,
+        }
+        for item in items.values()
+    ]
+    insert = dialect_insert(db)(Nomination)
+    created = list(
+        db.execute(
+            insert.values(rows)
+            .on_conflict_do_nothing(index_elements=[column.key for column in _NOMINATION_KEY])
+            .returning(Nomination)
+        )
+        .scalars()
+        .all()
+    )
+    created_keys = {(row.week_id, row.user_id, row.album_id) for row in created}
+    skipped = [key for key in items if key not in created_keys]
+    existing: list[Nomination] = []
+    if skipped:
+        existing = list(
+            db.execute(select(Nomination).where(tuple_(*_NOMINATION_KEY).in_(skipped)))
+            .scalars()
+            .all()
+        )
+
+    order = {key: position for position, key in enumerate(items)}
+    result = NominationBulkResult(
+        created=_in_order(created, order), existing=_in_order(existing, order)
     )
+
+    if created:
+        refresh_week_stats(db, {key[0] for key in created_keys})
+        publish_activities(db, nomination_activities(db, created))
+    db.commit()
+    return result
+
+
+def _in_order(
+    nominations: list[Nomination], order: dict[tuple[UUID, UUID, UUID], int]
+) -> list[NominationRead]:
+    nominations.sort(key=lambda row: order[(row.week_id, row.user_id, row.album_id)])
+    return [NominationRead.model_validate(row) for row in nominations]
@@ -1,28 +1,46 @@
 from __future__ import annotations
 
-from collections import Counter
+import csv
+import io
+import json
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from decimal import Decimal, ROUND_FLOOR
-from uuid import UUID
-
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from sqlalchemy import func, select
-from sqlalchemy.exc import IntegrityError
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import Select, and_, cast, func, literal, null, or_, select, union_all
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
-from apps.api.db import get_db
+from apps.api.conditional import etag_matches, make_etag, not_modified, set_etag
+from apps.api.db import dialect_insert, get_db, session_scope
 from apps.api.models.club import Nomination, Rating, Week
 from apps.api.models.music import Album
 from apps.api.models.user import User
+from apps.api.pagination import decode_cursor, encode_cursor
 from apps.api.schemas import (
     RatingCreate,
     RatingHistogramBin,
     RatingRead,
     RatingSummary,
+    WeekRatingSummary,
 )
+from apps.api.services.album_stats import RatingChange, apply_rating_changes
+from apps.api.services.feed import publish_activities, rating_activities
+from apps.api.services.trending import rating_trending_events, record_trending
+from apps.api.services.week_stats import apply_new_ratings, club_version, week_version
 
 router = APIRouter(tags=["ratings"])
 
+MAX_BATCH_RATINGS = 200
+
 
 def _require_week(db: Session, week_id: UUID) -> Week:
     week = db.get(Week, week_id)
@@ -39,63 +57,354 @@ def _require_week(db: Session, week_id: UUID) -> Week:
     return week
 
 
-def _require_user(db: Session, user_id: UUID) -> User:
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found.",
+@dataclass
+class _RatingContext:
+    """Everything rating validation needs, loaded in one round trip."""
+
+    week_found: bool = False
+    winner_album_id: UUID | None = None
+    users: set[UUID] = field(default_factory=set)
+    albums: set[UUID] = field(default_factory=set)
+    # nomination id -> (week_id, album_id)
+    nominations: dict[UUID, tuple[UUID, UUID]] = field(default_factory=dict)
+
+
+def _no_id() -> ColumnElement[UUID]:
+    # UNION columns need matching types on PostgreSQL; a bare NULL is text.
+    return cast(null(), Week.id.type)
+
+
+def _load_rating_context(
+    db: Session, week_id: UUID, payloads: list[RatingCreate]
+) -> _RatingContext:
+    """Fetch the week, users, albums and nominations of ``payloads`` in one query."""
+
+    user_ids = {payload.user_id for payload in payloads}
+    album_ids = {payload.album_id for payload in payloads}
+    nomination_ids = {payload.nomination_id for payload in payloads if payload.nomination_id}
+    parts: list[Select[tuple[Any, ...]]] = [
+        select(literal("week"), Week.id, Week.winner_album_id, _no_id()).where(Week.id == week_id),
+        select(literal("user"), User.id, _no_id(), _no_id()).where(User.id.in_(user_ids)),
+        select(literal("album"), Album.id, _no_id(), _no_id()).where(Album.id.in_(album_ids)),
+    ]
+    if nomination_ids:
+        parts.append(
+            select(
+                literal("nomination"), Nomination.id, Nomination.album_id, Nomination.week_id
+            ).where(Nomination.id.in_(nomination_ids))
         )
-    return user
-
 
-def _require_album(db: Session, album_id: UUID) -> Album:
-    album = db.get(Album, album_id)
-    if not album:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Album not found.",
+    context = _RatingContext()
+    for kind, row_id, album_id, row_week_id in db.execute(union_all(*parts)):
+        if kind == "week":
+            context.week_found = True
+            context.winner_album_id = album_id
+        elif kind == "user":
+            context.users.add(row_id)
+        elif kind == "album":
+            context.albums.add(row_id)
+        else:
+            context.nominations[row_id] = (row_week_id, album_id)
+    return context
+
+
+def _rating_error(
+    context: _RatingContext, week_id: UUID, payload: RatingCreate
+) -> tuple[int, str] | None:
+    """Return ``(status, detail)`` if ``payload`` cannot be stored, else ``None``."""
+
+    if not context.week_found:
+        return status.HTTP_404_NOT_FOUND, "Week not found."
+    if context.winner_album_id is None:
+        return status.HTTP_400_BAD_REQUEST, "Week does not yet have a winner album to rate."
+    if payload.user_id not in context.users:
+        return status.HTTP_404_NOT_FOUND, "User not found."
+    if payload.album_id not in context.albums:
+        return status.HTTP_404_NOT_FOUND, "Album not found."
+    if payload.nomination_id is not None:
+        nomination = context.nominations.get(payload.nomination_id)
+        if nomination is None:
+            return status.HTTP_404_NOT_FOUND, "Nomination not found."
+        if nomination[0] != week_id:
+            return status.HTTP_400_BAD_REQUEST, "Nomination does not belong to the requested week."
+        if nomination[1] != payload.album_id:
+            return status.HTTP_400_BAD_REQUEST, "Nomination album must match the rated album."
+    if payload.album_id != context.winner_album_id:
+        return status.HTTP_400_BAD_REQUEST, "Ratings must target the week's winning album."
+    if not 1.0 <= payload.value <= 5.0:
+        return status.HTTP_400_BAD_REQUEST, "Ratings must fall between 1.0 and 5.0."
+    return None
+
+
+def _insert_ratings(
+    db: Session, week_id: UUID, payloads: list[RatingCreate]
+) -> list[Rating]:
+    """Insert validated ratings in one statement and update the aggregates.
+
+    A user's second rating for the week is skipped by the
+    ``uq_rating_week_user`` constraint; only inserted rows are returned.
+    """
+
+    created_at = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid4(),
+            "week_id": week_id,
+            "user_id": payload.user_id,
+            "album_id": payload.album_id,
+            "nomination_id": payload.nomination_id,
+            "value": payload.value,
+            "favorite_track": payload.favorite_track,
+            "review": payload.review,
+            "created_at": payload.created_at or created_at,
+            "metadata_": payload.metadata_,
+        }
+        for payload in payloads
+    ]
+    insert = dialect_insert(db)(Rating).values(rows)
+    created = list(
+        db.execute(
+            insert.on_conflict_do_nothing(index_elements=[Rating.week_id, Rating.user_id])
+            .returning(Rating)
+        )
+        .scalars()
+        .all()
+    )
+    if created:
+        apply_new_ratings(db, week_id, [(rating.nomination_id, rating.value) for rating in created])
+        apply_rating_changes(
+            db,
+            [
+                RatingChange(new=(rating.album_id, rating.value, rating.created_at))
+                for rating in created
+            ],
         )
-    return album
+        publish_activities(db, rating_activities(db, created))
+        record_trending(db, rating_trending_events(db, created))
+    return created
 
 
-def _validate_nomination(
-    db: Session, nomination_id: UUID | None, week_id: UUID, album_id: UUID
-) -> Nomination | None:
-    if nomination_id is None:
-        return None
+# Nudges values that sit on a bin edge but divide to just under it in
+# floating point (0.3 / 0.1 == 2.999...) into the bin they belong to.
+BUCKET_EPSILON = 1e-9
 
-    nomination = db.get(Nomination, nomination_id)
-    if not nomination:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Nomination not found.",
+
+def _bin_value(step: float, bin_size: float) -> float:
+    return float(Decimal(int(step)) * Decimal(str(bin_size)))
+
+
+def _rating_summaries(
+    db: Session, week_ids: list[UUID] | None, include_histogram: bool, bin_size: float
+) -> dict[UUID, RatingSummary]:
+    """Rating summaries per week from one grouped query.
+
+    With ``include_histogram`` values are bucketed in SQL as
+    ``floor(value / bin_size)`` and only the bins are returned; ``week_ids``
+    of ``None`` covers every week that has ratings.
+    """
+
+    if include_histogram:
+        bucket = func.floor(Rating.value / bin_size + BUCKET_EPSILON).label("bucket")
+        stmt = (
+            select(Rating.week_id, bucket, func.count(Rating.id), func.sum(Rating.value))
+            .group_by(Rating.week_id, bucket)
+            .order_by(Rating.week_id, bucket)
         )
-    if nomination.week_id != week_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Nomination does not belong to the requested week.",
+    else:
+        stmt = select(
+            Rating.week_id, literal(None), func.count(Rating.id), func.sum(Rating.value)
+        ).group_by(Rating.week_id)
+    if week_ids is not None:
+        stmt = stmt.where(Rating.week_id.in_(week_ids))
+
+    totals: dict[UUID, list[float]] = defaultdict(lambda: [0, 0.0])
+    bins: dict[UUID, list[RatingHistogramBin]] = defaultdict(list)
+    for week_id, step, count, total in db.execute(stmt):
+        totals[week_id][0] += count
+        totals[week_id][1] += float(total)
+        if include_histogram:
+            bins[week_id].append(
+                RatingHistogramBin(value=_bin_value(step, bin_size), count=count)
+            )
+
+    summaries = {
+        week_id: RatingSummary(
+            average=total / count,
+            count=int(count),
+            histogram=bins[week_id] if include_histogram else None,
         )
-    if nomination.album_id != album_id:
+        for week_id, (count, total) in totals.items()
+    }
+    for week_id in week_ids or []:
+        summaries.setdefault(week_id, RatingSummary(average=None, count=0))
+    return summaries
+
+
+def _rating_filters(
+    week_id: UUID | None, user_id: UUID | None, album_id: UUID | None
+) -> list[ColumnElement[bool]]:
+    filters = []
+    if week_id:
+        filters.append(Rating.week_id == week_id)
+    if user_id:
+        filters.append(Rating.user_id == user_id)
+    if album_id:
+        filters.append(Rating.album_id == album_id)
+    return filters
+
+
+def _after_cursor(cursor: str) -> ColumnElement[bool]:
+    payload = decode_cursor(cursor, kind="ratings")
+    try:
+        created_at = datetime.fromisoformat(payload["t"])
+        last_id = UUID(payload["id"])
+    except (KeyError, TypeError, ValueError) as exc:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Nomination album must match the rated album.",
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        ) from exc
+    return or_(
+        Rating.created_at < created_at,
+        and_(Rating.created_at == created_at, Rating.id < last_id),
+    )
+
+
+@router.get("/ratings", response_model=list[RatingRead])
+async def list_ratings(
+    response: Response,
+    db: Session = Depends(get_db),
+    week_id: UUID | None = Query(None, description="Only ratings for this week."),
+    user_id: UUID | None = Query(None, description="Only ratings by this user."),
+    album_id: UUID | None = Query(None, description="Only ratings of this album."),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of ratings to return."),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page."),
+) -> list[RatingRead]:
+    """Return ratings, newest first.
+
+    When more ratings match, ``X-Next-Cursor`` holds the cursor for the next
+    page. Use ``/ratings/export`` to download everything.
+    """
+
+    query = select(Rating).where(*_rating_filters(week_id, user_id, album_id))
+    if cursor:
+        query = query.where(_after_cursor(cursor))
+    ratings = list(
+        db.execute(query.order_by(Rating.created_at.desc(), Rating.id.desc()).limit(limit + 1))
+        .scalars()
+        .all()
+    )
+    if len(ratings) > limit:
+        ratings = ratings[:limit]
+        last = ratings[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            {"k": "ratings", "t": last.created_at.isoformat(), "id": str(last.id)}
         )
+    return [RatingRead.model_validate(rating) for rating in ratings]
 
-    return nomination
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
 
-def _bucket_value(value: float, bin_size: float) -> float:
-    quantizer = Decimal(str(bin_size))
-    decimal_value = Decimal(str(value))
-    steps = (decimal_value / quantizer).to_integral_value(rounding=ROUND_FLOOR)
-    return float(steps * quantizer)
 
+EXPORT_BATCH_SIZE = 1000
+_EXPORT_COLUMNS = (
+    Rating.id,
+    Rating.week_id,
+    Rating.user_id,
+    Rating.album_id,
+    Rating.nomination_id,
+    Rating.value,
+    Rating.favorite_track,
+    Rating.review,
+    Rating.created_at,
+    Rating.metadata_.label("metadata"),
+)
+_EXPORT_FIELDS = [column.key for column in _EXPORT_COLUMNS]
 
-@router.get("/ratings", response_model=list[RatingRead])
-async def list_ratings(db: Session = Depends(get_db)) -> list[RatingRead]:
-    ratings = db.execute(select(Rating)).scalars().all()
-    return [RatingRead.model_validate(rating) for rating in ratings]
+
+def _export_value(value: object) -> object:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _export_chunks(filters: list[ColumnElement[bool]], fmt: ExportFormat) -> Iterator[str]:
+    """Yield the export one batch at a time from a server-side cursor.
+
+    Runs on its own session: the request's session is closed before a
+    streaming body is sent.
+    """
+
+    with session_scope() as db:
+        result = db.execute(
+            select(*_EXPORT_COLUMNS)
+            .where(*filters)
+            .order_by(Rating.created_at, Rating.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if fmt is ExportFormat.CSV:
+            writer.writerow(_EXPORT_FIELDS)
+        for batch in result.partitions():
+            for row in batch:
+                values = [_export_value(value) for value in row]
+                if fmt is ExportFormat.CSV:
+                    metadata = values[-1]
+                    values[-1] = json.dumps(metadata) if metadata is not None else ""
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(_EXPORT_FIELDS, values))))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+
+@router.get("/ratings/export")
+async def export_ratings(
+    week_id: UUID | None = Query(None, description="Only ratings for this week."),
+    user_id: UUID | None = Query(None, description="Only ratings by this user."),
+    album_id: UUID | None = Query(None, description="Only ratings of this album."),
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv."),
+) -> StreamingResponse:
+    """Stream every matching rating, oldest first, in constant memory."""
+
+    media_type = "application/x-ndjson" if format is ExportFormat.NDJSON else "text/csv"
+    return StreamingResponse(
+        _export_chunks(_rating_filters(week_id, user_id, album_id), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="ratings.{format.value}"'},
+    )
+
+
+@router.get("/ratings/summaries", response_model=list[WeekRatingSummary])
+async def list_week_rating_summaries(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    week_id: list[UUID] | None = Query(
+        None, description="Weeks to summarise; omit for every week with ratings."
+    ),
+    include_histogram: bool = Query(False, description="Return histogram bins."),
+    bin_size: float = Query(0.5, gt=0, description="Histogram bin size."),
+) -> list[WeekRatingSummary] | Response:
+    """Rating summaries (and histograms) for many weeks in one grouped query."""
+
+    etag = make_etag("ratings-summaries", *club_version(db), request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    week_ids = list(dict.fromkeys(week_id)) if week_id is not None else None
+    summaries = _rating_summaries(db, week_ids, include_histogram, bin_size)
+    return [
+        WeekRatingSummary(week_id=key, **summaries[key].model_dump())
+        for key in (week_ids if week_ids is not None else summaries)
+    ]
 
 
 @router.get("/ratings/{rating_id}", response_model=RatingRead)
@@ -117,62 +426,83 @@ async def get_rating(rating_id: UUID, db: Session = Depends(get_db)) -> RatingRe
 async def create_week_rating(
     week_id: UUID,
     payload: RatingCreate,
-    response: Response,
     db: Session = Depends(get_db),
 ) -> RatingRead:
-    week = _require_week(db, week_id)
-    _require_user(db, payload.user_id)
-    _require_album(db, payload.album_id)
-    _validate_nomination(db, payload.nomination_id, week_id, payload.album_id)
-
-    if payload.album_id != week.winner_album_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Ratings must target the week's winning album.",
-        )
-
-    if not 1.0 <= payload.value <= 5.0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Ratings must fall between 1.0 and 5.0.",
-        )
+    context = _load_rating_context(db, week_id, [payload])
+    error = _rating_error(context, week_id, payload)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
 
-    existing_rating = db.execute(
-        select(Rating).where(
-            Rating.week_id == week_id,
-            Rating.user_id == payload.user_id,
-        )
-    ).scalar_one_or_none()
-    if existing_rating:
+    created = _insert_ratings(db, week_id, [payload])
+    if not created:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="User has already submitted a rating for this week.",
         )
+    rating = RatingRead.model_validate(created[0])
+    db.commit()
+    return rating
 
-    rating = Rating(
-        week_id=week_id,
-        user_id=payload.user_id,
-        album_id=payload.album_id,
-        nomination_id=payload.nomination_id,
-        value=payload.value,
-        favorite_track=payload.favorite_track,
-        review=payload.review,
-        created_at=payload.created_at or datetime.now(timezone.utc),
-        metadata=payload.metadata,
+
+class RatingsPayload(BaseModel):
+    ratings: list[RatingCreate] = Field(
+        ..., max_length=MAX_BATCH_RATINGS, description="Ratings for the week's winning album."
     )
 
-    db.add(rating)
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="User has already submitted a rating for this week.",
-        )
 
-    db.refresh(rating)
-    return RatingRead.model_validate(rating)
+class RatingBatchResult(BaseModel):
+    created: list[RatingRead]
+    existing: list[RatingRead]
+
+
+@router.post(
+    "/weeks/{week_id}/ratings/batch",
+    response_model=RatingBatchResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_week_ratings(
+    week_id: UUID, payload: RatingsPayload, db: Session = Depends(get_db)
+) -> RatingBatchResult:
+    """Store many ratings for a week at once, e.g. after a listening party.
+
+    The batch is validated as a whole from one lookup query and nothing is
+    stored if any entry is invalid. Users who already rated the week (or
+    appear twice) are returned under ``existing`` with their stored rating.
+    """
+
+    items: dict[UUID, RatingCreate] = {}
+    for item in payload.ratings:
+        items.setdefault(item.user_id, item)
+    payloads = list(items.values())
+    if not payloads:
+        return RatingBatchResult(created=[], existing=[])
+
+    context = _load_rating_context(db, week_id, payload.ratings)
+    for index, item in enumerate(payload.ratings):
+        error = _rating_error(context, week_id, item)
+        if error:
+            raise HTTPException(status_code=error[0], detail=f"ratings[{index}]: {error[1]}")
+
+    created = _insert_ratings(db, week_id, payloads)
+    created_users = {rating.user_id for rating in created}
+    skipped = [item.user_id for item in payloads if item.user_id not in created_users]
+    existing: list[Rating] = []
+    if skipped:
+        existing = list(
+            db.execute(select(Rating).where(Rating.week_id == week_id, Rating.user_id.in_(skipped)))
+            .scalars()
+            .all()
+        )
+    order = {user_id: position for position, user_id in enumerate(items)}
+    created.sort(key=lambda rating: order[rating.user_id])
+    existing.sort(key=lambda rating: order[rating.user_id])
+    result = RatingBatchResult(
+        created=[RatingRead.model_validate(rating) for rating in created],
+        existing=[RatingRead.model_validate(rating) for rating in existing],
+    )
+    db.commit()
+    return result
 
 
 @router.get(
@@ -181,32 +511,19 @@ async def create_week_rating(
 )
 async def get_week_rating_summary(
     week_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     include_histogram: bool = Query(False, description="Return histogram bins."),
     bin_size: float = Query(0.5, gt=0, description="Histogram bin size."),
-) -> RatingSummary:
+) -> RatingSummary | Response:
     _require_week(db, week_id)
 
-    stats = db.execute(
-        select(func.avg(Rating.value), func.count(Rating.id)).where(
-            Rating.week_id == week_id
-        )
-    ).one()
-    average = float(stats[0]) if stats[0] is not None else None
-    count = int(stats[1] or 0)
-
-    histogram: list[RatingHistogramBin] | None = None
-    if include_histogram and count:
-        values = db.execute(
-            select(Rating.value).where(Rating.week_id == week_id)
-        ).scalars().all()
-        counter: Counter[float] = Counter()
-        for value in values:
-            counter[_bucket_value(value, bin_size)] += 1
-
-        histogram = [
-            RatingHistogramBin(value=bucket, count=bucket_count)
-            for bucket, bucket_count in sorted(counter.items())
-        ]
-
-    return RatingSummary(average=average, count=count, histogram=histogram)
+    etag = make_etag(
+        "week-ratings", week_id, week_version(db, week_id), include_histogram, bin_size
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    return _rating_summaries(db, [week_id], include_histogram, bin_size)[week_id]
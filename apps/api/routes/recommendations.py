@@ -6,33 +6,32 @@ list[ { type: 'album'|'track', id, title, artist_name, [album_title], [reason] }
 
 from __future__ import annotations
 
+from uuid import UUID
+
 from fastapi import APIRouter, Query, Depends
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from apps.api.db import get_db
-from apps.api.models import Album, ListenEvent, Track, Rating
+from apps.api.models import Album, AlbumRatingStats, Track
+from apps.api.services.listen_charts import load_chart
 
 router = APIRouter(tags=["recommendations"])
 
+# Listening history considered for "top artists/tracks" seeds.
+CHART_DAYS = 90
+
 
 @router.get("/recommendations")
 async def get_recommendations(
-    user_id: str = Query(..., description="User ID for whom to fetch recommendations"),
+    user_id: UUID = Query(..., description="User ID for whom to fetch recommendations"),
     db: Session = Depends(get_db),
-) -> list[dict[str, str]]:
-    items: list[dict[str, str]] = []
+) -> list[dict[str, str | None]]:
+    items: list[dict[str, str | None]] = []
 
-    # 1) Seed from user's top artists by listen count
-    top_artists_stmt = (
-        select(Track.artist_name, func.count(ListenEvent.id).label("cnt"))
-        .join(Track, ListenEvent.track_id == Track.id)
-        .where(ListenEvent.user_id == user_id)
-        .group_by(Track.artist_name)
-        .order_by(func.count(ListenEvent.id).desc())
-        .limit(3)
-    )
-    top_artists = [row[0] for row in db.execute(top_artists_stmt).all()]
+    # 1) Seed from user's top artists by listen count (approximate charts)
+    artist_chart = load_chart(db, "artist", user_id=user_id, days=CHART_DAYS)
+    top_artists = [artist_name for artist_name, _count in artist_chart.summary.top(3)]
 
     if top_artists:
         albums_stmt = (
@@ -53,15 +52,12 @@ async def get_recommendations(
             )
 
     # 2) Add a few top tracks by play count as track recs
-    top_tracks_stmt = (
-        select(Track, func.count(ListenEvent.id).label("cnt"))
-        .join(Track, ListenEvent.track_id == Track.id)
-        .where(ListenEvent.user_id == user_id)
-        .group_by(Track.id)
-        .order_by(func.count(ListenEvent.id).desc())
-        .limit(3)
-    )
-    for t, _cnt in db.execute(top_tracks_stmt).all():
+    track_chart = load_chart(db, "track", user_id=user_id, days=CHART_DAYS)
+    top_track_ids = [UUID(track_id) for track_id, _count in track_chart.summary.top(3)]
+    tracks = {
+        t.id: t for t in db.execute(select(Track).where(Track.id.in_(top_track_ids))).scalars()
+    }
+    for t in (tracks[track_id] for track_id in top_track_ids if track_id in tracks):
         items.append(
             {
                 "type": "track",
@@ -76,13 +72,16 @@ async def get_recommendations(
     # 3) Fallback to club trending albums if user has no listens
     if not items:
         trending_stmt = (
-            select(Album, func.avg(Rating.value).label("avg"), func.count(Rating.id).label("cnt"))
-            .join(Album, Rating.album_id == Album.id)
-            .group_by(Album.id)
-            .order_by(func.count(Rating.id).desc(), func.avg(Rating.value).desc())
+            select(Album)
+            .join(AlbumRatingStats, AlbumRatingStats.album_id == Album.id)
+            .where(AlbumRatingStats.rating_count > 0)
+            .order_by(
+                AlbumRatingStats.rating_count.desc(),
+                (AlbumRatingStats.rating_sum / AlbumRatingStats.rating_count).desc(),
+            )
             .limit(3)
         )
-        for a, _avg, _cnt in db.execute(trending_stmt).all():
+        for a in db.execute(trending_stmt).scalars().all():
             items.append(
                 {
                     "type": "album",
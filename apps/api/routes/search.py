@@ -1,80 +1,372 @@
-"""Search endpoint backed by the database with MusicBrainz fallback for albums."""
+"""Search endpoint backed by the database with background MusicBrainz fallback for albums."""
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Query, Depends
-from sqlalchemy import or_, select
+import asyncio
+import logging
+import sqlite3
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
+from typing import Any, Literal, cast
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, func, literal, select, text
 from sqlalchemy.orm import Session, joinedload
 
-from apps.api.db import get_db
-from apps.api.models import Album, Track, User
-from apps.api.services.metadata import upsert_album_from_release_group
+from apps.api.config import get_settings
+from apps.api.db import get_db, session_scope
+from apps.api.models import Album, AlbumRatingStats, Track, User
+from apps.api.pagination import decode_cursor, encode_cursor
+from apps.api.services.listen_charts import load_chart
+from apps.api.services.remote_search import RemoteStatus, album_resolver
+from apps.api.services.search_index import match_tier, relevance_score, text_search_clause
+from apps.api.services.search_rankings import search_rankings
+from apps.api.services.suggest import get_suggestion_index
 
 router = APIRouter(tags=["search"])
+logger = logging.getLogger(__name__)
+
+
+SECTIONS = ("users", "albums", "tracks")
+# Queries shorter than this never fall back to MusicBrainz.
+REMOTE_MIN_LENGTH = 3
+TRACK_POPULARITY_WINDOW = timedelta(days=30)
+# SQLite virtual machine instructions between deadline checks.
+SQLITE_PROGRESS_STEPS = 10_000
+
+
+@dataclass
+class SectionPage:
+    rows: list[dict[str, object]]
+    next_cursor: str | None
+    remote_status: RemoteStatus | None = None
+
+
+def _album_dict(album: Album) -> dict[str, object]:
+    return {
+        "id": str(album.id),
+        "title": album.title,
+        "artist_name": album.artist_name,
+        "release_year": album.release_year,
+    }
+
+
+def _remote_albums(
+    db: Session, query: str, background_tasks: BackgroundTasks
+) -> tuple[RemoteStatus, list[Album]]:
+    """Return cached MusicBrainz results for ``query``, queueing a lookup if needed."""
+
+    state, album_id = album_resolver.lookup(query)
+    if state is RemoteStatus.RESOLVED:
+        album = db.get(Album, album_id)
+        return state, [album] if album is not None else []
+    if state is RemoteStatus.IDLE and album_resolver.claim(query):
+        background_tasks.add_task(album_resolver.resolve, query)
+        state = RemoteStatus.PENDING
+    return state, []
+
+
+@contextmanager
+def _section_session(timeout_ms: int) -> Iterator[Session]:
+    """A session whose statements the database abandons after ``timeout_ms``.
+
+    ``asyncio.wait_for`` stops waiting for a slow section but cannot stop its
+    worker thread, so the database has to: PostgreSQL through
+    ``statement_timeout`` and SQLite through a progress handler that
+    interrupts statements past the deadline. On other backends a timed-out
+    section keeps its thread and connection until its query finishes.
+    """
+
+    with session_scope() as db:
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            db.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {"timeout": str(timeout_ms)},
+            )
+        if dialect != "sqlite":
+            yield db
+            return
+        raw = cast(sqlite3.Connection, db.connection().connection.driver_connection)
+        deadline = time.monotonic() + timeout_ms / 1000
+        raw.set_progress_handler(lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+        try:
+            yield db
+        finally:
+            # The connection goes back to the pool; later users get no deadline.
+            raw.set_progress_handler(None, 0)
+
+
+def _rank(
+    db: Session, model: Any, query: str, columns: tuple[Any, ...], popularity: Any
+) -> list[uuid.UUID]:
+    """Ids of the ``SEARCH_CANDIDATE_LIMIT`` best matches of ``query``, best first.
+
+    ``popularity`` is a count read without aggregation (a maintained column
+    or chart counts). Candidates are picked by match tier and popularity,
+    then ordered by relevance score and id.
+    """
+
+    candidates = (
+        select(model.id.label("id"), popularity.label("popularity"))
+        .where(text_search_clause(model, query, *columns))
+        .order_by(match_tier(query, columns).desc(), popularity.desc(), model.id)
+        .limit(get_settings().search_candidate_limit)
+        .subquery()
+    )
+    score = relevance_score(
+        db.get_bind().dialect.name, query, columns, candidates.c.popularity
+    )
+    return list(
+        db.scalars(
+            select(model.id)
+            .join(candidates, candidates.c.id == model.id)
+            .order_by(score.desc(), model.id)
+        )
+    )
+
+
+def _ranked_page(
+    db: Session,
+    section: str,
+    model: Any,
+    query: str,
+    columns: tuple[Any, ...],
+    popularity: Any,
+    *,
+    after: dict[str, Any] | None,
+    limit: int,
+    options: tuple[Any, ...] = (),
+) -> tuple[list[Any], str | None]:
+    """One page of ``model`` rows matching ``query``, best first.
+
+    The first page ranks the candidates (:func:`_rank`) and keeps the order
+    in :data:`search_rankings`; later pages are slices of that frozen order,
+    so popularity changing in between cannot skip or repeat rows, and cost a
+    primary-key lookup. Results end after ``SEARCH_CANDIDATE_LIMIT`` rows.
+    """
+
+    key = query.lower()
+    ids = None
+    start = 0
+    if after is not None:
+        token, start = after.get("t", ""), after.get("o", 0)
+        ids = search_rankings.get(token, section, key)
+    if ids is None:
+        ids = tuple(_rank(db, model, query, columns, popularity))
+        token = search_rankings.store(section, key, list(ids))
+        if after is not None:
+            # The ranking expired or lives in another worker: resume after
+            # the last row served from the old one.
+            last_id = uuid.UUID(after["id"])
+            start = ids.index(last_id) + 1 if last_id in ids else min(start, len(ids))
+
+    page_ids = ids[start : start + limit]
+    found = {
+        row.id: row
+        for row in db.scalars(select(model).where(model.id.in_(page_ids)).options(*options))
+        .unique()
+    }
+    rows = [found[row_id] for row_id in page_ids if row_id in found]
+
+    next_cursor = None
+    end = start + len(page_ids)
+    if end < len(ids):
+        next_cursor = encode_cursor(
+            {"k": section, "q": key, "t": token, "o": end, "id": str(page_ids[-1])}
+        )
+    return rows, next_cursor
+
+
+def _search_users(
+    query: str, timeout_ms: int, after: dict[str, Any] | None, limit: int
+) -> SectionPage:
+    with _section_session(timeout_ms) as db:
+        rows, next_cursor = _ranked_page(
+            db, "users", User, query, (User.display_name, User.handle), User.follower_count,
+            after=after, limit=limit,
+        )
+        users: list[dict[str, object]] = [
+            {"id": str(u.id), "display_name": u.display_name, "handle": u.handle} for u in rows
+        ]
+        return SectionPage(users, next_cursor)
+
+
+def _search_albums(
+    query: str,
+    timeout_ms: int,
+    after: dict[str, Any] | None,
+    limit: int,
+    background_tasks: BackgroundTasks,
+) -> SectionPage:
+    club_ratings = func.coalesce(
+        select(AlbumRatingStats.rating_count)
+        .where(AlbumRatingStats.album_id == Album.id)
+        .scalar_subquery(),
+        0,
+    )
+    with _section_session(timeout_ms) as db:
+        rows, next_cursor = _ranked_page(
+            db, "albums", Album, query, (Album.title, Album.artist_name), club_ratings,
+            after=after, limit=limit,
+        )
+        remote_status = None
+        # If no albums found, resolve the query as an album title on
+        # MusicBrainz without blocking this request.
+        if not rows and after is None and len(query) >= REMOTE_MIN_LENGTH:
+            remote_status, rows = _remote_albums(db, query, background_tasks)
+        return SectionPage([_album_dict(a) for a in rows], next_cursor, remote_status)
+
+
+def _search_tracks(
+    query: str, timeout_ms: int, after: dict[str, Any] | None, limit: int
+) -> SectionPage:
+    with _section_session(timeout_ms) as db:
+        # Club chart plays; tracks outside the chart rank as unplayed.
+        chart = load_chart(db, "track", days=TRACK_POPULARITY_WINDOW.days)
+        plays = {
+            uuid.UUID(track_id): count for track_id, count in chart.summary.counters.items()
+        }
+        listens = case(plays, value=Track.id, else_=0) if plays else literal(0)
+        # Include album title via relationship
+        rows, next_cursor = _ranked_page(
+            db, "tracks", Track, query, (Track.title, Track.artist_name), listens,
+            after=after, limit=limit, options=(joinedload(Track.album),),
+        )
+        tracks: list[dict[str, object]] = [
+            {
+                "id": str(t.id),
+                "title": t.title,
+                "artist_name": t.artist_name,
+                "album_title": t.album.title if t.album else None,
+            }
+            for t in rows
+        ]
+        return SectionPage(tracks, next_cursor)
+
+
+async def _run_section(
+    name: str, timeout_ms: int, func: Callable[[], SectionPage]
+) -> SectionPage | None:
+    """Run one sub-search on a worker thread; ``None`` if it fails or times out."""
+
+    try:
+        return await asyncio.wait_for(run_in_threadpool(func), timeout_ms / 1000)
+    except TimeoutError:
+        logger.warning("Search section %s timed out after %d ms", name, timeout_ms)
+    except Exception:
+        logger.exception("Search section %s failed", name)
+    return None
 
 
 @router.get("/search")
 async def search(
+    response: Response,
+    background_tasks: BackgroundTasks,
     q: str = Query("", description="Free text search query"),
-    db: Session = Depends(get_db),
-) -> dict[str, list[dict[str, object]]]:
+    section: Literal["users", "albums", "tracks"] | None = Query(
+        None, alias="type", description="Search only this section"
+    ),
+    cursor: str | None = Query(None, description="next_cursors value from the previous page"),
+    limit: int = Query(10, ge=1, le=50, description="Results per section"),
+) -> dict[str, object]:
+    """Search users, albums and tracks, best matches first.
+
+    Results are ranked by exact, prefix and fuzzy match plus popularity
+    (followers, club ratings, 30-day club chart plays) among the
+    ``SEARCH_CANDIDATE_LIMIT`` best matches per section, which is also the
+    most results a section pages through. ``next_cursors`` holds a cursor per
+    section with more results; pass it back as ``cursor`` (the section is
+    implied) to fetch the next page of that section only. Later pages follow
+    the order ranked for the first page.
+
+    The sections run concurrently on separate pooled connections, each
+    bounded by ``SEARCH_SECTION_TIMEOUT_MS``; a section that times out or
+    fails comes back empty and is listed in ``X-Search-Incomplete``.
+
+    When no local album matches, a MusicBrainz lookup is queued in the
+    background and ``X-Remote-Search`` reports its status; poll
+    ``/search/remote`` or repeat the search to pick up the result.
+    """
+
     query = (q or "").strip()
-    like = f"%{query}%"
+    after = None
+    if cursor:
+        after = decode_cursor(cursor, kind=section)
+        if after.get("q") != query.lower() or after.get("k") not in SECTIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not belong to this search.",
+            )
+        section = after["k"]
 
-    # Users
-    users_q = (
-        select(User)
-        .where(or_(User.display_name.ilike(like), User.handle.ilike(like)))
-        .limit(10)
-    )
-    users_rows = db.execute(users_q).scalars().all() if query else []
-    users = [
-        {"id": str(u.id), "display_name": u.display_name, "handle": u.handle}
-        for u in users_rows
-    ]
-
-    # Albums
-    albums_q = (
-        select(Album)
-        .where(or_(Album.title.ilike(like), Album.artist_name.ilike(like)))
-        .limit(10)
-    )
-    album_rows = db.execute(albums_q).scalars().all() if query else []
-    # If no albums found, attempt MB search and upsert (treat entire query as album title)
-    if not album_rows and len(query) >= 3:
-        try:
-            album = upsert_album_from_release_group(db, artist_name=None, album_title=query)
-            if album is not None:
-                album_rows = [album]
-        except Exception:
-            pass
-
-    albums = [
-        {
-            "id": str(a.id),
-            "title": a.title,
-            "artist_name": a.artist_name,
-            "release_year": a.release_year,
-        }
-        for a in album_rows
-    ]
-
-    # Tracks (include album title via relationship)
-    tracks_q = (
-        select(Track)
-        .options(joinedload(Track.album))
-        .where(or_(Track.title.ilike(like), Track.artist_name.ilike(like)))
-        .limit(10)
+    sections: dict[str, list[dict[str, object]] | None] = dict.fromkeys(SECTIONS, [])
+    next_cursors: dict[str, str | None] = dict.fromkeys(SECTIONS)
+    if not query:
+        return {**sections, "next_cursors": next_cursors}
+
+    timeout_ms = get_settings().search_section_timeout_ms
+    wanted: list[str] = [section] if section else list(SECTIONS)
+    calls: dict[str, Callable[[], SectionPage]] = {
+        "users": partial(_search_users, query, timeout_ms, after, limit),
+        "albums": partial(_search_albums, query, timeout_ms, after, limit, background_tasks),
+        "tracks": partial(_search_tracks, query, timeout_ms, after, limit),
+    }
+    results = await asyncio.gather(
+        *(_run_section(name, timeout_ms, calls[name]) for name in wanted)
     )
-    track_rows = db.execute(tracks_q).scalars().all() if query else []
-    tracks = [
-        {
-            "id": str(t.id),
-            "title": t.title,
-            "artist_name": t.artist_name,
-            "album_title": t.album.title if t.album else None,
-        }
-        for t in track_rows
-    ]
 
-    return {"users": users, "albums": albums, "tracks": tracks}
+    remote_status = None
+    for name, result in zip(wanted, results):
+        if result is None:
+            sections[name] = None
+            continue
+        sections[name], next_cursors[name] = result.rows, result.next_cursor
+        if name == "albums":
+            remote_status = result.remote_status
+
+    incomplete = [name for name, rows in sections.items() if rows is None]
+    if incomplete:
+        response.headers["X-Search-Incomplete"] = ",".join(incomplete)
+    if remote_status is not None:
+        response.headers["X-Remote-Search"] = remote_status.value
+    return {
+        **{name: rows or [] for name, rows in sections.items()},
+        "next_cursors": next_cursors,
+    }
+
+
+@router.get("/search/remote")
+async def search_remote(
+    background_tasks: BackgroundTasks,
+    q: str = Query(..., min_length=REMOTE_MIN_LENGTH, description="Album title to resolve"),
+    db: Session = Depends(get_db),
+) -> dict[str, object]:
+    """Status and result of the background MusicBrainz lookup for ``q``."""
+
+    state, albums = _remote_albums(db, q.strip(), background_tasks)
+    return {"status": state.value, "albums": [_album_dict(a) for a in albums]}
+
+
+@router.get("/search/suggest")
+async def suggest(
+    q: str = Query("", description="Prefix typed so far"),
+    limit: int = Query(10, ge=1, le=25),
+    types: list[Literal["user", "album", "artist", "track"]] | None = Query(
+        None, alias="type", description="Restrict to these suggestion types"
+    ),
+) -> dict[str, list[dict[str, object]]]:
+    """Prefix suggestions for the command palette, served from memory.
+
+    The index refreshes in the background, so new catalog rows appear within
+    ``SEARCH_SUGGEST_REFRESH_SECONDS``.
+    """
+
+    suggestions = get_suggestion_index().lookup(q, limit=limit, types=types)
+    return {"suggestions": [suggestion.as_dict() for suggestion in suggestions]}
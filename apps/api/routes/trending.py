@@ -1,44 +1,131 @@
-"""Trending endpoints backed by DB aggregates (ratings/listens)."""
+"""Trending endpoints served from published trending snapshots."""
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from apps.api.conditional import etag_matches, make_etag, not_modified, set_etag
 from apps.api.db import get_db
-from apps.api.models import Album, Rating
+from apps.api.pagination import decode_cursor, encode_cursor
+from apps.api.services.trending import (
+    TrendingEntity,
+    snapshot_entries_query,
+    trending_snapshot,
+    trending_windows,
+)
 
 router = APIRouter(tags=["trending"])
 
 
-@router.get("/trending")
-async def get_trending(db: Session = Depends(get_db)) -> list[dict[str, object]]:
-    # Aggregate ratings by album
-    stmt = (
-        select(
-            Album.id,
-            Album.title,
-            Album.artist_name,
-            func.avg(Rating.value).label("avg"),
-            func.count(Rating.id).label("cnt"),
+class TrendingItem(BaseModel):
+    """A ranked album, track or artist; ``id`` is the artist name for artists."""
+
+    rank: int
+    type: TrendingEntity
+    id: str
+    title: str
+    artist_name: str | None = None
+    score: float
+
+
+class TrendingPage(BaseModel):
+    """One page of a trending snapshot.
+
+    ``snapshot_id``, ``generated_at`` and ``age_seconds`` are ``None`` until
+    the first snapshot is published.
+    """
+
+    snapshot_id: int | None
+    generated_at: datetime | None
+    age_seconds: float | None
+    window: str
+    type: TrendingEntity
+    items: list[TrendingItem]
+
+
+def _decode_trending_cursor(cursor: str) -> tuple[int, int]:
+    payload = decode_cursor(cursor, kind="trending")
+    snapshot_id, rank = payload.get("snap"), payload.get("rank")
+    if not isinstance(snapshot_id, int) or not isinstance(rank, int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+    return snapshot_id, rank
+
+
+@router.get("/trending", response_model=TrendingPage)
+async def get_trending(
+    request: Request,
+    response: Response,
+    entity_type: TrendingEntity = Query(TrendingEntity.ALBUM, alias="type"),
+    window: str = Query("7d", description="One of the configured TRENDING_WINDOWS."),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page."),
+    db: Session = Depends(get_db),
+) -> TrendingPage | Response:
+    """Albums, tracks or artists ranked by decayed listen and rating activity.
+
+    Reads the current snapshot published by ``snapshot-trending``; ``score``
+    is the activity as of ``generated_at``. A cursor keeps paging the
+    snapshot it started on while that snapshot is retained. When more
+    entries follow, ``X-Next-Cursor`` holds the cursor for the next page.
+    """
+
+    windows = trending_windows()
+    if window not in windows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown trending window; expected one of: {', '.join(windows)}.",
         )
-        .join(Album, Rating.album_id == Album.id)
-        .group_by(Album.id, Album.title, Album.artist_name)
-        .order_by(func.count(Rating.id).desc(), func.avg(Rating.value).desc())
-        .limit(10)
+    snapshot_id, after_rank = _decode_trending_cursor(cursor) if cursor else (None, 0)
+    snapshot = trending_snapshot(db, snapshot_id)
+    if snapshot is None and snapshot_id is not None:
+        # The cursor's snapshot was retired; continue on the current one.
+        snapshot = trending_snapshot(db)
+
+    # A snapshot never changes once published, so its id identifies the page.
+    etag = make_etag(
+        "trending", snapshot.id if snapshot else 0, window, entity_type.value, after_rank, limit
     )
-    rows = db.execute(stmt).all()
-    out: list[dict[str, object]] = []
-    for r in rows[:3]:
-        out.append(
-            {
-                "type": "album",
-                "id": str(r[0]),
-                "title": r[1],
-                "artist_name": r[2],
-                "average": float(r[3]) if r[3] is not None else None,
-                "count": int(r[4]),
-            }
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    page = TrendingPage(
+        snapshot_id=None,
+        generated_at=None,
+        age_seconds=None,
+        window=window,
+        type=entity_type,
+        items=[],
+    )
+    if snapshot is None:
+        return page
+
+    rows = db.execute(
+        snapshot_entries_query(snapshot.id, window, entity_type, limit + 1, after_rank)
+    ).all()
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            {"k": "trending", "snap": snapshot.id, "rank": rows[limit - 1].rank}
+        )
+    generated_at = snapshot.created_at
+    if generated_at.tzinfo is None:
+        generated_at = generated_at.replace(tzinfo=timezone.utc)
+    page.snapshot_id = snapshot.id
+    page.generated_at = generated_at
+    page.age_seconds = round((datetime.now(timezone.utc) - generated_at).total_seconds(), 1)
+    page.items = [
+        TrendingItem(
+            rank=row.rank,
+            type=entity_type,
+            id=row.entity_key,
+            title=row.title,
+            artist_name=row.artist_name,
+            score=round(row.score, 4),
         )
-    return out
+        for row in rows[:limit]
+    ]
+    return page
@@ -2,19 +2,20 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from apps.api.db import get_db
-from apps.api.models import LinkedAccount, ProviderType, User
+from apps.api.models import Follow, LinkedAccount, ProviderType, User
 from apps.api.schemas import (
     LinkedAccountCreate,
     LinkedAccountRead,
     UserCreate,
     UserRead,
 )
+from apps.api.services.feed import follow, unfollow
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -122,6 +123,51 @@ async def delete_linked_account(
     db.commit()
 
 
+@router.get("/{user_id}/following", response_model=list[UserRead])
+async def list_following(user_id: UUID, db: Session = Depends(get_db)) -> list[UserRead]:
+    """List the users a user follows, most recently followed first."""
+
+    _ensure_user_exists(db, user_id)
+    stmt = (
+        select(User)
+        .join(Follow, Follow.followee_id == User.id)
+        .where(Follow.follower_id == user_id)
+        .order_by(Follow.created_at.desc())
+    )
+    return db.scalars(stmt).all()
+
+
+@router.put("/{user_id}/following/{followee_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def follow_user(
+    user_id: UUID, followee_id: UUID, db: Session = Depends(get_db)
+) -> Response:
+    """Follow a user; their new activity is written into this user's feed."""
+
+    if user_id == followee_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Users cannot follow themselves"
+        )
+    found = set(db.scalars(select(User.id).where(User.id.in_([user_id, followee_id]))))
+    if found != {user_id, followee_id}:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    follow(db, user_id, followee_id)
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.delete("/{user_id}/following/{followee_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def unfollow_user(
+    user_id: UUID, followee_id: UUID, db: Session = Depends(get_db)
+) -> Response:
+    """Stop following a user and drop their items from this user's feed."""
+
+    if not unfollow(db, user_id, followee_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Follow not found")
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get(
     "/lookup/by-provider/{provider}/{provider_user_id}", response_model=UserRead
 )
@@ -1,44 +1,213 @@
-"""Vote endpoints returning placeholder data."""
+"""Ranked-ballot voting and live poll tallies."""
+
+from __future__ import annotations
 
 from datetime import datetime, timezone
-from uuid import UUID, uuid4
+from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from apps.api.conditional import etag_matches, make_etag, not_modified, set_etag
 from apps.api.db import get_db
-from apps.api.schemas import VoteRead
+from apps.api.models import Nomination, NominationStats, User, Vote, Week
+from apps.api.schemas import BallotRead, BallotSubmit, TallyEntry, VoteRead, WeekTally
+from apps.api.services.week_stats import (
+    RANK_POINTS,
+    apply_ballot_change,
+    load_week_stats,
+    week_version,
+)
+
+router = APIRouter(tags=["votes"])
+
 
-router = APIRouter(prefix="/votes", tags=["votes"])
+def _poll_closed(week: Week) -> bool:
+    close_at = week.poll_close_at
+    if close_at is None:
+        return False
+    if close_at.tzinfo is None:
+        close_at = close_at.replace(tzinfo=timezone.utc)
+    return close_at <= datetime.now(timezone.utc)
 
 
-@router.get("/", response_model=list[VoteRead])
-async def list_votes(db: Session = Depends(get_db)) -> list[VoteRead]:
-    """Return static votes for now."""
+def _require_open_poll(db: Session, week_id: UUID) -> Week:
+    week = db.get(Week, week_id)
+    if not week:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Week not found.")
+    if _poll_closed(week):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The poll is closed.")
+    return week
 
-    _ = db
-    return [
-        VoteRead(
-            id=uuid4(),
-            week_id=uuid4(),
-            nomination_id=uuid4(),
-            user_id=uuid4(),
-            rank=1,
-            submitted_at=datetime(2024, 7, 1, 9, 30, tzinfo=timezone.utc),
+
+def _current_ballot(db: Session, week_id: UUID, user_id: UUID) -> list[Vote]:
+    return list(
+        db.execute(
+            select(Vote)
+            .where(Vote.week_id == week_id, Vote.user_id == user_id)
+            .order_by(Vote.rank)
+            .with_for_update()
         )
-    ]
+        .scalars()
+        .all()
+    )
+
 
+@router.get("/votes/", response_model=list[VoteRead])
+async def list_votes(
+    db: Session = Depends(get_db),
+    week_id: UUID | None = Query(None, description="Only votes cast in this week."),
+    user_id: UUID | None = Query(None, description="Only votes cast by this user."),
+) -> list[VoteRead]:
+    query = select(Vote)
+    if week_id:
+        query = query.where(Vote.week_id == week_id)
+    if user_id:
+        query = query.where(Vote.user_id == user_id)
+    votes = db.execute(query.order_by(Vote.week_id, Vote.user_id, Vote.rank)).scalars().all()
+    return [VoteRead.model_validate(vote) for vote in votes]
 
-@router.get("/{vote_id}", response_model=VoteRead)
+
+@router.get("/votes/{vote_id}", response_model=VoteRead)
 async def get_vote(vote_id: UUID, db: Session = Depends(get_db)) -> VoteRead:
-    """Return a sample vote payload."""
-
-    _ = db
-    return VoteRead(
-        id=vote_id,
-        week_id=uuid4(),
-        nomination_id=uuid4(),
-        user_id=uuid4(),
-        rank=2,
-        submitted_at=datetime(2024, 7, 1, 10, 0, tzinfo=timezone.utc),
+    vote = db.get(Vote, vote_id)
+    if not vote:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vote not found.")
+    return VoteRead.model_validate(vote)
+
+
+@router.put("/weeks/{week_id}/ballot", response_model=BallotRead)
+async def submit_ballot(
+    week_id: UUID, payload: BallotSubmit, db: Session = Depends(get_db)
+) -> BallotRead:
+    """Cast or replace a user's ranked ballot for a week.
+
+    ``nomination_ids`` lists the user's picks, first place first. Vote
+    counters move by the difference from the previous ballot in the same
+    transaction.
+    """
+
+    _require_open_poll(db, week_id)
+    if not db.get(User, payload.user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
+
+    picks = payload.nomination_ids
+    if len(picks) > len(RANK_POINTS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A ballot ranks at most {len(RANK_POINTS)} nominations.",
+        )
+    if len(set(picks)) != len(picks):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A nomination can only be ranked once per ballot.",
+        )
+    found = set(
+        db.execute(
+            select(Nomination.id).where(Nomination.id.in_(picks), Nomination.week_id == week_id)
+        ).scalars()
+    )
+    if found != set(picks):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Every ranked nomination must belong to the requested week.",
+        )
+
+    previous = _current_ballot(db, week_id, payload.user_id)
+    removed = [(vote.nomination_id, vote.rank) for vote in previous]
+    added = [(nomination_id, rank) for rank, nomination_id in enumerate(picks, start=1)]
+
+    try:
+        for vote in previous:
+            db.delete(vote)
+        # Free the (week, user, rank) slots before re-using them.
+        db.flush()
+        votes = [
+            Vote(week_id=week_id, nomination_id=nomination_id, user_id=payload.user_id, rank=rank)
+            for nomination_id, rank in added
+        ]
+        db.add_all(votes)
+        db.flush()
+        apply_ballot_change(db, week_id, removed, added)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The ballot was changed concurrently; retry.",
+        )
+
+    return BallotRead(
+        week_id=week_id,
+        user_id=payload.user_id,
+        votes=[VoteRead.model_validate(vote) for vote in votes],
+    )
+
+
+@router.delete("/weeks/{week_id}/ballot/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def retract_ballot(week_id: UUID, user_id: UUID, db: Session = Depends(get_db)) -> Response:
+    """Withdraw a user's ballot while the poll is open."""
+
+    _require_open_poll(db, week_id)
+    previous = _current_ballot(db, week_id, user_id)
+    if not previous:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ballot not found.")
+
+    removed = [(vote.nomination_id, vote.rank) for vote in previous]
+    for vote in previous:
+        db.delete(vote)
+    db.flush()
+    apply_ballot_change(db, week_id, removed, [])
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/weeks/{week_id}/tally", response_model=WeekTally)
+async def get_week_tally(
+    week_id: UUID, request: Request, response: Response, db: Session = Depends(get_db)
+) -> WeekTally | Response:
+    """Current poll standings, read from the maintained vote counters.
+
+    Ties on points are broken by first-place votes, then second-place votes.
+    """
+
+    week = db.get(Week, week_id)
+    if not week:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Week not found.")
+
+    closed = _poll_closed(week)
+    etag = make_etag("tally", week_id, week_version(db, week_id), closed)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    stats = load_week_stats(db, [week_id])[week_id]
+    rows = db.execute(
+        select(NominationStats, Nomination.album_id, Nomination.user_id)
+        .join(Nomination, Nomination.id == NominationStats.nomination_id)
+        .where(NominationStats.week_id == week_id)
+        .order_by(
+            NominationStats.points.desc(),
+            NominationStats.first_place.desc(),
+            NominationStats.second_place.desc(),
+            Nomination.submitted_at,
+        )
+    ).all()
+    standings = [
+        TallyEntry(
+            position=position,
+            nomination_id=counters.nomination_id,
+            album_id=album_id,
+            user_id=user_id,
+            points=counters.points,
+            first_place=counters.first_place,
+            second_place=counters.second_place,
+            total_votes=counters.total_votes,
+        )
+        for position, (counters, album_id, user_id) in enumerate(rows, start=1)
+    ]
+    return WeekTally(
+        week_id=week_id, poll_closed=closed, vote_count=stats.vote_count, standings=standings
     )
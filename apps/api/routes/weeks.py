@@ -3,16 +3,21 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import case, func, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
+from apps.api.conditional import etag_matches, make_etag, not_modified, set_etag
 from apps.api.db import get_db
-from apps.api.models.club import Nomination, Rating, Vote, Week
+from apps.api.models.club import Nomination, NominationStats, Week, WeekStats
 from apps.api.models import Album, User
+from apps.api.pagination import decode_cursor, encode_cursor
 from apps.api.schemas import (
     NominationRead,
     NominationCreate,
@@ -23,8 +28,22 @@ from apps.api.schemas import (
     WeekCreate,
     WeekDetail,
     WeekRead,
+    WeekSummary,
     WeekUpdate,
 )
+from apps.api.services.feed import (
+    club_winner_activity,
+    nomination_activities,
+    publish_activities,
+)
+from apps.api.services.week_stats import (
+    bump_week_version,
+    club_version,
+    load_week_stats,
+    refresh_week_stats,
+    week_detail_cache,
+    week_version,
+)
 
 router = APIRouter(prefix="/weeks", tags=["weeks"])
 
@@ -53,6 +72,18 @@ def _validate_timeline(
         )
 
 
+def _announce_winner(db: Session, week: Week, previous_winner: UUID | None) -> None:
+    """Post a club-wide feed item when a week's winner is set or changed."""
+
+    if week.winner_album_id is None or week.winner_album_id == previous_winner:
+        return
+    album = db.get(Album, week.winner_album_id)
+    if album is not None:
+        publish_activities(
+            db, [club_winner_activity(week, album, datetime.now(timezone.utc))]
+        )
+
+
 def _find_existing_week(db: Session, payload: WeekCreate) -> Week | None:
     """Return an existing week for idempotent bot replays."""
 
@@ -68,134 +99,209 @@ def _find_existing_week(db: Session, payload: WeekCreate) -> Week | None:
     return db.execute(select(Week).where(or_(*filters))).scalar_one_or_none()
 
 
-def _fetch_vote_stats(db: Session, week_ids: list[UUID]) -> dict[tuple[UUID, UUID], VoteAggregate]:
-    vote_rows = db.execute(
-        select(
-            Vote.week_id,
-            Vote.nomination_id,
-            func.sum(
-                case((Vote.rank == 1, 2), (Vote.rank == 2, 1), else_=0)
-            ).label("points"),
-            func.sum(case((Vote.rank == 1, 1), else_=0)).label("first_place"),
-            func.sum(case((Vote.rank == 2, 1), else_=0)).label("second_place"),
-            func.count(Vote.id).label("total_votes"),
-        )
-        .where(Vote.week_id.in_(week_ids))
-        .group_by(Vote.week_id, Vote.nomination_id)
-    ).all()
-
-    stats: dict[tuple[UUID, UUID], VoteAggregate] = {}
-    for row in vote_rows:
-        stats[(row.week_id, row.nomination_id)] = VoteAggregate(
-            points=int(row.points or 0),
-            first_place=int(row.first_place or 0),
-            second_place=int(row.second_place or 0),
-            total_votes=int(row.total_votes or 0),
-        )
-    return stats
-
-
-def _fetch_rating_stats(
-    db: Session, week_ids: list[UUID]
-) -> tuple[dict[tuple[UUID, UUID | None], RatingAggregate], dict[UUID, RatingAggregate]]:
-    rating_rows = db.execute(
-        select(
-            Rating.week_id,
-            Rating.nomination_id,
-            func.avg(Rating.value).label("average"),
-            func.count(Rating.id).label("count"),
-        )
-        .where(Rating.week_id.in_(week_ids))
-        .group_by(Rating.week_id, Rating.nomination_id)
-    ).all()
-
-    per_nomination: dict[tuple[UUID, UUID | None], RatingAggregate] = {}
-    for row in rating_rows:
-        per_nomination[(row.week_id, row.nomination_id)] = RatingAggregate(
-            average=float(row.average) if row.average is not None else None,
-            count=int(row.count or 0),
-        )
+def _build_week_details(db: Session, weeks: list[Week]) -> list[WeekDetail]:
+    """Assemble week documents from the materialized aggregates.
 
-    week_rows = db.execute(
-        select(
-            Rating.week_id,
-            func.avg(Rating.value).label("average"),
-            func.count(Rating.id).label("count"),
-        )
-        .where(Rating.week_id.in_(week_ids))
-        .group_by(Rating.week_id)
-    ).all()
-
-    per_week: dict[UUID, RatingAggregate] = {}
-    for row in week_rows:
-        per_week[row.week_id] = RatingAggregate(
-            average=float(row.average) if row.average is not None else None,
-            count=int(row.count or 0),
+    Documents are cached per ``(week_id, week_stats.version)``, so unchanged
+    weeks cost a single stats lookup.
+    """
+
+    if not weeks:
+        return []
+
+    stats = load_week_stats(db, [week.id for week in weeks])
+    details: dict[UUID, WeekDetail] = {}
+    for week in weeks:
+        cached = week_detail_cache.get(week.id, stats[week.id].version)
+        if cached is not None:
+            details[week.id] = cached
+
+    missing = [week for week in weeks if week.id not in details]
+    if missing:
+        rows = db.execute(
+            select(Nomination, NominationStats)
+            .outerjoin(NominationStats, NominationStats.nomination_id == Nomination.id)
+            .where(Nomination.week_id.in_([week.id for week in missing]))
+            .order_by(Nomination.submitted_at, Nomination.id)
+        ).all()
+        nominations_by_week: dict[UUID, list[NominationWithStats]] = defaultdict(list)
+        for nomination, nomination_stats in rows:
+            nominations_by_week[nomination.week_id].append(
+                _nomination_with_stats(nomination, nomination_stats)
+            )
+
+        for week in missing:
+            week_stats = stats[week.id]
+            detail = WeekDetail(
+                **WeekRead.model_validate(week).model_dump(),
+                nominations=nominations_by_week.get(week.id, []),
+                aggregates=_week_aggregates(week_stats),
+            )
+            week_detail_cache.put(week.id, week_stats.version, detail)
+            details[week.id] = detail
+
+    return [details[week.id] for week in weeks]
+
+
+def _json_fields(alias: str, schema: type[BaseModel]) -> str:
+    """``json_build_object`` arguments for ``schema``'s fields, read from ``alias``."""
+
+    return ", ".join(f"'{name}', {alias}.{name}" for name in schema.model_fields)
+
+
+# One round trip for a whole WeekDetail document. Column names match the
+# schema field names, so the keys track NominationRead/WeekRead.
+WEEK_DOCUMENT_SQL = text(
+    f"""
+    WITH nomination_docs AS (
+        SELECT n.submitted_at, n.id, json_build_object(
+            {_json_fields("n", NominationRead)},
+            'vote_summary', json_build_object(
+                'points', coalesce(s.points, 0),
+                'first_place', coalesce(s.first_place, 0),
+                'second_place', coalesce(s.second_place, 0),
+                'total_votes', coalesce(s.total_votes, 0)
+            ),
+            'rating_summary', json_build_object(
+                'average', s.rating_sum / nullif(s.rating_count, 0),
+                'count', coalesce(s.rating_count, 0)
+            )
+        ) AS doc
+        FROM nominations n
+        LEFT JOIN nomination_stats s ON s.nomination_id = n.id
+        WHERE n.week_id = :week_id
+    )
+    SELECT json_build_object(
+        {_json_fields("w", WeekRead)},
+        'aggregates', json_build_object(
+            'nomination_count', ws.nomination_count,
+            'vote_count', ws.vote_count,
+            'rating_count', ws.rating_count,
+            'rating_average', ws.rating_sum / nullif(ws.rating_count, 0)
+        ),
+        'nominations', coalesce(
+            (SELECT json_agg(doc ORDER BY submitted_at, id) FROM nomination_docs),
+            '[]'::json
         )
+    )::text AS document,
+    ws.version
+    FROM weeks w
+    LEFT JOIN week_stats ws ON ws.week_id = w.id
+    WHERE w.id = :week_id
+    """
+)
 
-    return per_nomination, per_week
 
+def _week_document_json(db: Session, week_id: UUID) -> tuple[str, int | None] | None:
+    """Build a :class:`WeekDetail` document in one PostgreSQL statement.
+
+    Returns ``(json_text, week_stats.version)`` or ``None`` when the week does
+    not exist. The version is ``None`` when the week has no stats row yet;
+    callers fall back to :func:`_build_week_details`, which backfills it.
+    """
+
+    row = db.execute(WEEK_DOCUMENT_SQL, {"week_id": week_id}).one_or_none()
+    return None if row is None else (row.document, row.version)
+
+
+def _build_week_summaries(db: Session, weeks: list[Week]) -> list[WeekSummary]:
+    """Week rows with aggregates only; no nomination rows are read."""
 
-def _build_week_details(db: Session, weeks: list[Week]) -> list[WeekDetail]:
     if not weeks:
         return []
 
-    week_ids = [week.id for week in weeks]
-    nominations = db.execute(
-        select(Nomination).where(Nomination.week_id.in_(week_ids))
-    ).scalars().all()
-    nominations_by_week: dict[UUID, list[Nomination]] = defaultdict(list)
-    for nomination in nominations:
-        nominations_by_week[nomination.week_id].append(nomination)
+    stats = load_week_stats(db, [week.id for week in weeks])
+    return [
+        WeekSummary(
+            **WeekRead.model_validate(week).model_dump(),
+            aggregates=_week_aggregates(stats[week.id]),
+        )
+        for week in weeks
+    ]
 
-    vote_stats = _fetch_vote_stats(db, week_ids)
-    rating_stats, week_rating_stats = _fetch_rating_stats(db, week_ids)
 
-    response: list[WeekDetail] = []
-    for week in weeks:
-        week_nomination_entities = nominations_by_week.get(week.id, [])
-        nomination_payloads: list[NominationWithStats] = []
-        for nomination in week_nomination_entities:
-            vote_summary = vote_stats.get(
-                (week.id, nomination.id),
-                VoteAggregate(points=0, first_place=0, second_place=0, total_votes=0),
-            )
-            rating_summary = rating_stats.get(
-                (week.id, nomination.id),
-                RatingAggregate(average=None, count=0),
-            )
+def _week_aggregates(stats: WeekStats) -> WeekAggregates:
+    return WeekAggregates(
+        nomination_count=stats.nomination_count,
+        vote_count=stats.vote_count,
+        rating_count=stats.rating_count,
+        rating_average=_average(stats.rating_sum, stats.rating_count),
+    )
 
-            nomination_payloads.append(
-                NominationWithStats(
-                    **NominationRead.model_validate(nomination).model_dump(),
-                    vote_summary=vote_summary,
-                    rating_summary=rating_summary,
-                )
-            )
 
-        week_rating = week_rating_stats.get(
-            week.id, RatingAggregate(average=None, count=0)
-        )
-        aggregates = WeekAggregates(
-            nomination_count=len(nomination_payloads),
-            vote_count=sum(n.vote_summary.total_votes for n in nomination_payloads),
-            rating_count=week_rating.count,
-            rating_average=week_rating.average,
-        )
+def _average(total: float, count: int) -> float | None:
+    return total / count if count else None
 
-        response.append(
-            WeekDetail(
-                **WeekRead.model_validate(week).model_dump(),
-                nominations=nomination_payloads,
-                aggregates=aggregates,
-            )
-        )
 
-    return response
+def _after_cursor(cursor: str) -> ColumnElement[bool]:
+    """Rows that sort after ``cursor`` in the list order.
+
+    The list is ordered by ``week_number DESC NULLS LAST, created_at DESC,
+    id DESC``; numbered weeks come first, then unnumbered ones.
+    """
+
+    payload = decode_cursor(cursor, kind="weeks")
+    try:
+        week_number = payload["n"]
+        created_at = datetime.fromisoformat(payload["c"])
+        last_id = UUID(payload["id"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        ) from exc
+
+    older = or_(
+        Week.created_at < created_at,
+        and_(Week.created_at == created_at, Week.id < last_id),
+    )
+    if week_number is None:
+        return and_(Week.week_number.is_(None), older)
+    return or_(
+        Week.week_number < week_number,
+        and_(Week.week_number == week_number, older),
+        Week.week_number.is_(None),
+    )
+
+
+def _cursor_for(week: Week) -> str:
+    return encode_cursor(
+        {
+            "k": "weeks",
+            "n": week.week_number,
+            "c": week.created_at.isoformat(),
+            "id": str(week.id),
+        }
+    )
+
+
+def _nomination_with_stats(
+    nomination: Nomination, stats: NominationStats | None
+) -> NominationWithStats:
+    if stats is None:
+        vote_summary = VoteAggregate(points=0, first_place=0, second_place=0, total_votes=0)
+        rating_summary = RatingAggregate(average=None, count=0)
+    else:
+        vote_summary = VoteAggregate(
+            points=stats.points,
+            first_place=stats.first_place,
+            second_place=stats.second_place,
+            total_votes=stats.total_votes,
+        )
+        rating_summary = RatingAggregate(
+            average=_average(stats.rating_sum, stats.rating_count),
+            count=stats.rating_count,
+        )
+    return NominationWithStats(
+        **NominationRead.model_validate(nomination).model_dump(),
+        vote_summary=vote_summary,
+        rating_summary=rating_summary,
+    )
 
 
-@router.get("/", response_model=list[WeekDetail])
+@router.get("/", response_model=list[WeekDetail] | list[WeekSummary])
 async def list_weeks(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     discussion_start: datetime | None = Query(
         None, description="Filter weeks with discussion on/after this timestamp."
@@ -221,8 +327,24 @@ async def list_weeks(
     nominator_id: UUID | None = Query(
         None, description="Filter weeks that have a nomination from this user."
     ),
-) -> list[WeekDetail]:
-    """Return club weeks with nomination, vote, and rating aggregates."""
+    summary: bool = Query(
+        False, description="Omit nested nominations and return week aggregates only."
+    ),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of weeks to return."),
+    cursor: str | None = Query(
+        None, description="X-Next-Cursor value from the previous page."
+    ),
+) -> list[WeekDetail] | list[WeekSummary] | Response:
+    """Return club weeks with nomination, vote, and rating aggregates.
+
+    Newest weeks come first. When more weeks match, ``X-Next-Cursor`` holds
+    the cursor for the next page.
+    """
+
+    etag = make_etag("weeks", *club_version(db), request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
 
     query = select(Week)
     if discussion_start:
@@ -252,24 +374,56 @@ async def list_weeks(
         nomination_subquery = select(Nomination.week_id).where(*nomination_filters)
         query = query.where(Week.id.in_(nomination_subquery))
 
-    weeks = (
+    if cursor:
+        query = query.where(_after_cursor(cursor))
+
+    weeks = list(
         db.execute(
-            query.order_by(Week.week_number.desc().nulls_last(), Week.created_at.desc())
+            query.order_by(
+                Week.week_number.desc().nulls_last(), Week.created_at.desc(), Week.id.desc()
+            ).limit(limit + 1)
         )
         .scalars()
         .all()
     )
+    if len(weeks) > limit:
+        weeks = weeks[:limit]
+        response.headers["X-Next-Cursor"] = _cursor_for(weeks[-1])
+
+    if summary:
+        return _build_week_summaries(db, weeks)
     return _build_week_details(db, weeks)
 
 
 @router.get("/{week_id}", response_model=WeekDetail)
-async def get_week(week_id: UUID, db: Session = Depends(get_db)) -> WeekDetail:
-    """Return a single week with nested aggregates."""
+async def get_week(
+    week_id: UUID, request: Request, response: Response, db: Session = Depends(get_db)
+) -> WeekDetail | Response:
+    """Return a single week with nested aggregates.
+
+    On PostgreSQL the document is assembled by the database and passed
+    through as-is; other backends use the ORM path.
+    """
+
+    version = week_version(db, week_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Week not found")
+    etag = make_etag("week", week_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if db.get_bind().dialect.name == "postgresql":
+        result = _week_document_json(db, week_id)
+        if result is not None and result[1] is not None:
+            document = Response(content=result[0], media_type="application/json")
+            set_etag(document, etag)
+            return document
 
     week = db.get(Week, week_id)
     if not week:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Week not found")
 
+    set_etag(response, etag)
     return _build_week_details(db, [week])[0]
 
 
@@ -303,6 +457,16 @@ async def create_week_nomination(
 
     nomination = Nomination(**payload.model_dump())
     db.add(nomination)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Nomination already exists for this user and album.",
+        )
+    refresh_week_stats(db, [week_id])
+    publish_activities(db, nomination_activities(db, [nomination]))
     db.commit()
     db.refresh(nomination)
     return nomination
@@ -318,14 +482,20 @@ async def create_week(payload: WeekCreate, db: Session = Depends(get_db)) -> Wee
 
     existing = _find_existing_week(db, payload)
     if existing:
+        previous_winner = existing.winner_album_id
         for field, value in payload.model_dump().items():
             setattr(existing, field, value)
+        bump_week_version(db, existing.id)
+        _announce_winner(db, existing, previous_winner)
         db.commit()
         db.refresh(existing)
         target = existing
     else:
         target = Week(**payload.model_dump())
         db.add(target)
+        db.flush()
+        refresh_week_stats(db, [target.id])
+        _announce_winner(db, target, None)
         db.commit()
         db.refresh(target)
 
@@ -348,8 +518,11 @@ async def update_week(
     updated_poll_close = updates.get("poll_close_at", week.poll_close_at)
     _validate_timeline(updated_discussion, updated_nom_close, updated_poll_close)
 
+    previous_winner = week.winner_album_id
     for field, value in updates.items():
         setattr(week, field, value)
+    bump_week_version(db, week.id)
+    _announce_winner(db, week, previous_winner)
 
     db.commit()
     db.refresh(week)
@@ -4,6 +4,8 @@ from .core import (
     AlbumBase,
     AlbumCreate,
     AlbumRead,
+    BallotRead,
+    BallotSubmit,
     LinkedAccountBase,
     LinkedAccountCreate,
     LinkedAccountRead,
@@ -22,6 +24,7 @@ from .core import (
     TasteFingerprint,
     TasteProfileRead,
     TasteProfileSummary,
+    TallyEntry,
     TrackBase,
     TrackCreate,
     TrackRead,
@@ -34,7 +37,10 @@ from .core import (
     WeekBase,
     WeekCreate,
     WeekDetail,
+    WeekSummary,
+    WeekTally,
     WeekUpdate,
+    WeekRatingSummary,
     WeekRead,
     NominationWithStats,
     VoteAggregate,
@@ -46,6 +52,8 @@ __all__ = [
     "AlbumBase",
     "AlbumCreate",
     "AlbumRead",
+    "BallotRead",
+    "BallotSubmit",
     "LinkedAccountBase",
     "LinkedAccountCreate",
     "LinkedAccountRead",
@@ -64,6 +72,7 @@ __all__ = [
     "TasteFingerprint",
     "TasteProfileRead",
     "TasteProfileSummary",
+    "TallyEntry",
     "TrackBase",
     "TrackCreate",
     "TrackRead",
@@ -76,7 +85,10 @@ __all__ = [
     "WeekBase",
     "WeekCreate",
     "WeekDetail",
+    "WeekSummary",
+    "WeekTally",
     "WeekUpdate",
+    "WeekRatingSummary",
     "WeekRead",
     "NominationWithStats",
     "VoteAggregate",
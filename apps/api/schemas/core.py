@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 import re
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, model_validator
 
 from apps.api.models.listening import ListenSource
 from apps.api.models.user import ProviderType
@@ -136,6 +136,10 @@ class RatingSummary(RatingAggregate):
     histogram: list[RatingHistogramBin] | None = None
 
 
+class WeekRatingSummary(RatingSummary):
+    week_id: UUID
+
+
 class NominationBase(OrmSchema):
     week_id: UUID
     user_id: UUID
@@ -168,11 +172,14 @@ class WeekAggregates(OrmSchema):
     rating_average: float | None
 
 
-class WeekDetail(WeekRead):
-    nominations: list[NominationWithStats]
+class WeekSummary(WeekRead):
     aggregates: WeekAggregates
 
 
+class WeekDetail(WeekSummary):
+    nominations: list[NominationWithStats]
+
+
 class VoteBase(OrmSchema):
     week_id: UUID
     nomination_id: UUID
@@ -189,6 +196,32 @@ class VoteRead(VoteBase):
     id: UUID
 
 
+class BallotSubmit(OrmSchema):
+    user_id: UUID
+    # Ranked choices, first place first.
+    nomination_ids: list[UUID] = Field(min_length=1)
+
+
+class BallotRead(OrmSchema):
+    week_id: UUID
+    user_id: UUID
+    votes: list[VoteRead]
+
+
+class TallyEntry(VoteAggregate):
+    position: int
+    nomination_id: UUID
+    album_id: UUID
+    user_id: UUID
+
+
+class WeekTally(OrmSchema):
+    week_id: UUID
+    poll_closed: bool
+    vote_count: int
+    standings: list[TallyEntry]
+
+
 class RatingBase(OrmSchema):
     week_id: UUID
     user_id: UUID
@@ -198,8 +231,12 @@ class RatingBase(OrmSchema):
     favorite_track: str | None = None
     review: str | None = None
     created_at: datetime | None = None
+    # ORM rows expose the column as ``metadata_``; ``metadata`` on a model
+    # instance is the SQLAlchemy MetaData, so prefer the attribute name.
     metadata_: dict | None = Field(
-        default=None, alias="metadata", serialization_alias="metadata"
+        default=None,
+        validation_alias=AliasChoices("metadata_", "metadata"),
+        serialization_alias="metadata",
     )
 
 
@@ -252,8 +289,12 @@ class ListenEventBase(OrmSchema):
     track_id: UUID
     played_at: datetime
     source: ListenSource
+    # ORM rows expose the column as ``metadata_``; ``metadata`` on a model
+    # instance is the SQLAlchemy MetaData, so prefer the attribute name.
     metadata_: dict | None = Field(
-        default=None, alias="metadata", serialization_alias="metadata"
+        default=None,
+        validation_alias=AliasChoices("metadata_", "metadata"),
+        serialization_alias="metadata",
     )
     ingested_at: datetime | None = None
 
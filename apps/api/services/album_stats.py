@@ -0,0 +1,128 @@
+"""Materialized per-album rating aggregates (``album_rating_stats``).
+
+Rating writes call :func:`apply_rating_changes` in their own transaction, so
+album-level reads (the club fallback of ``/recommendations``) are indexed
+lookups instead of a ``GROUP BY`` over every rating. Counters move by deltas,
+so concurrent writers never overwrite each other.
+:func:`rebuild_album_rating_stats` recomputes the table from ``ratings`` after
+out-of-band writes (``python -m apps.api.cli rebuild-album-stats``).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from apps.api.db import dialect_insert
+from apps.api.models import AlbumRatingStats, Rating
+
+
+@dataclass(frozen=True)
+class RatingChange:
+    """One rating write; ``old`` is ``None`` for inserts and ``new`` for deletes."""
+
+    old: tuple[UUID, float] | None = None
+    new: tuple[UUID, float, datetime] | None = None
+
+
+def _latest(db: Session, current: Any, candidate: Any) -> ColumnElement[Any]:
+    first, second = func.coalesce(current, candidate), func.coalesce(candidate, current)
+    # PostgreSQL spells the two-argument maximum GREATEST; SQLite uses max().
+    if db.get_bind().dialect.name == "postgresql":
+        return func.greatest(first, second)
+    return func.max(first, second)
+
+
+def apply_rating_changes(db: Session, changes: Iterable[RatingChange]) -> None:
+    """Fold rating inserts, updates and deletes into ``album_rating_stats``.
+
+    Runs in the caller's transaction after the rating rows are flushed; the
+    caller commits.
+    """
+
+    deltas: dict[UUID, dict[str, Any]] = {}
+
+    def _delta(album_id: UUID) -> dict[str, Any]:
+        return deltas.setdefault(
+            album_id,
+            {"rating_count": 0, "rating_sum": 0.0, "rating_sum_sq": 0.0, "last_rated_at": None},
+        )
+
+    removed_from: set[UUID] = set()
+    for change in changes:
+        if change.old is not None:
+            album_id, value = change.old
+            delta = _delta(album_id)
+            delta["rating_count"] -= 1
+            delta["rating_sum"] -= value
+            delta["rating_sum_sq"] -= value * value
+            removed_from.add(album_id)
+        if change.new is not None:
+            album_id, value, rated_at = change.new
+            delta = _delta(album_id)
+            delta["rating_count"] += 1
+            delta["rating_sum"] += value
+            delta["rating_sum_sq"] += value * value
+            if delta["last_rated_at"] is None or rated_at > delta["last_rated_at"]:
+                delta["last_rated_at"] = rated_at
+
+    # A fixed lock order keeps concurrent writers from deadlocking.
+    for album_id in sorted(deltas, key=str):
+        delta = deltas[album_id]
+        stmt = dialect_insert(db)(AlbumRatingStats).values(album_id=album_id, **delta)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[AlbumRatingStats.album_id],
+                set_={
+                    "rating_count": AlbumRatingStats.rating_count + stmt.excluded.rating_count,
+                    "rating_sum": AlbumRatingStats.rating_sum + stmt.excluded.rating_sum,
+                    "rating_sum_sq": AlbumRatingStats.rating_sum_sq
+                    + stmt.excluded.rating_sum_sq,
+                    "last_rated_at": _latest(
+                        db, AlbumRatingStats.last_rated_at, stmt.excluded.last_rated_at
+                    ),
+                },
+            )
+        )
+
+    # Removing a rating may remove the album's most recent one.
+    for album_id in sorted(removed_from, key=str):
+        db.execute(
+            update(AlbumRatingStats)
+            .where(AlbumRatingStats.album_id == album_id)
+            .values(
+                last_rated_at=select(func.max(Rating.created_at))
+                .where(Rating.album_id == album_id)
+                .scalar_subquery()
+            )
+        )
+
+
+def rebuild_album_rating_stats(db: Session) -> int:
+    """Recompute every row from ``ratings``; returns the number of albums.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+
+    db.execute(delete(AlbumRatingStats))
+    aggregates = select(
+        Rating.album_id,
+        func.count(Rating.id),
+        func.sum(Rating.value),
+        func.sum(Rating.value * Rating.value),
+        func.max(Rating.created_at),
+    ).group_by(Rating.album_id)
+    db.execute(
+        insert(AlbumRatingStats).from_select(
+            ["album_id", "rating_count", "rating_sum", "rating_sum_sq", "last_rated_at"],
+            aggregates,
+        )
+    )
+    return db.scalar(select(func.count()).select_from(AlbumRatingStats)) or 0
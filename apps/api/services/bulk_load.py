@@ -0,0 +1,144 @@
+"""Bulk loading of historical listen events.
+
+On PostgreSQL (psycopg 3) rows are streamed through ``COPY FROM STDIN`` into a
+temporary staging table and merged into ``listen_events`` with a single
+``INSERT ... SELECT ... ON CONFLICT DO NOTHING``. Other backends fall back to
+batched multi-row inserts with the same conflict handling.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, cast
+
+import psycopg
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from apps.api.db import dialect_insert
+from apps.api.models import ListenEvent
+
+_STAGING_TABLE = "listen_events_load"
+_COLUMNS = ("id", "user_id", "track_id", "played_at", "source", "metadata", "ingested_at")
+
+
+@dataclass
+class BulkLoadResult:
+    received: int
+    inserted: int
+
+    @property
+    def skipped(self) -> int:
+        """Rows dropped as duplicates or for referencing unknown users/tracks."""
+
+        return self.received - self.inserted
+
+
+def _normalize_rows(
+    rows: Iterable[Mapping[str, Any]], ingested_at: datetime
+) -> Iterator[dict[str, Any]]:
+    for row in rows:
+        metadata = row.get("metadata", row.get("metadata_"))
+        yield {
+            "id": row.get("id") or uuid.uuid4(),
+            "user_id": row["user_id"],
+            "track_id": row["track_id"],
+            "played_at": row["played_at"],
+            "source": row["source"],
+            "metadata": metadata,
+            "ingested_at": row.get("ingested_at") or ingested_at,
+        }
+
+
+def _batched(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _copy_load(db: Session, rows: Iterable[dict[str, Any]]) -> BulkLoadResult:
+    connection = db.connection()
+    dialect = connection.dialect
+    table = ListenEvent.__table__
+    table_name = ListenEvent.__tablename__
+    # Reuse the column types' bind processors so COPY writes exactly what the
+    # ORM would (enum names, serialized JSON, ...).
+    processors = [table.c[name].type.bind_processor(dialect) for name in _COLUMNS]
+
+    connection.execute(
+        text(
+            f"CREATE TEMP TABLE {_STAGING_TABLE} "
+            f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+
+    received = 0
+    column_list = ", ".join(_COLUMNS)
+    # _copy_load is only chosen for psycopg 3 connections.
+    driver_connection = cast(psycopg.Connection[Any], connection.connection.driver_connection)
+    with driver_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {_STAGING_TABLE} ({column_list}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(
+                    [
+                        processor(row[name]) if processor and row[name] is not None else row[name]
+                        for name, processor in zip(_COLUMNS, processors)
+                    ]
+                )
+                received += 1
+
+    # Rows whose user or track does not exist are dropped instead of failing
+    # the whole load on a foreign key violation.
+    result = connection.execute(
+        text(
+            f"""
+            INSERT INTO {table_name} ({column_list})
+            SELECT {", ".join(f"l.{name}" for name in _COLUMNS)}
+            FROM {_STAGING_TABLE} l
+            JOIN users u ON u.id = l.user_id
+            JOIN tracks t ON t.id = l.track_id
+            ON CONFLICT (user_id, track_id, played_at) DO NOTHING
+            """
+        )
+    )
+    return BulkLoadResult(received=received, inserted=max(result.rowcount, 0))
+
+
+def _batched_insert_load(
+    db: Session, rows: Iterable[dict[str, Any]], batch_size: int
+) -> BulkLoadResult:
+    insert = dialect_insert(db)
+    table = ListenEvent.__table__
+    received = inserted = 0
+    for batch in _batched(rows, batch_size):
+        received += len(batch)
+        stmt = insert(table).values(batch).on_conflict_do_nothing(
+            index_elements=["user_id", "track_id", "played_at"]
+        )
+        inserted += max(db.execute(stmt).rowcount, 0)
+    return BulkLoadResult(received=received, inserted=inserted)
+
+
+def bulk_load_listen_events(
+    db: Session, rows: Iterable[Mapping[str, Any]], *, batch_size: int = 5000
+) -> BulkLoadResult:
+    """Load listen events in bulk and commit.
+
+    ``rows`` are mappings shaped like ``ListenEventCreate`` and may be a lazy
+    iterator; on PostgreSQL they are streamed without being materialized.
+    Duplicates of existing (user, track, played_at) keys are skipped.
+    """
+
+    normalized = _normalize_rows(rows, datetime.now(timezone.utc))
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg":
+        result = _copy_load(db, normalized)
+    else:
+        result = _batched_insert_load(db, normalized, batch_size)
+
+    db.commit()
+    return result
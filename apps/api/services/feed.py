@@ -0,0 +1,544 @@
+"""Fan-out-on-write home timelines (``feed_entries``).
+
+Write paths turn new ratings, nominations, listens and club winners into
+:class:`FeedActivity` items and call :func:`publish_activities` in their own
+transaction. Each item is copied into the actor's timeline and into every
+follower's timeline, so ``GET /feed?user_id=…`` reads one owner's newest
+entries off an index. Actors with more than ``feed_fanout_cap`` followers
+are not fanned out; :func:`timeline_query` merges their own entries, and the
+club-wide announcements stored once with ``owner_id`` NULL, at read time.
+
+Rebuild everything from the source tables with
+``python -m apps.api.cli rebuild-feeds``.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Select, and_, delete, func, or_, select, true, union_all, update
+from sqlalchemy.orm import Session, aliased
+
+from apps.api.config import get_settings
+from apps.api.db import dialect_insert
+from apps.api.models import (
+    Album,
+    FeedEntry,
+    Follow,
+    ListenEvent,
+    Nomination,
+    Rating,
+    Track,
+    User,
+    Week,
+)
+from apps.api.services.feed_stream import queue_live_items
+
+T = TypeVar("T")
+
+# Copied into a new follower's timeline so it is not empty until the next write.
+FOLLOW_BACKFILL_ITEMS = 50
+INSERT_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class FeedActivity:
+    """A rendered feed item; ``actor_id`` is ``None`` for club-wide items."""
+
+    kind: str
+    subject_id: UUID
+    actor_id: UUID | None
+    occurred_at: datetime
+    payload: dict[str, Any]
+
+    def as_item(self) -> dict[str, Any]:
+        """The activity in the shape of a ``GET /feed`` item."""
+
+        return {
+            "id": f"{self.kind}-{self.subject_id}",
+            "type": self.kind,
+            "timestamp": self.occurred_at,
+            **self.payload,
+        }
+
+
+def _actor_name(display_name: str | None, handle: str | None) -> str:
+    return display_name or handle or "Anonymous"
+
+
+def rating_activities(db: Session, ratings: list[Rating]) -> list[FeedActivity]:
+    """Render freshly written ratings (one query for names and titles)."""
+
+    if not ratings:
+        return []
+    rows = db.execute(
+        select(
+            Rating.id,
+            User.display_name,
+            User.handle,
+            Album.title,
+            Album.artist_name,
+            Week.label,
+        )
+        .join(User, User.id == Rating.user_id)
+        .join(Album, Album.id == Rating.album_id)
+        .join(Week, Week.id == Rating.week_id)
+        .where(Rating.id.in_([rating.id for rating in ratings]))
+    ).all()
+    names = {row[0]: row[1:] for row in rows}
+    activities = []
+    for rating in ratings:
+        display_name, handle, title, artist_name, week_label = names[rating.id]
+        activities.append(
+            FeedActivity(
+                kind="rating",
+                subject_id=rating.id,
+                actor_id=rating.user_id,
+                occurred_at=rating.created_at,
+                payload={
+                    "actor": _actor_name(display_name, handle),
+                    "actor_id": str(rating.user_id),
+                    "action": "rated",
+                    "target": f"{title} — {artist_name}",
+                    "target_link": f"/club/weeks/{rating.week_id}",
+                    "rating": rating.value,
+                    "metadata": {
+                        "album_id": str(rating.album_id),
+                        "week_id": str(rating.week_id),
+                        "week_label": week_label,
+                        "review": rating.review[:100] if rating.review else None,
+                        "favorite_track": rating.favorite_track,
+                    },
+                },
+            )
+        )
+    return activities
+
+
+def nomination_activities(db: Session, nominations: list[Nomination]) -> list[FeedActivity]:
+    """Render freshly written nominations (one query for names and titles)."""
+
+    if not nominations:
+        return []
+    rows = db.execute(
+        select(
+            Nomination.id,
+            User.display_name,
+            User.handle,
+            Album.title,
+            Album.artist_name,
+            Week.label,
+        )
+        .join(User, User.id == Nomination.user_id)
+        .join(Album, Album.id == Nomination.album_id)
+        .join(Week, Week.id == Nomination.week_id)
+        .where(Nomination.id.in_([nomination.id for nomination in nominations]))
+    ).all()
+    names = {row[0]: row[1:] for row in rows}
+    activities = []
+    for nomination in nominations:
+        display_name, handle, title, artist_name, week_label = names[nomination.id]
+        activities.append(
+            FeedActivity(
+                kind="nomination",
+                subject_id=nomination.id,
+                actor_id=nomination.user_id,
+                occurred_at=nomination.submitted_at,
+                payload={
+                    "actor": _actor_name(display_name, handle),
+                    "actor_id": str(nomination.user_id),
+                    "action": f"nominated for {week_label}",
+                    "target": f"{title} — {artist_name}",
+                    "target_link": f"/club/weeks/{nomination.week_id}",
+                    "rating": None,
+                    "metadata": {
+                        "album_id": str(nomination.album_id),
+                        "week_id": str(nomination.week_id),
+                        "genre": nomination.genre,
+                        "pitch": nomination.pitch[:100] if nomination.pitch else None,
+                    },
+                },
+            )
+        )
+    return activities
+
+
+def listen_activities(db: Session, listens: list[ListenEvent]) -> list[FeedActivity]:
+    """Render freshly written listens (one query each for users and tracks)."""
+
+    if not listens:
+        return []
+    users = {
+        row.id: _actor_name(row.display_name, row.handle)
+        for row in db.execute(
+            select(User.id, User.display_name, User.handle).where(
+                User.id.in_({listen.user_id for listen in listens})
+            )
+        )
+    }
+    tracks = {
+        row.id: row
+        for row in db.execute(
+            select(Track.id, Track.title, Track.artist_name, Track.album_id).where(
+                Track.id.in_({listen.track_id for listen in listens})
+            )
+        )
+    }
+    activities = []
+    for listen in listens:
+        track = tracks[listen.track_id]
+        activities.append(
+            FeedActivity(
+                kind="listen",
+                subject_id=listen.id,
+                actor_id=listen.user_id,
+                occurred_at=listen.played_at,
+                payload={
+                    "actor": users[listen.user_id],
+                    "actor_id": str(listen.user_id),
+                    "action": "listened to",
+                    "target": f"{track.title} · {track.artist_name}",
+                    "target_link": None,
+                    "rating": None,
+                    "metadata": {
+                        "track_id": str(listen.track_id),
+                        "album_id": str(track.album_id) if track.album_id else None,
+                        "source": getattr(listen.source, "value", listen.source),
+                    },
+                },
+            )
+        )
+    return activities
+
+
+def club_winner_activity(week: Week, album: Album, occurred_at: datetime) -> FeedActivity:
+    """Render a winner announcement, shown in every timeline."""
+
+    return FeedActivity(
+        kind="club",
+        subject_id=week.id,
+        actor_id=None,
+        occurred_at=occurred_at,
+        payload={
+            "actor": "bot",
+            "actor_id": None,
+            "action": f"announced winner for {week.label}",
+            "target": f"{album.title} — {album.artist_name}",
+            "target_link": f"/club/weeks/{week.id}",
+            "rating": None,
+            "metadata": {"week_number": week.week_number, "album_id": str(album.id)},
+        },
+    )
+
+
+def _batched(rows: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _insert_entries(db: Session, rows: Iterable[dict[str, Any]]) -> None:
+    for batch in _batched(rows, INSERT_BATCH_SIZE):
+        insert = dialect_insert(db)(FeedEntry).values(batch)
+        db.execute(
+            insert.on_conflict_do_nothing(
+                index_elements=[FeedEntry.owner_id, FeedEntry.kind, FeedEntry.subject_id]
+            )
+        )
+
+
+def _entry(owner_id: UUID | None, activity: FeedActivity) -> dict[str, Any]:
+    return {
+        "id": uuid.uuid4(),
+        "owner_id": owner_id,
+        "actor_id": activity.actor_id,
+        "kind": activity.kind,
+        "subject_id": activity.subject_id,
+        "occurred_at": activity.occurred_at,
+        "payload": activity.payload,
+    }
+
+
+def publish_activities(
+    db: Session, activities: Iterable[FeedActivity], *, live: bool = True
+) -> None:
+    """Write ``activities`` into the actors' and their followers' timelines.
+
+    Followers of every actor are loaded with one query; actors above the
+    fan-out cap only get their own copy. With ``live`` the items are also
+    pushed to ``/feed/stream`` once the transaction commits. Runs in the
+    caller's transaction; the caller commits.
+    """
+
+    activities = list(activities)
+    if not activities:
+        return
+    if live:
+        queue_live_items(db, [activity.as_item() for activity in activities])
+
+    actor_ids = {activity.actor_id for activity in activities if activity.actor_id}
+    followers: dict[UUID, list[UUID]] = defaultdict(list)
+    if actor_ids:
+        rows = db.execute(
+            select(Follow.followee_id, Follow.follower_id)
+            .join(User, User.id == Follow.followee_id)
+            .where(
+                Follow.followee_id.in_(actor_ids),
+                User.follower_count <= get_settings().feed_fanout_cap,
+            )
+        )
+        for followee_id, follower_id in rows:
+            followers[followee_id].append(follower_id)
+
+    club = [activity.subject_id for activity in activities if activity.actor_id is None]
+    if club:
+        # Club items have no owner to de-duplicate on; replace earlier versions.
+        db.execute(
+            delete(FeedEntry).where(
+                FeedEntry.owner_id.is_(None),
+                FeedEntry.kind == "club",
+                FeedEntry.subject_id.in_(club),
+            )
+        )
+
+    _insert_entries(
+        db,
+        (
+            _entry(owner_id, activity)
+            for activity in activities
+            for owner_id in _owners(activity, followers)
+        ),
+    )
+
+
+def _owners(activity: FeedActivity, followers: dict[UUID, list[UUID]]) -> list[UUID | None]:
+    # Club items have no owner; everything else goes to the actor and followers.
+    if activity.actor_id is None:
+        return [None]
+    return [activity.actor_id, *followers[activity.actor_id]]
+
+
+def follow(db: Session, follower_id: UUID, followee_id: UUID) -> bool:
+    """Record a follow and backfill the followee's recent items.
+
+    Returns ``False`` if the follow already existed. Runs in the caller's
+    transaction; the caller commits.
+    """
+
+    insert = dialect_insert(db)(Follow).values(
+        id=uuid.uuid4(), follower_id=follower_id, followee_id=followee_id
+    )
+    created = db.execute(
+        insert.on_conflict_do_nothing(
+            index_elements=[Follow.follower_id, Follow.followee_id]
+        ).returning(Follow.id, Follow.created_at)
+    ).first()
+    if created is None:
+        return False
+    queue_live_items(
+        db, [_follow_item(db, created.id, created.created_at, follower_id, followee_id)]
+    )
+
+    follower_count = db.execute(
+        update(User)
+        .where(User.id == followee_id)
+        .values(follower_count=User.follower_count + 1)
+        .returning(User.follower_count)
+    ).scalar_one()
+    if follower_count <= get_settings().feed_fanout_cap:
+        _backfill(db, followee_id, [follower_id])
+    return True
+
+
+def _backfill(db: Session, actor_id: UUID, owner_ids: Iterable[UUID]) -> None:
+    """Copy the actor's ``FOLLOW_BACKFILL_ITEMS`` newest own entries to ``owner_ids``."""
+
+    recent = db.scalars(
+        _own_entries(select(FeedEntry), actor_id)
+        .order_by(FeedEntry.occurred_at.desc(), FeedEntry.id.desc())
+        .limit(FOLLOW_BACKFILL_ITEMS)
+    ).all()
+    _insert_entries(
+        db,
+        (
+            {
+                "id": uuid.uuid4(),
+                "owner_id": owner_id,
+                "actor_id": entry.actor_id,
+                "kind": entry.kind,
+                "subject_id": entry.subject_id,
+                "occurred_at": entry.occurred_at,
+                "payload": entry.payload,
+            }
+            for owner_id in owner_ids
+            for entry in recent
+        ),
+    )
+
+
+def _follow_item(
+    db: Session, follow_id: UUID, created_at: datetime, follower_id: UUID, followee_id: UUID
+) -> dict[str, Any]:
+    names = {
+        row.id: _actor_name(row.display_name, row.handle)
+        for row in db.execute(
+            select(User.id, User.display_name, User.handle).where(
+                User.id.in_([follower_id, followee_id])
+            )
+        )
+    }
+    return FeedActivity(
+        kind="follow",
+        subject_id=follow_id,
+        actor_id=follower_id,
+        occurred_at=created_at,
+        payload={
+            "actor": names[follower_id],
+            "actor_id": str(follower_id),
+            "action": "followed",
+            "target": names[followee_id],
+            "target_link": f"/u/{followee_id}",
+            "rating": None,
+            "metadata": {"followee_id": str(followee_id)},
+        },
+    ).as_item()
+
+
+def unfollow(db: Session, follower_id: UUID, followee_id: UUID) -> bool:
+    """Remove a follow and the followee's items from the follower's timeline.
+
+    When the followee drops back to the fan-out cap, their items are read
+    from the remaining followers' own timelines again, so those get the
+    followee's recent items, which were not fanned out while above the cap.
+    Returns ``False`` if there was no such follow. Runs in the caller's
+    transaction; the caller commits.
+    """
+
+    removed = db.execute(
+        delete(Follow).where(Follow.follower_id == follower_id, Follow.followee_id == followee_id)
+    ).rowcount
+    if not removed:
+        return False
+    follower_count = db.execute(
+        update(User)
+        .where(User.id == followee_id)
+        .values(follower_count=User.follower_count - 1)
+        .returning(User.follower_count)
+    ).scalar_one()
+    db.execute(
+        delete(FeedEntry).where(
+            FeedEntry.owner_id == follower_id, FeedEntry.actor_id == followee_id
+        )
+    )
+    if follower_count == get_settings().feed_fanout_cap:
+        _backfill(
+            db,
+            followee_id,
+            db.scalars(select(Follow.follower_id).where(Follow.followee_id == followee_id)).all(),
+        )
+    return True
+
+
+def _own_entries(query: Select, actor_id: Any) -> Select:
+    return query.where(FeedEntry.owner_id == actor_id, FeedEntry.actor_id == actor_id)
+
+
+def timeline_query(
+    user_id: UUID, limit: int, after: tuple[datetime, UUID] | None = None
+) -> Select:
+    """``limit`` entries of a user's home timeline older than the ``after``
+    ``(occurred_at, id)`` key, newest first, as one statement.
+
+    Three index range scans are merged: the user's own timeline, the own
+    entries of followed actors above the fan-out cap, and club-wide items.
+    """
+
+    widely_followed = (
+        select(Follow.followee_id)
+        .join(User, User.id == Follow.followee_id)
+        .where(
+            Follow.follower_id == user_id,
+            User.follower_count > get_settings().feed_fanout_cap,
+        )
+    )
+    newest = (FeedEntry.occurred_at.desc(), FeedEntry.id.desc())
+    older = (
+        and_(
+            FeedEntry.occurred_at <= after[0],
+            or_(FeedEntry.occurred_at < after[0], FeedEntry.id < after[1]),
+        )
+        if after is not None
+        else true()
+    )
+    branches = [
+        select(FeedEntry)
+        .where(
+            FeedEntry.owner_id == user_id, FeedEntry.actor_id.not_in(widely_followed), older
+        )
+        .order_by(*newest)
+        .limit(limit),
+        select(FeedEntry)
+        .where(
+            FeedEntry.actor_id.in_(widely_followed),
+            FeedEntry.owner_id == FeedEntry.actor_id,
+            older,
+        )
+        .order_by(*newest)
+        .limit(limit),
+        select(FeedEntry)
+        .where(FeedEntry.owner_id.is_(None), older)
+        .order_by(*newest)
+        .limit(limit),
+    ]
+    # SQLite only accepts ORDER BY/LIMIT inside a compound SELECT via subqueries.
+    merged = union_all(*(select(branch.subquery()) for branch in branches)).subquery()
+    entry = aliased(FeedEntry, merged)
+    return select(entry).order_by(entry.occurred_at.desc(), entry.id.desc()).limit(limit)
+
+
+def rebuild_feeds(db: Session, listens_since: datetime | None = None) -> int:
+    """Recompute follower counts and every timeline from the source tables.
+
+    Listens are only replayed from ``listens_since`` onwards (all of them when
+    ``None``). Returns the number of entries written. Runs in the caller's
+    transaction; the caller commits.
+    """
+
+    db.execute(delete(FeedEntry))
+    follower_counts = (
+        select(func.count(Follow.id)).where(Follow.followee_id == User.id).scalar_subquery()
+    )
+    db.execute(update(User).values(follower_count=follower_counts))
+
+    ratings = db.scalars(select(Rating).order_by(Rating.created_at))
+    for rating_batch in _batched(ratings, INSERT_BATCH_SIZE):
+        publish_activities(db, rating_activities(db, rating_batch), live=False)
+
+    nominations = db.scalars(select(Nomination).order_by(Nomination.submitted_at))
+    for nomination_batch in _batched(nominations, INSERT_BATCH_SIZE):
+        publish_activities(db, nomination_activities(db, nomination_batch), live=False)
+
+    listens = select(ListenEvent).order_by(ListenEvent.played_at)
+    if listens_since is not None:
+        listens = listens.where(ListenEvent.played_at >= listens_since)
+    for listen_batch in _batched(
+        db.scalars(listens.execution_options(yield_per=INSERT_BATCH_SIZE)), INSERT_BATCH_SIZE
+    ):
+        publish_activities(db, listen_activities(db, listen_batch), live=False)
+
+    winners = db.execute(
+        select(Week, Album).join(Album, Album.id == Week.winner_album_id)
+    ).all()
+    publish_activities(
+        db,
+        [club_winner_activity(week, album, week.created_at) for week, album in winners],
+        live=False,
+    )
+    return db.scalar(select(func.count()).select_from(FeedEntry)) or 0
@@ -0,0 +1,151 @@
+"""In-process pub/sub behind ``GET /feed/stream``.
+
+Write paths queue rendered feed items on their session with
+:func:`queue_live_items` (``publish_activities`` does this for ratings,
+nominations, listens and club winners). The items reach the
+:class:`FeedBroker` only once the transaction commits, and are dropped on
+rollback. The broker numbers every item, keeps the newest ones in a ring
+buffer so reconnecting clients can resume from ``Last-Event-ID``, and hands
+each item to every connected subscriber's queue.
+
+The broker lives in one process: with several API workers, a stream only
+sees writes made through its own worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import secrets
+import threading
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from apps.api.config import get_settings
+
+_PENDING_KEY = "feed_live_items"
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One stream's queue; ``overflowed`` is set when it fell too far behind."""
+
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[tuple[int, dict[str, Any]]]
+    overflowed: bool = field(default=False)
+
+    def _deliver(self, entry: tuple[int, dict[str, Any]]) -> None:
+        try:
+            self.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class FeedBroker:
+    """Numbers published items, buffers the newest and fans them out.
+
+    Event ids are ``<epoch>-<seq>``; the random epoch changes whenever the
+    process restarts, so a stale ``Last-Event-ID`` is recognised instead of
+    being matched against unrelated sequence numbers.
+    """
+
+    def __init__(self, backlog: int = 1000, queue_size: int = 1000) -> None:
+        self.epoch = secrets.token_hex(4)
+        self.queue_size = queue_size
+        self._seq = 0
+        self._backlog: deque[tuple[int, dict[str, Any]]] = deque(maxlen=backlog)
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, value: str | None) -> int | None:
+        """Sequence number of ``value`` if it was issued by this broker."""
+
+        epoch, _, seq = (value or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, items: Iterable[dict[str, Any]]) -> None:
+        """Number ``items``, buffer them and deliver them to every subscriber.
+
+        Safe to call from any thread; delivery happens on each subscriber's
+        event loop.
+        """
+
+        with self._lock:
+            entries = []
+            for item in items:
+                self._seq += 1
+                entries.append((self._seq, item))
+            self._backlog.extend(entries)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            for entry in entries:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, entry)
+
+    def subscribe(self) -> Subscription:
+        """Register a queue for items published from now on (call on the event loop)."""
+
+        subscription = Subscription(
+            loop=asyncio.get_running_loop(), queue=asyncio.Queue(maxsize=self.queue_size)
+        )
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def replay(self, after_seq: int) -> list[tuple[int, dict[str, Any]]] | None:
+        """Buffered items newer than ``after_seq``.
+
+        Returns ``None`` if items after ``after_seq`` already fell out of
+        the buffer; the client has to reload the feed instead.
+        """
+
+        with self._lock:
+            if after_seq > self._seq:
+                return None
+            oldest = self._backlog[0][0] if self._backlog else self._seq + 1
+            if after_seq + 1 < oldest:
+                return None
+            return [entry for entry in self._backlog if entry[0] > after_seq]
+
+
+_feed_broker: FeedBroker | None = None
+
+
+def get_feed_broker() -> FeedBroker:
+    """Return the process-wide broker, created from settings."""
+
+    global _feed_broker
+    if _feed_broker is None:
+        _feed_broker = FeedBroker(backlog=get_settings().feed_stream_backlog)
+    return _feed_broker
+
+
+def queue_live_items(db: Session, items: Iterable[dict[str, Any]]) -> None:
+    """Publish rendered feed items once ``db``'s transaction commits."""
+
+    db.info.setdefault(_PENDING_KEY, []).extend(items)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    items = session.info.pop(_PENDING_KEY, None)
+    if items:
+        get_feed_broker().publish(items)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_rolled_back(session: Session, previous_transaction: Any) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -10,7 +10,10 @@ from sqlalchemy.orm import Session
 
 from apps.api.external import lastfm
 from apps.api.models import Album, ListenEvent, ListenSource, Track
+from .feed import listen_activities, publish_activities
 from .metadata import resolve_recording_mbid, upsert_album_from_release_group
+from .listen_charts import record_listen_sketches
+from .trending import listen_trending_events, record_trending
 
 
 def _latest_played_ts(db: Session, user_id) -> Optional[int]:
@@ -37,6 +40,7 @@ def ingest_lastfm(db: Session, *, user_id, lastfm_username: str, since_ts: int |
     tracks = payload.get("track", []) or []
     inserted = 0
     last_ts = since_ts or 0
+    events: list[ListenEvent] = []
 
     for item in tracks:
         # Skip now playing items
@@ -109,9 +113,14 @@ def ingest_lastfm(db: Session, *, user_id, lastfm_username: str, since_ts: int |
             metadata_={"lastfm": item},
         )
         db.add(event)
+        events.append(event)
         inserted += 1
         if ts > (last_ts or 0):
             last_ts = ts
 
+    db.flush()
+    publish_activities(db, listen_activities(db, events))
+    record_trending(db, listen_trending_events(db, events))
+    record_listen_sketches(db, events)
     db.commit()
     return {"inserted": inserted, "last_ts": last_ts}
@@ -0,0 +1,303 @@
+"""Approximate top tracks and artists from bounded-size listen summaries.
+
+Listen writes fold each batch into ``listen_sketches``: one
+:class:`HeavyHitters` summary per scope (the club, or one user), dimension
+(track or artist) and UTC day. Charts merge the summaries of the requested
+days instead of counting ``listen_events``.
+
+:class:`HeavyHitters` is a mergeable Misra-Gries / Space-Saving summary
+holding at most ``capacity`` counters (``LISTEN_SKETCH_CAPACITY``). Each
+counter is a lower bound on an item's plays, and a single ``error`` bounds
+how far below the truth any counter may be::
+
+    count(x) <= plays(x) <= count(x) + error      (listed items)
+    plays(x) <= error                             (items not listed)
+    error <= total / (capacity + 1)
+
+A summary that never held more than ``capacity`` distinct items is exact
+(``error == 0``). Merging two summaries (Agarwal et al., "Mergeable
+Summaries") keeps the same guarantee for the combined stream. That is why
+days, club shards and summaries written by different workers can be
+combined in any order.
+"""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from apps.api.config import get_settings
+from apps.api.db import dialect_insert
+from apps.api.models import ListenEvent, ListenSketch, Track
+from apps.api.services.week_stats import VersionedCache
+
+CLUB_SCOPE = "club"
+# Rows streamed at a time when replaying history.
+REPLAY_BATCH = 10_000
+
+
+@dataclass
+class HeavyHitters:
+    """At most ``capacity`` lower-bound counters plus one shared ``error``."""
+
+    capacity: int
+    counters: dict[str, int] = field(default_factory=dict)
+    total: int = 0
+    error: int = 0
+
+    @classmethod
+    def exact(cls, capacity: int, counts: Mapping[str, int]) -> HeavyHitters:
+        summary = cls(capacity, dict(counts), sum(counts.values()))
+        summary._reduce()
+        return summary
+
+    def merge(self, other: HeavyHitters) -> HeavyHitters:
+        """Combine two summaries into a new one of this summary's capacity."""
+
+        counters = Counter(self.counters)
+        counters.update(other.counters)
+        merged = HeavyHitters(
+            self.capacity, dict(counters), self.total + other.total, self.error + other.error
+        )
+        merged._reduce()
+        return merged
+
+    def _reduce(self) -> None:
+        # Subtract the (capacity + 1)-th largest counter from every counter
+        # and drop those that reach zero; the subtracted amount is the most
+        # any single item can lose.
+        if len(self.counters) <= self.capacity:
+            return
+        cut = sorted(self.counters.values(), reverse=True)[self.capacity]
+        self.counters = {
+            item: count - cut for item, count in self.counters.items() if count > cut
+        }
+        self.error += cut
+
+    def top(self, k: int) -> list[tuple[str, int]]:
+        """The ``k`` largest counters, highest first (ties by item)."""
+
+        return sorted(self.counters.items(), key=lambda entry: (-entry[1], entry[0]))[:k]
+
+    @classmethod
+    def from_row(cls, capacity: int, row: Any) -> HeavyHitters:
+        summary = cls(capacity, dict(row.counters or {}), row.total, row.error)
+        summary._reduce()
+        return summary
+
+
+# Merged chart summaries keyed by (scope, dimension, first day).
+chart_cache: VersionedCache[tuple[str, str, datetime], HeavyHitters] = VersionedCache()
+
+
+def _day(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _capacity() -> int:
+    return get_settings().listen_sketch_capacity
+
+
+def _batch_counts(
+    rows: Iterable[tuple[UUID, datetime, UUID, str]],
+) -> dict[tuple[str, str, datetime], Counter[str]]:
+    # rows: (user id, played_at, track id, artist name)
+    counts: dict[tuple[str, str, datetime], Counter[str]] = {}
+    for user_id, played_at, track_id, artist_name in rows:
+        bucket = _day(played_at)
+        for scope in (CLUB_SCOPE, str(user_id)):
+            counts.setdefault((scope, "track", bucket), Counter())[str(track_id)] += 1
+            counts.setdefault((scope, "artist", bucket), Counter())[artist_name[:255]] += 1
+    return counts
+
+
+def _write(db: Session, counts: dict[tuple[str, str, datetime], Counter[str]]) -> None:
+    """Merge exact ``counts`` into the stored summaries (row-locked read-modify-write).
+
+    Three statements regardless of how many summaries the batch touches:
+    create the missing rows, lock every row, write them all back.
+    """
+
+    if not counts:
+        return
+    capacity = _capacity()
+    shards = max(1, get_settings().listen_sketch_shards)
+    batch = {
+        (scope, dimension, bucket, random.randrange(shards) if scope == CLUB_SCOPE else 0): items
+        for (scope, dimension, bucket), items in counts.items()
+    }
+    # Sorted keys give concurrent writers the same lock order.
+    keys = sorted(batch)
+    db.execute(
+        dialect_insert(db)(ListenSketch)
+        .values(
+            [
+                {
+                    "scope": scope,
+                    "dimension": dimension,
+                    "bucket_start": bucket,
+                    "shard": shard,
+                    "total": 0,
+                    "error": 0,
+                    "counters": {},
+                    "revision": 0,
+                }
+                for scope, dimension, bucket, shard in keys
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+    key_columns = (
+        ListenSketch.scope,
+        ListenSketch.dimension,
+        ListenSketch.bucket_start,
+        ListenSketch.shard,
+    )
+    rows = db.execute(
+        select(
+            *key_columns,
+            ListenSketch.total,
+            ListenSketch.error,
+            ListenSketch.counters,
+            ListenSketch.revision,
+        )
+        .where(tuple_(*key_columns).in_(keys))
+        .order_by(*key_columns)
+        .with_for_update()
+    ).all()
+    updates = []
+    for row in rows:
+        key = (row.scope, row.dimension, _day(row.bucket_start), row.shard)
+        summary = HeavyHitters.from_row(capacity, row).merge(
+            HeavyHitters.exact(capacity, batch[key])
+        )
+        updates.append(
+            {
+                "scope": row.scope,
+                "dimension": row.dimension,
+                "bucket_start": row.bucket_start,
+                "shard": row.shard,
+                "total": summary.total,
+                "error": summary.error,
+                "counters": summary.counters,
+                "revision": row.revision + 1,
+            }
+        )
+    # Bulk UPDATE by primary key: one executemany statement.
+    db.execute(update(ListenSketch), updates)
+
+
+def record_listen_sketches(db: Session, listens: list[ListenEvent]) -> None:
+    """Fold freshly written listens into the day summaries (one query for artists).
+
+    Runs in the caller's transaction; the caller commits.
+    """
+
+    if not listens:
+        return
+    artists: dict[UUID, str] = dict(
+        db.execute(
+            select(Track.id, Track.artist_name).where(
+                Track.id.in_({listen.track_id for listen in listens})
+            )
+        )
+        .tuples()
+        .all()
+    )
+    _write(
+        db,
+        _batch_counts(
+            (listen.user_id, listen.played_at, listen.track_id, artists[listen.track_id])
+            for listen in listens
+            if listen.track_id in artists
+        ),
+    )
+
+
+def _history(db: Session, since: datetime) -> Iterator[list[tuple[UUID, datetime, UUID, str]]]:
+    """Listens since ``since`` grouped by UTC day, oldest day first."""
+
+    rows = db.execute(
+        select(ListenEvent.user_id, ListenEvent.played_at, Track.id, Track.artist_name)
+        .join(Track, Track.id == ListenEvent.track_id)
+        .where(ListenEvent.played_at >= since)
+        .order_by(ListenEvent.played_at)
+        .execution_options(yield_per=REPLAY_BATCH)
+    ).tuples()
+    day: list[tuple[UUID, datetime, UUID, str]] = []
+    for row in rows:
+        if day and _day(row[1]) != _day(day[0][1]):
+            yield day
+            day = []
+        day.append(row)
+    if day:
+        yield day
+
+
+def rebuild_listen_sketches(db: Session, *, since: datetime) -> int:
+    """Recompute the summaries of every day from ``since`` on; returns the days written.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+
+    since = _day(since)
+    db.execute(delete(ListenSketch).where(ListenSketch.bucket_start >= since))
+    days = 0
+    for listens in _history(db, since):
+        _write(db, _batch_counts(listens))
+        days += 1
+    chart_cache.clear()
+    return days
+
+
+@dataclass(frozen=True)
+class Chart:
+    """Merged summary of a scope and dimension over the requested days."""
+
+    summary: HeavyHitters
+    since: datetime
+
+
+def load_chart(
+    db: Session,
+    dimension: str,
+    *,
+    user_id: UUID | None = None,
+    days: int = 30,
+    now: datetime | None = None,
+) -> Chart:
+    """Merge the stored summaries of the last ``days`` UTC days (today included).
+
+    Reads one ``count``/``sum(revision)`` marker first; the merged summary
+    is cached until any of the underlying rows changes.
+    """
+
+    scope = str(user_id) if user_id is not None else CLUB_SCOPE
+    since = _day(now or datetime.now(timezone.utc)) - timedelta(days=days - 1)
+    in_range = (
+        ListenSketch.scope == scope,
+        ListenSketch.dimension == dimension,
+        ListenSketch.bucket_start >= since,
+    )
+    rows, revisions = db.execute(
+        select(func.count(), func.coalesce(func.sum(ListenSketch.revision), 0)).where(*in_range)
+    ).one()
+    cache_key = (scope, dimension, since)
+    version = int(rows) << 32 | int(revisions)
+    summary = chart_cache.get(cache_key, version)
+    if summary is None:
+        capacity = _capacity()
+        summary = HeavyHitters(capacity)
+        for row in db.scalars(select(ListenSketch).where(*in_range)):
+            summary = summary.merge(HeavyHitters.from_row(capacity, row))
+        chart_cache.put(cache_key, version, summary)
+    return Chart(summary=summary, since=since)
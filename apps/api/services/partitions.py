@@ -0,0 +1,141 @@
+"""Monthly partition maintenance for ``listen_events`` (PostgreSQL only).
+
+Partitions are named ``listen_events_yYYYYmMM`` and cover one calendar month
+of ``played_at`` in UTC. A ``listen_events_default`` partition catches rows
+outside the prepared range; when a month is created later, its rows are moved
+out of the default partition before the new partition is attached.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+PARENT_TABLE = "listen_events"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_PATTERN = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(value: datetime) -> datetime:
+    """Return the first instant of ``value``'s month in UTC."""
+
+    value = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + (value.month - 1) + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def _is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(
+        db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :name AND c.relnamespace = 'public'::regnamespace"
+            ),
+            {"name": PARENT_TABLE},
+        ).scalar()
+    )
+
+
+def list_partitions(db: Session) -> dict[str, datetime]:
+    """Return attached monthly partitions mapped to their month start."""
+
+    rows = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name"
+        ),
+        {"name": PARENT_TABLE},
+    ).scalars()
+
+    partitions: dict[str, datetime] = {}
+    for name in rows:
+        match = _PARTITION_PATTERN.match(name)
+        if match:
+            year, month = int(match.group(1)), int(match.group(2))
+            partitions[name] = datetime(year, month, 1, tzinfo=timezone.utc)
+    return partitions
+
+
+def _create_month_partition(db: Session, month: datetime) -> str:
+    name = partition_name(month)
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FROM ('{lower}') TO ('{upper}')"
+
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+    # ATTACH fails if the default partition still holds rows for this range,
+    # so move them across first.
+    db.execute(
+        text(
+            f"WITH moved AS ("
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE played_at >= :lower AND played_at < :upper "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"lower": lower, "upper": upper},
+    )
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+    return name
+
+
+def ensure_listen_event_partitions(
+    db: Session, *, months_ahead: int = 3, now: datetime | None = None
+) -> list[str]:
+    """Create missing monthly partitions from the current month onwards.
+
+    Returns the names of partitions created; a no-op outside PostgreSQL.
+    """
+
+    if not _is_partitioned(db):
+        return []
+
+    existing = set(list_partitions(db))
+    current = month_start(now or datetime.now(timezone.utc))
+    created: list[str] = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) not in existing:
+            created.append(_create_month_partition(db, month))
+
+    db.commit()
+    return created
+
+
+def detach_listen_event_partitions(
+    db: Session, *, older_than: datetime, drop: bool = False
+) -> list[str]:
+    """Detach (and optionally drop) partitions that end on/before ``older_than``.
+
+    Detaching is a catalog-only operation, so retiring a month of history does
+    not rewrite or vacuum the remaining table.
+    """
+
+    if not _is_partitioned(db):
+        return []
+
+    cutoff = month_start(older_than)
+    detached: list[str] = []
+    for name, month in sorted(list_partitions(db).items(), key=lambda item: item[1]):
+        if add_months(month, 1) > cutoff:
+            continue
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            db.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+
+    db.commit()
+    return detached
@@ -0,0 +1,113 @@
+"""Background MusicBrainz album resolution for searches with no local match.
+
+``/search`` never waits on the network: when a query finds no local album it
+queues :meth:`RemoteAlbumResolver.resolve` as a background task and answers
+with local results. The outcome is cached by normalised query, so the next
+``/search`` (or ``GET /search/remote``) for the same text returns the
+resolved album, and misses are not retried until their entry expires.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+
+from apps.api.db import session_scope
+from apps.api.services.metadata import upsert_album_from_release_group
+from apps.api.services.suggest import normalize
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteStatus(str, Enum):
+    IDLE = "idle"
+    PENDING = "pending"
+    RESOLVED = "resolved"
+    MISS = "miss"
+
+
+@dataclass
+class _Entry:
+    status: RemoteStatus
+    expires_at: float
+    album_id: uuid.UUID | None = None
+
+
+class RemoteAlbumResolver:
+    """Bounded LRU/TTL cache of MusicBrainz lookups keyed by normalised query."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        resolved_ttl: float = 24 * 3600,
+        miss_ttl: float = 15 * 60,
+        pending_ttl: float = 60,
+    ) -> None:
+        self.max_entries = max_entries
+        self.resolved_ttl = resolved_ttl
+        self.miss_ttl = miss_ttl
+        self.pending_ttl = pending_ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def lookup(self, query: str) -> tuple[RemoteStatus, uuid.UUID | None]:
+        """Return the cached status (and album id once resolved) for ``query``."""
+
+        key = normalize(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                return RemoteStatus.IDLE, None
+            self._entries.move_to_end(key)
+            return entry.status, entry.album_id
+
+    def claim(self, query: str) -> bool:
+        """Mark ``query`` pending; ``False`` if it is cached or already in flight."""
+
+        key = normalize(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                return False
+            self._store(key, _Entry(RemoteStatus.PENDING, now + self.pending_ttl))
+            return True
+
+    def resolve(self, query: str) -> None:
+        """Resolve ``query`` against MusicBrainz and upsert the album.
+
+        Runs outside the request on its own session; failures are cached as
+        misses so a flaky upstream is not hammered by every keystroke.
+        """
+
+        album_id: uuid.UUID | None = None
+        try:
+            with session_scope() as db:
+                album = upsert_album_from_release_group(db, artist_name=None, album_title=query)
+                album_id = album.id if album is not None else None
+        except Exception:
+            logger.warning("MusicBrainz lookup failed for %r", query, exc_info=True)
+
+        status = RemoteStatus.RESOLVED if album_id else RemoteStatus.MISS
+        ttl = self.resolved_ttl if album_id else self.miss_ttl
+        with self._lock:
+            self._store(normalize(query), _Entry(status, time.monotonic() + ttl, album_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+album_resolver = RemoteAlbumResolver()
@@ -0,0 +1,212 @@
+"""Substring search over users, albums and tracks that stays index-backed.
+
+PostgreSQL serves ``ILIKE '%term%'`` from ``pg_trgm`` GIN indexes (migration
+``0005_search_trigram_indexes``). SQLite development databases get FTS5
+tables using the ``trigram`` tokenizer, kept in sync with their base tables
+by triggers; once installed, :func:`text_search_clause` routes matches
+through them instead of scanning the base table. :func:`relevance_score`
+ranks the matches.
+
+The base tables have UUID keys and only an implicit ``rowid``, which
+``VACUUM`` may renumber, so each FTS table is keyed by a document id from a
+``<table>_fts_ids`` table mapping UUIDs to an ``INTEGER PRIMARY KEY``.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+from typing import Any
+
+from sqlalchemy import (
+    Float,
+    Select,
+    case,
+    cast,
+    func,
+    inspect,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import ColumnElement
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS: dict[str, tuple[str, ...]] = {
+    "users": ("display_name", "handle"),
+    "albums": ("title", "artist_name"),
+    "tracks": ("title", "artist_name"),
+}
+
+# Trigram indexes cannot narrow shorter terms.
+MIN_TRIGRAM_LENGTH = 3
+
+_sqlite_fts_tables: set[str] = set()
+
+
+def fts_table_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def fts_ids_table_name(table_name: str) -> str:
+    return f"{table_name}_fts_ids"
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _sqlite_statements(table_name: str, columns: tuple[str, ...]) -> list[str]:
+    fts = fts_table_name(table_name)
+    ids = fts_ids_table_name(table_name)
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    base_values = ", ".join(f"{table_name}.{column}" for column in columns)
+    assignments = ", ".join(f"{column} = new.{column}" for column in columns)
+    docid = f"(SELECT docid FROM {ids} WHERE id = {{row}}.id)"
+    return [
+        f"CREATE TABLE {ids} (docid INTEGER PRIMARY KEY, id NOT NULL UNIQUE)",
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, tokenize='trigram')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {ids} (id) VALUES (new.id); "
+        f"INSERT INTO {fts} (rowid, {names}) VALUES ({docid.format(row='new')}, {new_values}); "
+        "END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = {docid.format(row='old')}; "
+        f"DELETE FROM {ids} WHERE id = old.id; "
+        "END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+        f"UPDATE {fts} SET {assignments} WHERE rowid = {docid.format(row='old')}; "
+        "END",
+        f"INSERT INTO {ids} (id) SELECT id FROM {table_name}",
+        f"INSERT INTO {fts} (rowid, {names}) "
+        f"SELECT {ids}.docid, {base_values} "
+        f"FROM {table_name} JOIN {ids} ON {ids}.id = {table_name}.id",
+    ]
+
+
+def _drop_sqlite_statements(table_name: str) -> list[str]:
+    fts = fts_table_name(table_name)
+    return [
+        *(f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ("ai", "ad", "au")),
+        f"DROP TABLE IF EXISTS {fts}",
+        f"DROP TABLE IF EXISTS {fts_ids_table_name(table_name)}",
+    ]
+
+
+def install_sqlite_search_index(engine: Engine) -> list[str]:
+    """Create missing FTS5 search tables on a SQLite database.
+
+    Safe to call on every start-up; returns the names of tables created and
+    is a no-op for other backends. Tables from before the ``_fts_ids`` key
+    map (keyed by the base table's ``rowid``) are dropped and rebuilt.
+    """
+
+    if engine.dialect.name != "sqlite":
+        return []
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        logger.warning(
+            "SQLite %s lacks the FTS5 trigram tokenizer; search will scan tables",
+            sqlite3.sqlite_version,
+        )
+        return []
+
+    created: list[str] = []
+    with engine.begin() as conn:
+        existing = set(inspect(conn).get_table_names())
+        for table_name, columns in SEARCH_COLUMNS.items():
+            if table_name not in existing:
+                continue
+            fts = fts_table_name(table_name)
+            if fts_ids_table_name(table_name) not in existing:
+                for statement in _drop_sqlite_statements(table_name):
+                    conn.execute(text(statement))
+                for statement in _sqlite_statements(table_name, columns):
+                    conn.execute(text(statement))
+                created.append(fts)
+            _sqlite_fts_tables.add(table_name)
+    return created
+
+
+def text_search_clause(model: Any, term: str, *columns: Any) -> ColumnElement[bool]:
+    """Return a filter matching rows where any of ``columns`` contains ``term``.
+
+    Matching is case-insensitive substring matching, equivalent to
+    ``col ILIKE '%term%'`` on every backend.
+    """
+
+    table_name = model.__tablename__
+    if table_name in _sqlite_fts_tables and len(term) >= MIN_TRIGRAM_LENGTH:
+        fts = fts_table_name(table_name)
+        names = " ".join(column.key for column in columns)
+        ids = fts_ids_table_name(table_name)
+        match = literal_column(fts).op("MATCH")(f"{{{names}}} : {_fts_phrase(term)}")
+        matched: Select[Any] = (
+            select(literal_column(f"{ids}.id"))
+            .select_from(table(fts))
+            .join(table(ids), literal_column(f"{ids}.docid") == literal_column(f"{fts}.rowid"))
+            .where(match)
+        )
+        id_column: ColumnElement[Any] = model.id
+        return id_column.in_(matched)
+
+    pattern = f"%{escape_like(term)}%"
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns))
+
+
+# Relevance weights: exact beats prefix beats substring; similarity and
+# popularity order results within those tiers.
+EXACT_WEIGHT = 100.0
+PREFIX_WEIGHT = 40.0
+SIMILARITY_WEIGHT = 30.0
+POPULARITY_WEIGHT = 20.0
+# Popularity saturates: a count equal to this scores half the weight.
+POPULARITY_HALF_POINT = 10.0
+
+
+def match_tier(term: str, columns: tuple[Any, ...]) -> ColumnElement[float]:
+    """``EXACT_WEIGHT``, ``PREFIX_WEIGHT`` or 0 for how well ``columns`` match ``term``."""
+
+    lowered_term = term.lower()
+    lowered = [func.lower(column) for column in columns]
+    prefix = f"{escape_like(lowered_term)}%"
+    return case(
+        (or_(*(column == lowered_term for column in lowered)), EXACT_WEIGHT),
+        (or_(*(column.like(prefix, escape="\\") for column in lowered)), PREFIX_WEIGHT),
+        else_=0.0,
+    )
+
+
+def relevance_score(
+    dialect_name: str, term: str, columns: tuple[Any, ...], popularity: Any
+) -> ColumnElement[float]:
+    """Score rows matched by :func:`text_search_clause` for ranking.
+
+    ``columns[0]`` is the primary label used for similarity; ``popularity``
+    is a count expression, ideally a maintained column.
+    """
+
+    tier = match_tier(term, columns)
+    if dialect_name == "postgresql":
+        similarity = func.similarity(func.lower(columns[0]), term.lower())
+    else:
+        # Share of the label covered by the term; a stand-in for pg_trgm.
+        similarity = func.min(
+            literal(float(len(term))) / func.max(func.length(columns[0]), 1), 1.0
+        )
+    popularity_share = popularity * 1.0 / (popularity + POPULARITY_HALF_POINT)
+    return cast(
+        tier + similarity * SIMILARITY_WEIGHT + popularity_share * POPULARITY_WEIGHT,
+        Float,
+    )
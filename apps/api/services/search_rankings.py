@@ -0,0 +1,66 @@
+"""Frozen ``/search`` rankings that later pages read from.
+
+Popularity (followers, club ratings, chart plays) changes between requests,
+so re-ranking for every page could skip or repeat rows. The first page of a
+section ranks its ``SEARCH_CANDIDATE_LIMIT`` best matches once and stores the
+ordered ids here under a random token; the page cursor carries the token and
+an offset into that list.
+
+Rankings live in one process, like the MusicBrainz lookup cache. A cursor
+whose ranking expired or was made by another API worker is served from a
+fresh ranking, resuming after the last row the client received.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Ranking:
+    section: str
+    query: str
+    ids: tuple[uuid.UUID, ...]
+    expires_at: float
+
+
+class SearchRankings:
+    """Bounded LRU/TTL store of ranked result ids keyed by token."""
+
+    def __init__(self, *, max_entries: int = 256, ttl: float = 15 * 60) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Ranking] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def store(self, section: str, query: str, ids: list[uuid.UUID]) -> str:
+        """Keep ``ids`` (best first) for paging and return their token."""
+
+        token = secrets.token_urlsafe(9)
+        ranking = Ranking(section, query, tuple(ids), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[token] = ranking
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return token
+
+    def get(self, token: str, section: str, query: str) -> tuple[uuid.UUID, ...] | None:
+        """The ids stored under ``token`` for this section and query, if still held."""
+
+        with self._lock:
+            ranking = self._entries.get(token)
+            if ranking is None or ranking.expires_at <= time.monotonic():
+                self._entries.pop(token, None)
+                return None
+            self._entries.move_to_end(token)
+        if ranking.section != section or ranking.query != query:
+            return None
+        return ranking.ids
+
+
+search_rankings = SearchRankings()
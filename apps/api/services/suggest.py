@@ -0,0 +1,351 @@
+"""In-process prefix index behind ``GET /search/suggest``.
+
+The index holds user handles/display names, album titles, artist names and
+track titles as sorted arrays of normalised keys, one per suggestion type.
+Every word start of a label is indexed, so "side of" finds "The Dark Side of
+the Moon". Keys starting with a prefix form one contiguous range, and a
+segment tree over each array keeps the ``TOP_K`` best suggestions of every
+node's range, so a lookup ranks the whole range by popularity by merging
+O(log n) short lists. It never touches the database.
+
+Refreshes run on a background thread: an incremental refresh pulls rows whose
+``updated_at`` moved since the last pass, and a periodic full rebuild drops
+deleted rows and recomputes popularity (followers for users, ratings plus
+nominations for albums and artists, 30-day listens for tracks).
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+from apps.api.config import get_settings
+from apps.api.db import session_scope
+from apps.api.models import Album, Follow, Nomination, Rating, Track, User
+from apps.api.services.listen_charts import load_chart
+
+logger = logging.getLogger(__name__)
+
+MAX_WORD_STARTS = 6
+# Suggestions kept per tree node; the most a lookup can return (the
+# /search/suggest ``limit`` bound).
+TOP_K = 25
+TRACK_POPULARITY_WINDOW = timedelta(days=30)
+# Re-read rows changed slightly before the last refresh to cover commits that
+# were in flight while it ran.
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    type: str
+    id: str | None
+    label: str
+    detail: str | None = None
+    popularity: int = 0
+
+    def as_dict(self) -> dict[str, object]:
+        return {"type": self.type, "id": self.id, "label": self.label, "detail": self.detail}
+
+
+def normalize(value: str) -> str:
+    """Casefold and strip accents so "Björk" matches "bjork"."""
+
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.split())
+
+
+def _keys(label: str) -> list[str]:
+    normalized = normalize(label)
+    if not normalized:
+        return []
+    keys = [normalized]
+    position = normalized.find(" ")
+    while position != -1 and len(keys) < MAX_WORD_STARTS:
+        keys.append(normalized[position + 1 :])
+        position = normalized.find(" ", position + 1)
+    return keys
+
+
+def _search_terms(suggestion: Suggestion) -> tuple[str, ...]:
+    # Users are found by handle and by display name.
+    if suggestion.type == "user" and suggestion.detail:
+        return (suggestion.label, suggestion.detail)
+    return (suggestion.label,)
+
+
+def _rank(suggestion: Suggestion) -> tuple[int, int, str, str, str]:
+    # Total order, so equally popular suggestions merge deterministically.
+    return (
+        -suggestion.popularity,
+        len(suggestion.label),
+        suggestion.label,
+        suggestion.type,
+        suggestion.id or "",
+    )
+
+
+def _best(lists: Iterable[Iterable[int]], limit: int) -> list[int]:
+    """The ``limit`` best distinct rank positions among ``lists``."""
+
+    return heapq.nsmallest(limit, set().union(*lists))
+
+
+class _RangeTop:
+    """Sorted keys plus a segment tree of each node's ``TOP_K`` best suggestions.
+
+    Suggestions are stored as positions in rank order, and a suggestion
+    appears once per indexed key, so node lists are de-duplicated. The best
+    ``k`` distinct suggestions of a range are always among the best ``k`` of
+    the nodes covering it.
+    """
+
+    def __init__(self, pairs: list[tuple[str, int]]) -> None:
+        self.keys = [key for key, _ in pairs]
+        self._size = 1 << max(len(pairs) - 1, 0).bit_length()
+        tree: list[list[int]] = [[] for _ in range(self._size)]
+        tree.extend([position] for _, position in pairs)
+        tree.extend([] for _ in range(self._size - len(pairs)))
+        for node in range(self._size - 1, 0, -1):
+            tree[node] = _best((tree[2 * node], tree[2 * node + 1]), TOP_K)
+        self._tree = tree
+
+    def top(self, prefix: str, limit: int) -> list[int]:
+        start = bisect.bisect_left(self.keys, prefix)
+        # Every key starting with ``prefix`` sorts before ``prefix + U+FFFF``.
+        end = bisect.bisect_left(self.keys, prefix + "\uffff", start)
+        lists = []
+        low, high = start + self._size, end + self._size
+        while low < high:
+            if low & 1:
+                lists.append(self._tree[low])
+                low += 1
+            if high & 1:
+                high -= 1
+                lists.append(self._tree[high])
+            low //= 2
+            high //= 2
+        return _best(lists, limit)
+
+
+class PrefixIndex:
+    """Immutable per-type prefix indexes; rebuilt and swapped on refresh."""
+
+    def __init__(self, suggestions: Iterable[Suggestion]) -> None:
+        self._ranked = sorted(set(suggestions), key=_rank)
+        pairs = sorted(
+            (key, position)
+            for position, suggestion in enumerate(self._ranked)
+            for term in _search_terms(suggestion)
+            for key in _keys(term)
+        )
+        by_type: dict[str, list[tuple[str, int]]] = {}
+        for pair in pairs:
+            by_type.setdefault(self._ranked[pair[1]].type, []).append(pair)
+        self._types = {kind: _RangeTop(type_pairs) for kind, type_pairs in by_type.items()}
+
+    def __len__(self) -> int:
+        return sum(len(index.keys) for index in self._types.values())
+
+    def lookup(
+        self, prefix: str, *, limit: int = 10, types: Iterable[str] | None = None
+    ) -> list[Suggestion]:
+        """The ``limit`` (at most ``TOP_K``) most popular suggestions matching ``prefix``."""
+
+        term = normalize(prefix)
+        if not term:
+            return []
+        limit = min(limit, TOP_K)
+        wanted = set(types) if types else self._types.keys()
+        positions = _best(
+            (self._types[kind].top(term, limit) for kind in wanted if kind in self._types), limit
+        )
+        return [self._ranked[position] for position in positions]
+
+
+class SuggestionIndex:
+    """Holds the current :class:`PrefixIndex` and refreshes it in the background."""
+
+    def __init__(self, *, refresh_seconds: float = 30, rebuild_seconds: float = 900) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._index = PrefixIndex([])
+        self._entries: dict[tuple[str, str], Suggestion] = {}
+        self._popularity: dict[tuple[str, str], int] = {}
+        self._synced_at: datetime | None = None
+        self._refreshed_at = 0.0
+        self._rebuilt_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._synced_at is not None
+
+    def lookup(
+        self, prefix: str, *, limit: int = 10, types: Iterable[str] | None = None
+    ) -> list[Suggestion]:
+        self.refresh_in_background()
+        return self._index.lookup(prefix, limit=limit, types=types)
+
+    def refresh_in_background(self) -> None:
+        """Start a refresh thread if the index is stale and none is running."""
+
+        if time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return
+        if self._lock.locked():
+            return
+        threading.Thread(target=self.refresh, name="search-suggest-refresh", daemon=True).start()
+
+    def refresh(self, *, full: bool | None = None) -> None:
+        """Synchronise with the database; a full rebuild when ``full`` or due."""
+
+        with self._lock:
+            self._refresh(full)
+
+    def _refresh(self, full: bool | None) -> None:
+        try:
+            if full is None:
+                full = (
+                    self._synced_at is None
+                    or time.monotonic() - self._rebuilt_at >= self.rebuild_seconds
+                )
+            with session_scope() as db:
+                self._sync(db, full=full)
+        except Exception:  # pragma: no cover - keep serving the previous index
+            logger.exception("Search suggestion refresh failed")
+        finally:
+            self._refreshed_at = time.monotonic()
+
+    def _sync(self, db: Session, *, full: bool) -> None:
+        started = datetime.now(timezone.utc)
+        since = None if full or self._synced_at is None else self._synced_at - REFRESH_OVERLAP
+
+        if full:
+            self._popularity = _load_popularity(db)
+            entries: dict[tuple[str, str], Suggestion] = {}
+        else:
+            entries = dict(self._entries)
+
+        changed = 0
+        for suggestion in _load_changed(db, since):
+            key = (suggestion.type, suggestion.id or normalize(suggestion.label))
+            entries[key] = replace(suggestion, popularity=self._popularity.get(key, 0))
+            changed += 1
+
+        if full:
+            self._add_artists(entries)
+        elif changed:
+            self._add_artists(entries, only_missing=True)
+
+        if full or changed:
+            self._entries = entries
+            self._index = PrefixIndex(entries.values())
+        self._synced_at = started
+        if full:
+            self._rebuilt_at = time.monotonic()
+        logger.debug("Search suggestions synced: full=%s changed=%d", full, changed)
+
+    def _add_artists(
+        self, entries: dict[tuple[str, str], Suggestion], *, only_missing: bool = False
+    ) -> None:
+        names: dict[str, str] = {}
+        for (kind, _), suggestion in list(entries.items()):
+            if kind in ("album", "track") and suggestion.detail:
+                names.setdefault(normalize(suggestion.detail), suggestion.detail)
+        for key, name in names.items():
+            entry_key = ("artist", key)
+            if only_missing and entry_key in entries:
+                continue
+            entries[entry_key] = Suggestion(
+                type="artist",
+                id=None,
+                label=name,
+                popularity=self._popularity.get(entry_key, 0),
+            )
+
+
+def _changed(stmt, column, since: datetime | None):
+    return stmt if since is None else stmt.where(column >= since)
+
+
+def _load_changed(db: Session, since: datetime | None) -> Iterable[Suggestion]:
+    users = db.execute(
+        _changed(select(User.id, User.display_name, User.handle), User.updated_at, since)
+    )
+    for user_id, display_name, handle in users:
+        yield Suggestion(
+            type="user",
+            id=str(user_id),
+            label=handle or display_name,
+            detail=display_name if handle else None,
+        )
+
+    albums = db.execute(
+        _changed(select(Album.id, Album.title, Album.artist_name), Album.updated_at, since)
+    )
+    for album_id, title, artist_name in albums:
+        yield Suggestion(type="album", id=str(album_id), label=title, detail=artist_name)
+
+    tracks = db.execute(
+        _changed(select(Track.id, Track.title, Track.artist_name), Track.updated_at, since)
+    )
+    for track_id, title, artist_name in tracks:
+        yield Suggestion(type="track", id=str(track_id), label=title, detail=artist_name)
+
+
+def _load_popularity(db: Session) -> dict[tuple[str, str], int]:
+    popularity: dict[tuple[str, str], int] = {}
+
+    followers = db.execute(
+        select(Follow.followee_id, func.count()).group_by(Follow.followee_id)
+    )
+    for user_id, count in followers:
+        popularity[("user", str(user_id))] = count
+
+    album_refs = union_all(
+        select(Rating.album_id.label("album_id")),
+        select(Nomination.album_id.label("album_id")),
+    ).subquery()
+    album_counts = db.execute(
+        select(Album.id, Album.artist_name, func.count())
+        .join(album_refs, album_refs.c.album_id == Album.id)
+        .group_by(Album.id, Album.artist_name)
+    )
+    for album_id, artist_name, count in album_counts:
+        popularity[("album", str(album_id))] = count
+        artist_key = ("artist", normalize(artist_name))
+        popularity[artist_key] = popularity.get(artist_key, 0) + count
+
+    # Club-wide heavy hitters; tracks outside the chart rank as unplayed.
+    chart = load_chart(db, "track", days=TRACK_POPULARITY_WINDOW.days)
+    for track_id, count in chart.summary.counters.items():
+        popularity[("track", track_id)] = count
+
+    return popularity
+
+
+_suggestion_index: SuggestionIndex | None = None
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    """Return the process-wide suggestion index, created from settings."""
+
+    global _suggestion_index
+    if _suggestion_index is None:
+        settings = get_settings()
+        _suggestion_index = SuggestionIndex(
+            refresh_seconds=settings.search_suggest_refresh_seconds,
+            rebuild_seconds=settings.search_suggest_rebuild_seconds,
+        )
+    return _suggestion_index
@@ -0,0 +1,498 @@
+"""Time-decayed trending scores for albums, tracks and artists (``trending_scores``).
+
+Every listen adds 1 to its track, album and artist and every rating adds
+``TRENDING_RATING_WEIGHT`` to its album and artist, in each configured window
+(``TRENDING_WINDOWS``, e.g. ``24h``, ``7d``, ``30d``). A contribution decays
+as ``e^(-age / window)``: one window later it is worth 37%, three windows
+later 5%.
+
+Scores are stored relative to a per-window anchor time
+(``trending_spans.anchor_at``) as ``Σ weight · e^((t - anchor) / window)``.
+Decaying every row by the same factor does not change the order, so writes
+only ever add to a row (:func:`record_trending`, in the writer's transaction)
+and ranked reads are an index range scan on ``ix_trending_scores_rank``. The
+score as of ``now`` is the stored value times ``e^(-(now - anchor) / window)``
+(:func:`decayed_score`).
+
+:func:`decay_trending` moves the anchors to the present, rescales the stored
+scores and prunes rows that decayed below ``TRENDING_MIN_SCORE``. Run it
+periodically (``python -m apps.api.cli decay-trending``, e.g. hourly); it
+also keeps stored values well inside float range. :func:`rebuild_trending`
+recomputes everything from recent listens and ratings.
+
+``/trending`` does not read these scores. :func:`publish_trending_snapshot`
+(``python -m apps.api.cli snapshot-trending``, e.g. every few minutes)
+copies the top ``TRENDING_SNAPSHOT_SIZE`` rows of every window and entity
+type into a new ``trending_snapshots`` row in one transaction. Readers page
+through the newest committed snapshot, so a home-page read touches only
+the K entries it returns and never waits on listen or rating writes.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+
+from sqlalchemy import Row, Select, and_, delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from apps.api.config import get_settings
+from apps.api.db import dialect_insert
+from apps.api.models import (
+    Album,
+    ListenEvent,
+    Rating,
+    Track,
+    TrendingScore,
+    TrendingSnapshot,
+    TrendingSnapshotEntry,
+    TrendingSpan,
+)
+
+# Upsert statements are split so bind parameter counts stay bounded.
+UPSERT_BATCH = 1000
+# Rows streamed at a time when replaying history.
+REPLAY_BATCH = 10_000
+# Single contributions below this fraction of TRENDING_MIN_SCORE are not
+# recorded (e.g. listens backfilled from years ago).
+NEGLIGIBLE_FRACTION = 0.01
+
+_WINDOW_PATTERN = re.compile(r"^(\d+)([hd])$")
+
+
+class TrendingEntity(str, Enum):
+    ALBUM = "album"
+    TRACK = "track"
+    ARTIST = "artist"
+
+
+@dataclass(frozen=True)
+class TrendingEvent:
+    """One weighted contribution to an album, track or artist."""
+
+    entity_type: TrendingEntity
+    entity_key: str
+    title: str
+    artist_name: str | None
+    weight: float
+    occurred_at: datetime
+
+
+@dataclass
+class _ScoreRow:
+    """A ``trending_scores`` upsert row accumulating one key's increments."""
+
+    span: str
+    entity_type: str
+    entity_key: str
+    title: str
+    artist_name: str | None
+    score: float
+
+
+def parse_window(value: str) -> timedelta:
+    """Parse ``"<n>h"`` or ``"<n>d"`` into a positive duration."""
+
+    match = _WINDOW_PATTERN.match(value)
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid trending window {value!r}; expected e.g. '24h' or '7d'.")
+    amount = int(match.group(1))
+    return timedelta(hours=amount) if match.group(2) == "h" else timedelta(days=amount)
+
+
+def trending_windows() -> dict[str, timedelta]:
+    """Configured windows by name, in configuration order."""
+
+    return {name: parse_window(name) for name in get_settings().trending_windows}
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes for timezone-aware columns.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def decayed_score(score: float, anchor_at: datetime, window: timedelta, now: datetime) -> float:
+    """The stored ``score`` of a row decayed to ``now``."""
+
+    age = (now - _aware(anchor_at)).total_seconds() / window.total_seconds()
+    return score * math.exp(-age)
+
+
+def _album_events(
+    album_id: object, title: str, artist_name: str, weight: float, occurred_at: datetime
+) -> Iterator[TrendingEvent]:
+    yield TrendingEvent(
+        TrendingEntity.ALBUM, str(album_id), title, artist_name, weight, occurred_at
+    )
+    yield TrendingEvent(
+        TrendingEntity.ARTIST, artist_name[:255], artist_name, None, weight, occurred_at
+    )
+
+
+def _listen_events(rows: Iterable[Sequence]) -> Iterator[TrendingEvent]:
+    # rows: (played_at, track id, title, artist, album id, album title, album artist)
+    for played_at, track_id, title, artist_name, album_id, album_title, album_artist in rows:
+        yield TrendingEvent(
+            TrendingEntity.TRACK, str(track_id), title, artist_name, 1.0, played_at
+        )
+        yield TrendingEvent(
+            TrendingEntity.ALBUM, str(album_id), album_title, album_artist, 1.0, played_at
+        )
+        yield TrendingEvent(
+            TrendingEntity.ARTIST, artist_name[:255], artist_name, None, 1.0, played_at
+        )
+
+
+def _rating_events(rows: Iterable[Sequence]) -> Iterator[TrendingEvent]:
+    # rows: (created_at, album id, album title, album artist)
+    weight = get_settings().trending_rating_weight
+    for created_at, album_id, title, artist_name in rows:
+        yield from _album_events(album_id, title, artist_name, weight, created_at)
+
+
+def _listen_columns() -> Select:
+    return select(
+        ListenEvent.played_at,
+        Track.id,
+        Track.title,
+        Track.artist_name,
+        Album.id,
+        Album.title,
+        Album.artist_name,
+    )
+
+
+def listen_trending_events(db: Session, listens: list[ListenEvent]) -> list[TrendingEvent]:
+    """Contributions of freshly written listens (one query for titles)."""
+
+    if not listens:
+        return []
+    tracks = {
+        row.id: row
+        for row in db.execute(
+            select(
+                Track.id,
+                Track.title,
+                Track.artist_name,
+                Album.id.label("album_id"),
+                Album.title.label("album_title"),
+                Album.artist_name.label("album_artist"),
+            )
+            .join(Album, Album.id == Track.album_id)
+            .where(Track.id.in_({listen.track_id for listen in listens}))
+        )
+    }
+    return list(
+        _listen_events(
+            (listen.played_at, *tracks[listen.track_id])
+            for listen in listens
+            if listen.track_id in tracks
+        )
+    )
+
+
+def rating_trending_events(db: Session, ratings: list[Rating]) -> list[TrendingEvent]:
+    """Contributions of freshly written ratings (one query for titles)."""
+
+    if not ratings:
+        return []
+    albums = {
+        row.id: row
+        for row in db.execute(
+            select(Album.id, Album.title, Album.artist_name).where(
+                Album.id.in_({rating.album_id for rating in ratings})
+            )
+        )
+    }
+    return list(
+        _rating_events(
+            (rating.created_at, *albums[rating.album_id])
+            for rating in ratings
+            if rating.album_id in albums
+        )
+    )
+
+
+def _anchors(
+    db: Session, windows: dict[str, timedelta], now: datetime, *, for_update: bool = False
+) -> dict[str, datetime]:
+    """Anchor of every window, creating missing ones at ``now``.
+
+    Writers share-lock the anchor rows, so :func:`decay_trending` (which
+    locks them exclusively) never rescales a window while an increment
+    computed against the old anchor is in flight.
+    """
+
+    stmt = (
+        select(TrendingSpan.span, TrendingSpan.anchor_at)
+        .where(TrendingSpan.span.in_(list(windows)))
+        .with_for_update(read=not for_update)
+    )
+    anchors = dict(db.execute(stmt).tuples().all())
+    if len(anchors) < len(windows):
+        db.execute(
+            dialect_insert(db)(TrendingSpan)
+            .values([{"span": span, "anchor_at": now} for span in windows if span not in anchors])
+            .on_conflict_do_nothing(index_elements=[TrendingSpan.span])
+        )
+        anchors = dict(db.execute(stmt).tuples().all())
+    return {span: _aware(anchor_at) for span, anchor_at in anchors.items()}
+
+
+def record_trending(
+    db: Session, events: Iterable[TrendingEvent], *, now: datetime | None = None
+) -> int:
+    """Add ``events`` to the stored scores; returns the number of rows touched.
+
+    Runs in the caller's transaction; the caller commits. Contributions
+    already decayed below ``NEGLIGIBLE_FRACTION`` of ``TRENDING_MIN_SCORE``
+    are skipped, and future timestamps count as ``now``.
+    """
+
+    now = now or datetime.now(timezone.utc)
+    negligible = get_settings().trending_min_score * NEGLIGIBLE_FRACTION
+    windows = trending_windows()
+    seconds = {span: window.total_seconds() for span, window in windows.items()}
+    rows: dict[tuple[str, str, str], _ScoreRow] = {}
+    anchors: dict[str, datetime] | None = None
+
+    for event in events:
+        if anchors is None:
+            anchors = _anchors(db, windows, now)
+        occurred_at = min(_aware(event.occurred_at), now)
+        age = (now - occurred_at).total_seconds()
+        for span, anchor_at in anchors.items():
+            if event.weight * math.exp(-age / seconds[span]) < negligible:
+                continue
+            increment = event.weight * math.exp(
+                (occurred_at - anchor_at).total_seconds() / seconds[span]
+            )
+            key = (span, event.entity_type.value, event.entity_key)
+            row = rows.get(key)
+            if row is None:
+                rows[key] = _ScoreRow(
+                    span=span,
+                    entity_type=event.entity_type.value,
+                    entity_key=event.entity_key,
+                    title=event.title[:255],
+                    artist_name=event.artist_name[:255] if event.artist_name else None,
+                    score=increment,
+                )
+            else:
+                row.score += increment
+
+    # Sorted keys give concurrent writers the same lock order.
+    ordered = [asdict(rows[key]) for key in sorted(rows)]
+    for start in range(0, len(ordered), UPSERT_BATCH):
+        stmt = dialect_insert(db)(TrendingScore).values(ordered[start : start + UPSERT_BATCH])
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    TrendingScore.span,
+                    TrendingScore.entity_type,
+                    TrendingScore.entity_key,
+                ],
+                set_={
+                    "score": TrendingScore.score + stmt.excluded.score,
+                    "title": stmt.excluded.title,
+                    "artist_name": stmt.excluded.artist_name,
+                },
+            )
+        )
+    return len(ordered)
+
+
+def decay_trending(db: Session, *, now: datetime | None = None) -> int:
+    """Re-anchor every window at ``now`` and prune rows below the minimum score.
+
+    Returns the number of pruned rows. Runs in the caller's transaction;
+    the caller commits.
+    """
+
+    now = now or datetime.now(timezone.utc)
+    min_score = get_settings().trending_min_score
+    windows = trending_windows()
+    pruned = db.execute(
+        delete(TrendingScore).where(TrendingScore.span.not_in(list(windows)))
+    ).rowcount
+    db.execute(delete(TrendingSpan).where(TrendingSpan.span.not_in(list(windows))))
+
+    for span, anchor_at in _anchors(db, windows, now, for_update=True).items():
+        factor = math.exp(-(now - anchor_at).total_seconds() / windows[span].total_seconds())
+        db.execute(
+            update(TrendingScore)
+            .where(TrendingScore.span == span)
+            .values(score=TrendingScore.score * factor)
+        )
+        pruned += db.execute(
+            delete(TrendingScore).where(
+                TrendingScore.span == span, TrendingScore.score < min_score
+            )
+        ).rowcount
+        db.execute(update(TrendingSpan).where(TrendingSpan.span == span).values(anchor_at=now))
+    return pruned
+
+
+def _history(db: Session, since: datetime, now: datetime) -> Iterator[TrendingEvent]:
+    listens = (
+        _listen_columns()
+        .join(Track, Track.id == ListenEvent.track_id)
+        .join(Album, Album.id == Track.album_id)
+        .where(ListenEvent.played_at >= since, ListenEvent.played_at <= now)
+        .execution_options(yield_per=REPLAY_BATCH)
+    )
+    yield from _listen_events(db.execute(listens))
+    ratings = (
+        select(Rating.created_at, Album.id, Album.title, Album.artist_name)
+        .join(Album, Album.id == Rating.album_id)
+        .where(Rating.created_at >= since, Rating.created_at <= now)
+        .execution_options(yield_per=REPLAY_BATCH)
+    )
+    yield from _rating_events(db.execute(ratings))
+
+
+def rebuild_trending(db: Session, *, now: datetime | None = None) -> int:
+    """Recompute every score from listens and ratings; returns the row count.
+
+    Only history that :func:`record_trending` would not skip as negligible
+    in the longest window is replayed. Runs in the caller's transaction; the
+    caller commits.
+    """
+
+    now = now or datetime.now(timezone.utc)
+    settings = get_settings()
+    windows = trending_windows()
+    db.execute(delete(TrendingScore))
+    db.execute(delete(TrendingSpan))
+    if not windows:
+        return 0
+    db.execute(
+        dialect_insert(db)(TrendingSpan).values(
+            [{"span": span, "anchor_at": now} for span in windows]
+        )
+    )
+    heaviest = max(1.0, settings.trending_rating_weight)
+    negligible = settings.trending_min_score * NEGLIGIBLE_FRACTION
+    horizon = max(windows.values()) * max(1.0, math.log(heaviest / negligible))
+    return record_trending(db, _history(db, now - horizon, now), now=now)
+
+
+def ranked_query(
+    span: str,
+    entity_type: TrendingEntity,
+    limit: int,
+    after: tuple[float, str] | None = None,
+) -> Select:
+    """Highest stored scores first; ``after`` is the ``(score, key)`` of the last row served."""
+
+    stmt = (
+        select(
+            TrendingScore.entity_key,
+            TrendingScore.title,
+            TrendingScore.artist_name,
+            TrendingScore.score,
+            TrendingSpan.anchor_at,
+        )
+        .join(TrendingSpan, TrendingSpan.span == TrendingScore.span)
+        .where(TrendingScore.span == span, TrendingScore.entity_type == entity_type.value)
+    )
+    if after is not None:
+        score, key = after
+        stmt = stmt.where(
+            and_(
+                TrendingScore.score <= score,
+                or_(TrendingScore.score < score, TrendingScore.entity_key < key),
+            )
+        )
+    return stmt.order_by(TrendingScore.score.desc(), TrendingScore.entity_key.desc()).limit(
+        limit
+    )
+
+
+def publish_trending_snapshot(db: Session, *, now: datetime | None = None) -> TrendingSnapshot:
+    """Rank every window and entity type into a new snapshot.
+
+    Runs in the caller's transaction; readers switch to the snapshot when
+    the caller commits. Snapshots older than the newest
+    ``TRENDING_SNAPSHOT_KEEP`` are deleted.
+    """
+
+    now = now or datetime.now(timezone.utc)
+    settings = get_settings()
+    snapshot = TrendingSnapshot(created_at=now, entry_count=0)
+    db.add(snapshot)
+    db.flush()
+
+    entries: list[dict[str, object]] = []
+    for span, window in trending_windows().items():
+        for entity_type in TrendingEntity:
+            ranked = db.execute(ranked_query(span, entity_type, settings.trending_snapshot_size))
+            entries.extend(
+                {
+                    "snapshot_id": snapshot.id,
+                    "span": span,
+                    "entity_type": entity_type.value,
+                    "rank": rank,
+                    "entity_key": row.entity_key,
+                    "title": row.title,
+                    "artist_name": row.artist_name,
+                    "score": decayed_score(row.score, row.anchor_at, window, now),
+                }
+                for rank, row in enumerate(ranked, start=1)
+            )
+    for start in range(0, len(entries), UPSERT_BATCH):
+        db.execute(insert(TrendingSnapshotEntry), entries[start : start + UPSERT_BATCH])
+    snapshot.entry_count = len(entries)
+
+    stale = db.scalars(
+        select(TrendingSnapshot.id)
+        .order_by(TrendingSnapshot.id.desc())
+        .offset(max(1, settings.trending_snapshot_keep))
+    ).all()
+    if stale:
+        db.execute(
+            delete(TrendingSnapshotEntry).where(TrendingSnapshotEntry.snapshot_id.in_(stale))
+        )
+        db.execute(delete(TrendingSnapshot).where(TrendingSnapshot.id.in_(stale)))
+    return snapshot
+
+
+def trending_snapshot(db: Session, snapshot_id: int | None = None) -> Row | None:
+    """``(id, created_at)`` of snapshot ``snapshot_id``, or of the current one."""
+
+    stmt = select(TrendingSnapshot.id, TrendingSnapshot.created_at)
+    if snapshot_id is not None:
+        stmt = stmt.where(TrendingSnapshot.id == snapshot_id)
+    return db.execute(stmt.order_by(TrendingSnapshot.id.desc()).limit(1)).one_or_none()
+
+
+def snapshot_entries_query(
+    snapshot_id: int,
+    span: str,
+    entity_type: TrendingEntity,
+    limit: int,
+    after_rank: int = 0,
+) -> Select:
+    """Entries of one ranking in a snapshot, from rank ``after_rank + 1`` on."""
+
+    return (
+        select(
+            TrendingSnapshotEntry.rank,
+            TrendingSnapshotEntry.entity_key,
+            TrendingSnapshotEntry.title,
+            TrendingSnapshotEntry.artist_name,
+            TrendingSnapshotEntry.score,
+        )
+        .where(
+            TrendingSnapshotEntry.snapshot_id == snapshot_id,
+            TrendingSnapshotEntry.span == span,
+            TrendingSnapshotEntry.entity_type == entity_type.value,
+            TrendingSnapshotEntry.rank > after_rank,
+        )
+        .order_by(TrendingSnapshotEntry.rank)
+        .limit(limit)
+    )
@@ -0,0 +1,387 @@
+"""Materialized week/nomination aggregates and the week detail cache.
+
+Club writes (nominations, votes, ratings, week edits) call
+:func:`refresh_week_stats`, :func:`apply_ballot_change`,
+:func:`apply_new_ratings` or :func:`bump_week_version` in the same
+transaction, so ``week_stats`` and ``nomination_stats`` always match the base
+tables and ``week_stats.version`` changes whenever anything shown on a week
+does. Readers use the version as a cache key: a closed week keeps its version
+forever and is served from :data:`week_detail_cache` after its first build.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any, Generic, TypeVar
+from uuid import UUID
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from apps.api.db import dialect_insert
+from apps.api.models import Nomination, NominationStats, Rating, Vote, Week, WeekStats
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+# Points awarded per ballot rank; a ballot ranks at most len(RANK_POINTS) picks.
+RANK_POINTS = {1: 2, 2: 1}
+VOTE_POINTS = case(*((Vote.rank == rank, points) for rank, points in RANK_POINTS.items()), else_=0)
+
+
+def lock_week_stats(db: Session, week_ids: list[UUID]) -> None:
+    """Row-lock the stats of ``week_ids`` (and the weeks, for rows not yet created).
+
+    Every stats writer takes the ``week_stats`` row lock before touching
+    ``nomination_stats``: :func:`refresh_week_stats` here, the delta writers
+    through their ``UPDATE week_stats``. Recomputations therefore read the
+    base tables only after concurrent writers committed, and never overwrite
+    their counters with stale values. ``FOR NO KEY UPDATE`` does not conflict
+    with the key-share locks foreign keys take when votes or nominations
+    are inserted.
+    """
+
+    ordered = sorted(week_ids, key=str)
+    db.execute(
+        select(WeekStats.week_id)
+        .where(WeekStats.week_id.in_(ordered))
+        .order_by(WeekStats.week_id)
+        .with_for_update(key_share=True)
+    ).all()
+    db.execute(
+        select(Week.id).where(Week.id.in_(ordered)).order_by(Week.id).with_for_update(key_share=True)
+    ).all()
+
+
+def refresh_week_stats(db: Session, week_ids: Iterable[UUID]) -> None:
+    """Recompute aggregates for ``week_ids`` from the base tables and bump versions.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+
+    week_ids = list(dict.fromkeys(week_ids))
+    if not week_ids:
+        return
+
+    lock_week_stats(db, week_ids)
+    nomination_rows, week_totals = _compute_week_stats(db, week_ids)
+
+    db.execute(delete(NominationStats).where(NominationStats.week_id.in_(week_ids)))
+    if nomination_rows:
+        db.execute(dialect_insert(db)(NominationStats), nomination_rows)
+
+    insert = dialect_insert(db)(WeekStats).values(week_totals)
+    db.execute(
+        insert.on_conflict_do_update(
+            index_elements=[WeekStats.week_id],
+            set_={
+                "nomination_count": insert.excluded.nomination_count,
+                "vote_count": insert.excluded.vote_count,
+                "rating_count": insert.excluded.rating_count,
+                "rating_sum": insert.excluded.rating_sum,
+                "version": WeekStats.version + 1,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+def _compute_week_stats(
+    db: Session, week_ids: list[UUID]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """``nomination_stats`` and ``week_stats`` rows of ``week_ids`` from the base tables."""
+
+    nominations = db.execute(
+        select(Nomination.id, Nomination.week_id).where(Nomination.week_id.in_(week_ids))
+    ).all()
+    nomination_rows: dict[UUID, dict[str, Any]] = {
+        nomination_id: {
+            "nomination_id": nomination_id,
+            "week_id": week_id,
+            "points": 0,
+            "first_place": 0,
+            "second_place": 0,
+            "total_votes": 0,
+            "rating_count": 0,
+            "rating_sum": 0.0,
+        }
+        for nomination_id, week_id in nominations
+    }
+
+    vote_rows = db.execute(
+        select(
+            Vote.week_id,
+            Vote.nomination_id,
+            func.sum(VOTE_POINTS).label("points"),
+            func.sum(case((Vote.rank == 1, 1), else_=0)).label("first_place"),
+            func.sum(case((Vote.rank == 2, 1), else_=0)).label("second_place"),
+            func.count(Vote.id).label("total_votes"),
+        )
+        .where(Vote.week_id.in_(week_ids))
+        .group_by(Vote.week_id, Vote.nomination_id)
+    ).all()
+    for row in vote_rows:
+        target = nomination_rows.get(row.nomination_id)
+        if target is None or target["week_id"] != row.week_id:
+            continue
+        target.update(
+            points=int(row.points or 0),
+            first_place=int(row.first_place or 0),
+            second_place=int(row.second_place or 0),
+            total_votes=int(row.total_votes or 0),
+        )
+
+    rating_rows = db.execute(
+        select(
+            Rating.week_id,
+            Rating.nomination_id,
+            func.count(Rating.id).label("rating_count"),
+            func.coalesce(func.sum(Rating.value), 0).label("rating_sum"),
+        )
+        .where(Rating.week_id.in_(week_ids))
+        .group_by(Rating.week_id, Rating.nomination_id)
+    ).all()
+    week_totals: dict[UUID, dict[str, Any]] = {
+        week_id: {
+            "week_id": week_id,
+            "nomination_count": 0,
+            "vote_count": 0,
+            "rating_count": 0,
+            "rating_sum": 0.0,
+        }
+        for week_id in week_ids
+    }
+    for rating_row in rating_rows:
+        count, total = int(rating_row.rating_count), float(rating_row.rating_sum)
+        week_totals[rating_row.week_id]["rating_count"] += count
+        week_totals[rating_row.week_id]["rating_sum"] += total
+        target = nomination_rows.get(rating_row.nomination_id)
+        if target is not None and target["week_id"] == rating_row.week_id:
+            target.update(rating_count=count, rating_sum=total)
+
+    for nomination_row in nomination_rows.values():
+        week_totals[nomination_row["week_id"]]["nomination_count"] += 1
+        week_totals[nomination_row["week_id"]]["vote_count"] += nomination_row["total_votes"]
+
+    return list(nomination_rows.values()), list(week_totals.values())
+
+
+def apply_ballot_change(
+    db: Session,
+    week_id: UUID,
+    removed: Iterable[tuple[UUID, int]],
+    added: Iterable[tuple[UUID, int]],
+) -> None:
+    """Move vote counters by the difference between two ballots.
+
+    ``removed`` and ``added`` are ``(nomination_id, rank)`` pairs already
+    deleted/flushed in the caller's transaction. Counters are adjusted in
+    place (``points = points + delta``), so concurrent ballots never lose
+    updates; if any counter row is missing the week is recomputed instead.
+    """
+
+    deltas: dict[UUID, dict[str, int]] = {}
+    for sign, votes in ((-1, removed), (1, added)):
+        for nomination_id, rank in votes:
+            delta = deltas.setdefault(
+                nomination_id,
+                {"points": 0, "first_place": 0, "second_place": 0, "total_votes": 0},
+            )
+            delta["points"] += sign * RANK_POINTS.get(rank, 0)
+            delta["first_place"] += sign * (rank == 1)
+            delta["second_place"] += sign * (rank == 2)
+            delta["total_votes"] += sign
+
+    # The week_stats row lock comes first (see lock_week_stats).
+    vote_delta = sum(delta["total_votes"] for delta in deltas.values())
+    result = db.execute(
+        update(WeekStats)
+        .where(WeekStats.week_id == week_id)
+        .values(
+            vote_count=WeekStats.vote_count + vote_delta,
+            version=WeekStats.version + 1,
+            updated_at=func.now(),
+        )
+    )
+    complete = result.rowcount == 1
+    # A fixed lock order keeps concurrent ballots from deadlocking.
+    for nomination_id in sorted(deltas, key=str):
+        delta = deltas[nomination_id]
+        if not any(delta.values()):
+            continue
+        result = db.execute(
+            update(NominationStats)
+            .where(
+                NominationStats.nomination_id == nomination_id,
+                NominationStats.week_id == week_id,
+            )
+            .values(
+                {
+                    getattr(NominationStats, name): getattr(NominationStats, name) + value
+                    for name, value in delta.items()
+                }
+            )
+        )
+        complete = complete and result.rowcount == 1
+
+    if not complete:
+        refresh_week_stats(db, [week_id])
+
+
+def apply_new_ratings(
+    db: Session, week_id: UUID, ratings: Iterable[tuple[UUID | None, float]]
+) -> None:
+    """Add freshly inserted ``(nomination_id, value)`` ratings to the counters.
+
+    Like :func:`apply_ballot_change`, counters move by deltas and the week is
+    recomputed instead if any counter row is missing.
+    """
+
+    count, total = 0, 0.0
+    per_nomination: dict[UUID, list[float]] = {}
+    for nomination_id, value in ratings:
+        count += 1
+        total += value
+        if nomination_id is not None:
+            counters = per_nomination.setdefault(nomination_id, [0, 0.0])
+            counters[0] += 1
+            counters[1] += value
+    if not count:
+        return
+
+    # The week_stats row lock comes first (see lock_week_stats).
+    result = db.execute(
+        update(WeekStats)
+        .where(WeekStats.week_id == week_id)
+        .values(
+            rating_count=WeekStats.rating_count + count,
+            rating_sum=WeekStats.rating_sum + total,
+            version=WeekStats.version + 1,
+            updated_at=func.now(),
+        )
+    )
+    complete = result.rowcount == 1
+    for nomination_id in sorted(per_nomination, key=str):
+        nomination_count, nomination_total = per_nomination[nomination_id]
+        result = db.execute(
+            update(NominationStats)
+            .where(
+                NominationStats.nomination_id == nomination_id,
+                NominationStats.week_id == week_id,
+            )
+            .values(
+                rating_count=NominationStats.rating_count + nomination_count,
+                rating_sum=NominationStats.rating_sum + nomination_total,
+            )
+        )
+        complete = complete and result.rowcount == 1
+
+    if not complete:
+        refresh_week_stats(db, [week_id])
+
+
+def bump_week_version(db: Session, week_id: UUID) -> None:
+    """Invalidate cached reads of a week whose own fields changed."""
+
+    result = db.execute(
+        update(WeekStats)
+        .where(WeekStats.week_id == week_id)
+        .values(version=WeekStats.version + 1)
+    )
+    if result.rowcount == 0:
+        refresh_week_stats(db, [week_id])
+
+
+def load_week_stats(db: Session, week_ids: list[UUID]) -> dict[UUID, WeekStats]:
+    """Return stats rows for ``week_ids``; read-only.
+
+    Week creation and migration 0007 write every row, so a missing one is a
+    bug. It is logged and computed in memory (``version`` 0) instead of
+    written from a read path.
+    """
+
+    stats = {
+        row.week_id: row
+        for row in db.scalars(select(WeekStats).where(WeekStats.week_id.in_(week_ids)))
+    }
+    missing = [week_id for week_id in week_ids if week_id not in stats]
+    if missing:
+        logger.error("week_stats rows missing for weeks %s", ", ".join(map(str, missing)))
+        _, week_totals = _compute_week_stats(db, missing)
+        stats.update((row["week_id"], WeekStats(**row, version=0)) for row in week_totals)
+    return stats
+
+
+def week_version(db: Session, week_id: UUID) -> int | None:
+    """Current ``week_stats.version`` of a week, or ``None`` if it does not exist."""
+
+    row = db.execute(
+        select(Week.id, WeekStats.version)
+        .outerjoin(WeekStats, WeekStats.week_id == Week.id)
+        .where(Week.id == week_id)
+    ).one_or_none()
+    if row is None:
+        return None
+    if row.version is None:
+        return load_week_stats(db, [week_id])[week_id].version
+    return int(row.version)
+
+
+def club_version(db: Session) -> tuple[int, int]:
+    """Marker that changes whenever a week is added or any week's version moves.
+
+    Every club write bumps some ``week_stats.version``, so the pair
+    ``(week count, sum of versions)`` changes with any week, nomination, vote
+    or rating.
+    """
+
+    count, total = db.execute(
+        select(func.count(Week.id), func.coalesce(func.sum(WeekStats.version), 0))
+        .select_from(Week)
+        .outerjoin(WeekStats, WeekStats.week_id == Week.id)
+    ).one()
+    return int(count), int(total)
+
+
+class VersionedCache(Generic[K, T]):
+    """Thread-safe LRU of values keyed by ``(key, version)``.
+
+    Only the newest version per key is kept; a lookup for any other version
+    misses.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[K, tuple[int, T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K, version: int) -> T | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: K, version: int, value: T) -> None:
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current[0] > version:
+                return
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Week documents (routes.weeks.WeekDetail) keyed by week id.
+week_detail_cache: VersionedCache[UUID, Any] = VersionedCache()
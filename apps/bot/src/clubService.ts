@@ -8,8 +8,8 @@ import {
   SidetrackApiClient,
   UUID,
   UserRead,
-  VoteCreate,
-  VoteRead,
+  BallotSubmit,
+  BallotRead,
   WeekCreate,
   WeekDetail,
   WeekUpdate,
@@ -157,22 +157,18 @@ export class ClubSyncService {
     });
   }
 
-  async recordVote(
+  async recordBallot(
     weekId: UUID,
-    vote: VoteCreate,
+    ballot: BallotSubmit,
     loggerMeta?: Record<string, unknown>,
-  ): Promise<VoteRead> {
-    return this.withRetry('record-vote', async () => {
+  ): Promise<BallotRead> {
+    // Submitting a ballot replaces the voter's previous one, so retries are safe.
+    return this.withRetry('record-ballot', async () => {
       try {
-        return await this.client.createWeekVote(weekId, vote);
+        return await this.client.submitBallot(weekId, ballot);
       } catch (error) {
         if (error instanceof ApiError && error.status === 409) {
-          this.logger.warn('Vote already recorded; returning existing vote.', loggerMeta);
-          const votes = await this.client.listVotes();
-          const voteMatch = votes.find(
-            (entry) => entry.week_id === weekId && entry.user_id === vote.user_id && entry.rank === vote.rank,
-          );
-          if (voteMatch) return voteMatch;
+          this.logger.warn(error.message, loggerMeta);
         }
         throw error;
       }
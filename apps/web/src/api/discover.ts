@@ -54,16 +54,27 @@ export async function requestIntegrationConnect(provider: 'spotify' | 'lastfm' |
 }
 
 export type TrendingItem = {
-  type: 'album' | 'track';
+  rank?: number;
+  type: 'album' | 'track' | 'artist';
   id: string;
   title: string;
-  artist_name: string;
+  artist_name: string | null;
+  score?: number;
   average?: number;
   count?: number;
 };
 
+export type TrendingPage = {
+  snapshot_id: number | null;
+  generated_at: string | null;
+  age_seconds: number | null;
+  window: string;
+  type: TrendingItem['type'];
+  items: TrendingItem[];
+};
+
 export async function fetchTrending(): Promise<TrendingItem[]> {
   const res = await fetch(`${getApiBaseUrl()}/trending`, { cache: 'no-store' });
   if (!res.ok) throw new Error(`Trending failed with status ${res.status}`);
-  return (await res.json()) as TrendingItem[];
+  return ((await res.json()) as TrendingPage).items;
 }
@@ -1,6 +1,6 @@
 import { getApiBaseUrl } from '../config';
 
-export type FeedEventType = 'rating' | 'listen' | 'club' | 'follow';
+export type FeedEventType = 'rating' | 'nomination' | 'listen' | 'club' | 'follow';
 
 export interface FeedItem {
   id: string;
@@ -0,0 +1,39 @@
+"""Unique (user, track, played_at) key on listen_events for idempotent loads."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0002_listen_event_dedupe_key"
+down_revision: str | Sequence[str] | None = "0001_canonical_initial"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Drop duplicates left behind by the old check-then-insert path, keeping
+    # the first physical row of each (user, track, played_at) group.
+    op.execute(
+        """
+        DELETE FROM listen_events a
+        USING listen_events b
+        WHERE a.user_id = b.user_id
+          AND a.track_id = b.track_id
+          AND a.played_at = b.played_at
+          AND a.ctid > b.ctid
+        """
+    )
+    op.create_unique_constraint(
+        "uq_listen_events_user_track_played",
+        "listen_events",
+        ["user_id", "track_id", "played_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_listen_events_user_track_played", "listen_events", type_="unique"
+    )
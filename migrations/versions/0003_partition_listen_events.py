@@ -0,0 +1,114 @@
+"""Range-partition listen_events by month on played_at and add a BRIN index."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0003_partition_listen_events"
+down_revision: str | Sequence[str] | None = "0002_listen_event_dedupe_key"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COLUMNS = "id, user_id, track_id, played_at, source, metadata, ingested_at"
+
+# Partitions for every month with data plus three months ahead; later months
+# are created by `python -m apps.api.cli maintain-partitions`.
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    first_month date := date_trunc(
+        'month', coalesce((SELECT min(played_at) FROM listen_events_legacy), now()) AT TIME ZONE 'UTC'
+    );
+    last_month date := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months';
+    month date;
+BEGIN
+    month := first_month;
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF listen_events FOR VALUES FROM (%L) TO (%L)',
+            'listen_events_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+            month::timestamp AT TIME ZONE 'UTC',
+            (month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        month := month + interval '1 month';
+    END LOOP;
+END
+$$;
+"""
+
+
+def _rename_objects(table: str, suffix_from: str, suffix_to: str) -> None:
+    for constraint in (
+        "listen_events_pkey",
+        "uq_listen_events_user_track_played",
+        "fk_listen_events_user_id",
+        "fk_listen_events_track_id",
+    ):
+        op.execute(
+            f"ALTER TABLE {table} RENAME CONSTRAINT {constraint}{suffix_from} "
+            f"TO {constraint}{suffix_to}"
+        )
+    for index in ("ix_listen_events_played_at", "ix_listen_events_user_id"):
+        op.execute(f"ALTER INDEX {index}{suffix_from} RENAME TO {index}{suffix_to}")
+
+
+def _create_listen_events(partitioned: bool) -> None:
+    primary_key = "PRIMARY KEY (id, played_at)" if partitioned else "PRIMARY KEY (id)"
+    partition_clause = "PARTITION BY RANGE (played_at)" if partitioned else ""
+    op.execute(
+        f"""
+        CREATE TABLE listen_events (
+            id uuid NOT NULL,
+            user_id uuid NOT NULL,
+            track_id uuid NOT NULL,
+            played_at timestamptz NOT NULL,
+            source listen_source NOT NULL,
+            metadata json,
+            ingested_at timestamptz NOT NULL DEFAULT timezone('utc', now()),
+            CONSTRAINT listen_events_pkey {primary_key},
+            CONSTRAINT uq_listen_events_user_track_played UNIQUE (user_id, track_id, played_at),
+            CONSTRAINT fk_listen_events_user_id FOREIGN KEY (user_id)
+                REFERENCES users (id) ON DELETE CASCADE,
+            CONSTRAINT fk_listen_events_track_id FOREIGN KEY (track_id)
+                REFERENCES tracks (id) ON DELETE CASCADE
+        ) {partition_clause}
+        """
+    )
+    op.create_index("ix_listen_events_played_at", "listen_events", ["played_at"])
+    op.create_index("ix_listen_events_user_id", "listen_events", ["user_id"])
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE listen_events RENAME TO listen_events_legacy")
+    _rename_objects("listen_events_legacy", "", "_legacy")
+
+    _create_listen_events(partitioned=True)
+    op.create_index(
+        "ix_listen_events_played_at_brin",
+        "listen_events",
+        ["played_at"],
+        postgresql_using="brin",
+    )
+    op.execute("CREATE TABLE listen_events_default PARTITION OF listen_events DEFAULT")
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+
+    op.execute(
+        f"INSERT INTO listen_events ({COLUMNS}) SELECT {COLUMNS} FROM listen_events_legacy"
+    )
+    op.execute("DROP TABLE listen_events_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE listen_events RENAME TO listen_events_partitioned")
+    _rename_objects("listen_events_partitioned", "", "_partitioned")
+    op.execute("ALTER INDEX ix_listen_events_played_at_brin RENAME TO ix_listen_events_played_at_brin_partitioned")
+
+    _create_listen_events(partitioned=False)
+    op.execute(
+        f"INSERT INTO listen_events ({COLUMNS}) SELECT {COLUMNS} FROM listen_events_partitioned"
+    )
+    # Dropping the parent drops every attached partition with it.
+    op.execute("DROP TABLE listen_events_partitioned")
@@ -0,0 +1,64 @@
+"""Composite and expression indexes matching the hot route query shapes."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004_route_query_indexes"
+down_revision: str | Sequence[str] | None = "0003_partition_listen_events"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # list_listen_events: WHERE user_id = ? ORDER BY played_at DESC LIMIT n.
+    # Supersedes the single-column user_id index.
+    op.create_index(
+        "ix_listen_events_user_played_at",
+        "listen_events",
+        ["user_id", sa.text("played_at DESC")],
+    )
+    op.drop_index("ix_listen_events_user_id", table_name="listen_events")
+    # services.ingest._latest_played_ts: max(played_at) per (user, source).
+    op.create_index(
+        "ix_listen_events_user_source_played_at",
+        "listen_events",
+        ["user_id", "source", "played_at"],
+    )
+    # Track joins in recommendations and ON DELETE CASCADE from tracks.
+    op.create_index("ix_listen_events_track_id", "listen_events", ["track_id"])
+
+    # Trending/recommendations: avg(value), count(*) GROUP BY album_id.
+    op.create_index("ix_ratings_album_id_value", "ratings", ["album_id", "value"])
+
+    # weeks._find_existing_week and the list ordering.
+    op.create_index("ix_weeks_lower_label", "weeks", [sa.text("lower(label)")])
+    op.create_index(
+        "ix_weeks_week_number_created_at",
+        "weeks",
+        [sa.text("week_number DESC NULLS LAST"), sa.text("created_at DESC")],
+    )
+
+    # list_weeks nomination filters: lower(genre/decade/country) = ?.
+    for column in ("genre", "decade", "country"):
+        op.create_index(
+            f"ix_nominations_lower_{column}_week_id",
+            "nominations",
+            [sa.text(f"lower({column})"), "week_id"],
+        )
+
+
+def downgrade() -> None:
+    for column in ("genre", "decade", "country"):
+        op.drop_index(f"ix_nominations_lower_{column}_week_id", table_name="nominations")
+    op.drop_index("ix_weeks_week_number_created_at", table_name="weeks")
+    op.drop_index("ix_weeks_lower_label", table_name="weeks")
+    op.drop_index("ix_ratings_album_id_value", table_name="ratings")
+    op.drop_index("ix_listen_events_track_id", table_name="listen_events")
+    op.drop_index("ix_listen_events_user_source_played_at", table_name="listen_events")
+    op.create_index("ix_listen_events_user_id", "listen_events", ["user_id"])
+    op.drop_index("ix_listen_events_user_played_at", table_name="listen_events")
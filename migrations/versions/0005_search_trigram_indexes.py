@@ -0,0 +1,40 @@
+"""pg_trgm GIN indexes for substring search over users, albums and tracks."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0005_search_trigram_indexes"
+down_revision: str | Sequence[str] | None = "0004_route_query_indexes"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# routes/search.py and routes/albums.py filter with ILIKE '%term%'.
+SEARCH_COLUMNS = {
+    "users": ("display_name", "handle"),
+    "albums": ("title", "artist_name"),
+    "tracks": ("title", "artist_name"),
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            op.create_index(
+                f"ix_{table}_{column}_trgm",
+                table,
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+
+def downgrade() -> None:
+    # The extension is left installed; other objects may depend on it.
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            op.drop_index(f"ix_{table}_{column}_trgm", table_name=table)
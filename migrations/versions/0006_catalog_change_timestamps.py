@@ -0,0 +1,36 @@
+"""Track catalog change timestamps for incremental search suggestion refresh."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006_catalog_change_timestamps"
+down_revision: str | Sequence[str] | None = "0005_search_trigram_indexes"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    for table in ("albums", "tracks"):
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.text("timezone('utc', now())"),
+            ),
+        )
+    for table in ("users", "albums", "tracks"):
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+
+
+def downgrade() -> None:
+    for table in ("users", "albums", "tracks"):
+        op.drop_index(f"ix_{table}_updated_at", table_name=table)
+    for table in ("albums", "tracks"):
+        op.drop_column(table, "updated_at")
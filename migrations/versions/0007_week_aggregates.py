@@ -0,0 +1,109 @@
+"""Materialized week and nomination aggregates."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0007_week_aggregates"
+down_revision: str | Sequence[str] | None = "0006_catalog_change_timestamps"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Seeds every existing week; from here on week creation and the write paths in
+# services.week_stats keep the rows current. load_week_stats only reads them
+# and treats a missing row as a bug.
+BACKFILL_WEEK_STATS = """
+INSERT INTO week_stats (week_id, version, nomination_count, vote_count, rating_count, rating_sum)
+SELECT
+    w.id,
+    1,
+    (SELECT count(*) FROM nominations n WHERE n.week_id = w.id),
+    (SELECT count(*) FROM votes v JOIN nominations n ON n.id = v.nomination_id
+        WHERE v.week_id = w.id AND n.week_id = w.id),
+    (SELECT count(*) FROM ratings r WHERE r.week_id = w.id),
+    (SELECT coalesce(sum(r.value), 0) FROM ratings r WHERE r.week_id = w.id)
+FROM weeks w
+"""
+
+BACKFILL_NOMINATION_STATS = """
+INSERT INTO nomination_stats (
+    nomination_id, week_id, points, first_place, second_place, total_votes,
+    rating_count, rating_sum
+)
+SELECT
+    n.id,
+    n.week_id,
+    coalesce(v.points, 0),
+    coalesce(v.first_place, 0),
+    coalesce(v.second_place, 0),
+    coalesce(v.total_votes, 0),
+    coalesce(r.rating_count, 0),
+    coalesce(r.rating_sum, 0)
+FROM nominations n
+LEFT JOIN (
+    SELECT
+        nomination_id,
+        week_id,
+        sum(CASE rank WHEN 1 THEN 2 WHEN 2 THEN 1 ELSE 0 END) AS points,
+        sum(CASE WHEN rank = 1 THEN 1 ELSE 0 END) AS first_place,
+        sum(CASE WHEN rank = 2 THEN 1 ELSE 0 END) AS second_place,
+        count(*) AS total_votes
+    FROM votes
+    GROUP BY nomination_id, week_id
+) v ON v.nomination_id = n.id AND v.week_id = n.week_id
+LEFT JOIN (
+    SELECT nomination_id, week_id, count(*) AS rating_count, sum(value) AS rating_sum
+    FROM ratings
+    WHERE nomination_id IS NOT NULL
+    GROUP BY nomination_id, week_id
+) r ON r.nomination_id = n.id AND r.week_id = n.week_id
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "week_stats",
+        sa.Column("week_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("nomination_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("vote_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+        sa.ForeignKeyConstraint(["week_id"], ["weeks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("week_id"),
+    )
+    op.create_table(
+        "nomination_stats",
+        sa.Column("nomination_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("week_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("first_place", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("second_place", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_votes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["nomination_id"], ["nominations.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["week_id"], ["weeks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("nomination_id"),
+    )
+    op.create_index("ix_nomination_stats_week_id", "nomination_stats", ["week_id"])
+
+    op.execute(BACKFILL_WEEK_STATS)
+    op.execute(BACKFILL_NOMINATION_STATS)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_nomination_stats_week_id", table_name="nomination_stats")
+    op.drop_table("nomination_stats")
+    op.drop_table("week_stats")
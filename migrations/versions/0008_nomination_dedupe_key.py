@@ -0,0 +1,109 @@
+"""Unique (week, user, album) key on nominations for idempotent bulk creates."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0008_nomination_dedupe_key"
+down_revision: str | Sequence[str] | None = "0007_week_aggregates"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Duplicates can only come from writes that bypassed the API's existence
+# check. Keep the earliest nomination of each group and move votes and
+# ratings onto it before dropping the rest.
+DUPLICATES = """
+SELECT id, keep_id, week_id FROM (
+    SELECT
+        id,
+        week_id,
+        first_value(id) OVER (
+            PARTITION BY week_id, user_id, album_id ORDER BY submitted_at, id
+        ) AS keep_id
+    FROM nominations
+) ranked
+WHERE id <> keep_id
+"""
+
+# The affected weeks' aggregates, recomputed as migration 0007 backfills them;
+# the version bump invalidates cached week documents and ETags.
+RECOMPUTE_NOMINATION_STATS = """
+INSERT INTO nomination_stats (
+    nomination_id, week_id, points, first_place, second_place, total_votes,
+    rating_count, rating_sum
+)
+SELECT
+    n.id,
+    n.week_id,
+    coalesce(v.points, 0),
+    coalesce(v.first_place, 0),
+    coalesce(v.second_place, 0),
+    coalesce(v.total_votes, 0),
+    coalesce(r.rating_count, 0),
+    coalesce(r.rating_sum, 0)
+FROM nominations n
+LEFT JOIN (
+    SELECT
+        nomination_id,
+        week_id,
+        sum(CASE rank WHEN 1 THEN 2 WHEN 2 THEN 1 ELSE 0 END) AS points,
+        sum(CASE WHEN rank = 1 THEN 1 ELSE 0 END) AS first_place,
+        sum(CASE WHEN rank = 2 THEN 1 ELSE 0 END) AS second_place,
+        count(*) AS total_votes
+    FROM votes
+    GROUP BY nomination_id, week_id
+) v ON v.nomination_id = n.id AND v.week_id = n.week_id
+LEFT JOIN (
+    SELECT nomination_id, week_id, count(*) AS rating_count, sum(value) AS rating_sum
+    FROM ratings
+    WHERE nomination_id IS NOT NULL
+    GROUP BY nomination_id, week_id
+) r ON r.nomination_id = n.id AND r.week_id = n.week_id
+WHERE n.week_id IN (SELECT week_id FROM nomination_duplicates)
+"""
+
+RECOMPUTE_WEEK_STATS = """
+UPDATE week_stats s SET
+    version = s.version + 1,
+    nomination_count = (SELECT count(*) FROM nominations n WHERE n.week_id = s.week_id),
+    vote_count = (
+        SELECT count(*) FROM votes v JOIN nominations n ON n.id = v.nomination_id
+        WHERE v.week_id = s.week_id AND n.week_id = s.week_id
+    ),
+    rating_count = (SELECT count(*) FROM ratings r WHERE r.week_id = s.week_id),
+    rating_sum = (SELECT coalesce(sum(r.value), 0) FROM ratings r WHERE r.week_id = s.week_id),
+    updated_at = timezone('utc', now())
+WHERE s.week_id IN (SELECT week_id FROM nomination_duplicates)
+"""
+
+
+def upgrade() -> None:
+    op.execute(f"CREATE TEMPORARY TABLE nomination_duplicates AS {DUPLICATES}")
+    for table in ("votes", "ratings"):
+        op.execute(
+            f"""
+            UPDATE {table} t SET nomination_id = d.keep_id
+            FROM nomination_duplicates d
+            WHERE t.nomination_id = d.id
+            """
+        )
+    op.execute("DELETE FROM nominations WHERE id IN (SELECT id FROM nomination_duplicates)")
+    op.execute(
+        "DELETE FROM nomination_stats "
+        "WHERE week_id IN (SELECT week_id FROM nomination_duplicates)"
+    )
+    op.execute(RECOMPUTE_NOMINATION_STATS)
+    op.execute(RECOMPUTE_WEEK_STATS)
+    op.execute("DROP TABLE nomination_duplicates")
+    op.create_unique_constraint(
+        "uq_nomination_week_user_album",
+        "nominations",
+        ["week_id", "user_id", "album_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_nomination_week_user_album", "nominations", type_="unique")
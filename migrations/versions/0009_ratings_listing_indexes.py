@@ -0,0 +1,29 @@
+"""Indexes for keyset pagination of GET /ratings."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0009_ratings_listing_indexes"
+down_revision: str | Sequence[str] | None = "0008_nomination_dedupe_key"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # list_ratings: ORDER BY created_at DESC, id DESC LIMIT n, optionally per
+    # user. The per-user index supersedes the single-column user_id index.
+    op.create_index("ix_ratings_created_at_id", "ratings", ["created_at", "id"])
+    op.create_index(
+        "ix_ratings_user_id_created_at", "ratings", ["user_id", "created_at", "id"]
+    )
+    op.drop_index("ix_ratings_user_id", table_name="ratings")
+
+
+def downgrade() -> None:
+    op.create_index("ix_ratings_user_id", "ratings", ["user_id"], unique=False)
+    op.drop_index("ix_ratings_user_id_created_at", table_name="ratings")
+    op.drop_index("ix_ratings_created_at_id", table_name="ratings")
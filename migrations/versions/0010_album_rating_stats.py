@@ -0,0 +1,48 @@
+"""Materialized per-album rating aggregates."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0010_album_rating_stats"
+down_revision: str | Sequence[str] | None = "0009_ratings_listing_indexes"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Same aggregate as services.album_stats.rebuild_album_rating_stats.
+BACKFILL = """
+INSERT INTO album_rating_stats (album_id, rating_count, rating_sum, rating_sum_sq, last_rated_at)
+SELECT album_id, count(*), sum(value), sum(value * value), max(created_at)
+FROM ratings
+GROUP BY album_id
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "album_rating_stats",
+        sa.Column(
+            "album_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("albums.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("rating_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("rating_sum_sq", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("last_rated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_album_rating_stats_rating_count", "album_rating_stats", ["rating_count"]
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_album_rating_stats_rating_count", table_name="album_rating_stats")
+    op.drop_table("album_rating_stats")
@@ -0,0 +1,71 @@
+"""Fan-out-on-write feed timelines and follower counts."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0011_feed_entries"
+down_revision: str | Sequence[str] | None = "0010_album_rating_stats"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_FOLLOWER_COUNTS = """
+UPDATE users SET follower_count = counts.total
+FROM (SELECT followee_id, count(*) AS total FROM follows GROUP BY followee_id) AS counts
+WHERE counts.followee_id = users.id
+"""
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("follower_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(BACKFILL_FOLLOWER_COUNTS)
+
+    op.create_table(
+        "feed_entries",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "owner_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column(
+            "actor_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("subject_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.UniqueConstraint(
+            "owner_id", "kind", "subject_id", name="uq_feed_entries_owner_subject"
+        ),
+    )
+    op.create_index(
+        "ix_feed_entries_owner_id_occurred_at",
+        "feed_entries",
+        ["owner_id", "occurred_at", "id"],
+    )
+    op.create_index(
+        "ix_feed_entries_actor_id_occurred_at",
+        "feed_entries",
+        ["actor_id", "occurred_at", "id"],
+    )
+    # Timelines are filled by `python -m apps.api.cli rebuild-feeds`.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feed_entries_actor_id_occurred_at", table_name="feed_entries")
+    op.drop_index("ix_feed_entries_owner_id_occurred_at", table_name="feed_entries")
+    op.drop_table("feed_entries")
+    op.drop_column("users", "follower_count")
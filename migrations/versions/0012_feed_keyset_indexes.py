@@ -0,0 +1,25 @@
+"""Keyset indexes for the follow and winner branches of the club-wide feed."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0012_feed_keyset_indexes"
+down_revision: str | Sequence[str] | None = "0011_feed_entries"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # GET /feed orders every event branch by (timestamp, id); ratings and
+    # listens already have matching indexes.
+    op.create_index("ix_follows_created_at_id", "follows", ["created_at", "id"])
+    op.create_index("ix_weeks_created_at_id", "weeks", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weeks_created_at_id", table_name="weeks")
+    op.drop_index("ix_follows_created_at_id", table_name="follows")
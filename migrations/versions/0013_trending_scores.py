@@ -0,0 +1,43 @@
+"""Time-decayed trending scores for albums, tracks and artists."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0013_trending_scores"
+down_revision: str | Sequence[str] | None = "0012_feed_keyset_indexes"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trending_spans",
+        sa.Column("span", sa.String(length=8), primary_key=True),
+        sa.Column("anchor_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        "trending_scores",
+        sa.Column("span", sa.String(length=8), primary_key=True),
+        sa.Column("entity_type", sa.String(length=8), primary_key=True),
+        sa.Column("entity_key", sa.String(length=255), primary_key=True),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("artist_name", sa.String(length=255), nullable=True),
+        sa.Column("score", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_trending_scores_rank",
+        "trending_scores",
+        ["span", "entity_type", "score", "entity_key"],
+    )
+    # Scores are filled by `python -m apps.api.cli rebuild-trending`.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trending_scores_rank", table_name="trending_scores")
+    op.drop_table("trending_scores")
+    op.drop_table("trending_spans")
@@ -0,0 +1,100 @@
+"""Per-day heavy-hitter summaries of listens for approximate charts."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0014_listen_sketches"
+down_revision: str | Sequence[str] | None = "0013_trending_scores"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Days of history summarised up front: the longest chart (/charts ``days``).
+BACKFILL_DAYS = 365
+# The LISTEN_SKETCH_CAPACITY default; summaries are reduced to the configured
+# capacity when read.
+CAPACITY = 200
+
+# One exact summary per scope (club, each user), dimension and UTC day, then
+# reduced as HeavyHitters does: the (capacity + 1)-th largest count is
+# subtracted from every counter and becomes the summary's error.
+BACKFILL_LISTEN_SKETCHES = """
+WITH listens AS (
+    SELECT
+        date_trunc('day', l.played_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket_start,
+        l.user_id::text AS user_scope,
+        l.track_id::text AS track_key,
+        left(t.artist_name, 255) AS artist_key
+    FROM listen_events l
+    JOIN tracks t ON t.id = l.track_id
+    WHERE l.played_at >= date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        - make_interval(days => :days - 1)
+),
+items AS (
+    SELECT scope, dimension, bucket_start, item, count(*) AS plays
+    FROM (
+        SELECT 'club' AS scope, 'track' AS dimension, bucket_start, track_key AS item
+        FROM listens
+        UNION ALL SELECT 'club', 'artist', bucket_start, artist_key FROM listens
+        UNION ALL SELECT user_scope, 'track', bucket_start, track_key FROM listens
+        UNION ALL SELECT user_scope, 'artist', bucket_start, artist_key FROM listens
+    ) contributions
+    GROUP BY scope, dimension, bucket_start, item
+),
+ranked AS (
+    SELECT
+        items.*,
+        row_number() OVER (
+            PARTITION BY scope, dimension, bucket_start ORDER BY plays DESC
+        ) AS position
+    FROM items
+),
+cuts AS (
+    SELECT
+        scope,
+        dimension,
+        bucket_start,
+        sum(plays) AS total,
+        coalesce(max(plays) FILTER (WHERE position = :capacity + 1), 0) AS cut
+    FROM ranked
+    GROUP BY scope, dimension, bucket_start
+)
+INSERT INTO listen_sketches (scope, dimension, bucket_start, shard, total, error, counters, revision)
+SELECT
+    c.scope,
+    c.dimension,
+    c.bucket_start,
+    0,
+    c.total,
+    c.cut,
+    coalesce(json_object_agg(r.item, r.plays - c.cut) FILTER (WHERE r.plays > c.cut), '{}'),
+    0
+FROM cuts c
+JOIN ranked r USING (scope, dimension, bucket_start)
+GROUP BY c.scope, c.dimension, c.bucket_start, c.total, c.cut
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listen_sketches",
+        sa.Column("scope", sa.String(length=40), primary_key=True),
+        sa.Column("dimension", sa.String(length=8), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("shard", sa.Integer(), primary_key=True),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("counters", sa.JSON(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        sa.text(BACKFILL_LISTEN_SKETCHES).bindparams(days=BACKFILL_DAYS, capacity=CAPACITY)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("listen_sketches")
@@ -0,0 +1,45 @@
+"""Published trending snapshots served by /trending."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0015_trending_snapshots"
+down_revision: str | Sequence[str] | None = "0014_listen_sketches"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trending_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("entry_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "trending_snapshot_entries",
+        sa.Column(
+            "snapshot_id",
+            sa.Integer(),
+            sa.ForeignKey("trending_snapshots.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("span", sa.String(length=8), primary_key=True),
+        sa.Column("entity_type", sa.String(length=8), primary_key=True),
+        sa.Column("rank", sa.Integer(), primary_key=True),
+        sa.Column("entity_key", sa.String(length=255), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("artist_name", sa.String(length=255), nullable=True),
+        sa.Column("score", sa.Float(), nullable=False),
+    )
+    # The first snapshot is published by `python -m apps.api.cli snapshot-trending`.
+
+
+def downgrade() -> None:
+    op.drop_table("trending_snapshot_entries")
+    op.drop_table("trending_snapshots")
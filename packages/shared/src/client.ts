@@ -16,7 +16,9 @@ import {
   NominationRead,
   NominationCreate,
   VoteRead,
-  VoteCreate,
+  BallotSubmit,
+  BallotRead,
+  WeekTally,
   RatingBase,
   WeekRead,
   ProfileOverview,
@@ -296,21 +298,36 @@ export class SidetrackApiClient {
     }
   }
 
-  async createWeekVote(weekId: UUID, payload: VoteCreate): Promise<VoteRead> {
+  async submitBallot(weekId: UUID, payload: BallotSubmit): Promise<BallotRead> {
     try {
-      return await this.request<VoteRead>({
-        method: 'POST',
-        url: `/weeks/${weekId}/votes`,
+      return await this.request<BallotRead>({
+        method: 'PUT',
+        url: `/weeks/${weekId}/ballot`,
         data: payload,
       });
     } catch (error) {
       if (error instanceof ApiError && error.status === 409) {
-        throw new ApiError('Vote already exists for this user and rank.', error.status, error.data, false);
+        // A closed poll stays closed; a concurrent ballot change is worth retrying.
+        const closed = error.message === 'The poll is closed.';
+        throw new ApiError(
+          closed ? 'The poll for this week is closed.' : 'The ballot was changed concurrently; retry.',
+          error.status,
+          error.data,
+          !closed,
+        );
       }
       throw error;
     }
   }
 
+  async retractBallot(weekId: UUID, userId: UUID): Promise<void> {
+    await this.request<void>({ method: 'DELETE', url: `/weeks/${weekId}/ballot/${userId}` });
+  }
+
+  async getWeekTally(weekId: UUID): Promise<WeekTally> {
+    return this.request<WeekTally>({ method: 'GET', url: `/weeks/${weekId}/tally` });
+  }
+
   private normalizeBaseUrl(baseUrl: string): string {
     return baseUrl.endsWith('/') ? baseUrl.slice(0, -1) : baseUrl;
   }
@@ -344,7 +361,9 @@ export type {
   NominationRead,
   NominationCreate,
   VoteRead,
-  VoteCreate,
+  BallotSubmit,
+  BallotRead,
+  WeekTally,
   RatingSummary,
   UserRead,
   UserCreate,
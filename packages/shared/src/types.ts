@@ -208,6 +208,32 @@ export interface VoteRead extends VoteBase {
   id: UUID;
 }
 
+export interface BallotSubmit {
+  user_id: UUID;
+  // Ranked choices, first place first.
+  nomination_ids: UUID[];
+}
+
+export interface BallotRead {
+  week_id: UUID;
+  user_id: UUID;
+  votes: VoteRead[];
+}
+
+export interface TallyEntry extends VoteAggregate {
+  position: number;
+  nomination_id: UUID;
+  album_id: UUID;
+  user_id: UUID;
+}
+
+export interface WeekTally {
+  week_id: UUID;
+  poll_closed: boolean;
+  vote_count: number;
+  standings: TallyEntry[];
+}
+
 export interface RatingBase {
   week_id: UUID;
   user_id: UUID;
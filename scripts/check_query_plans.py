@@ -0,0 +1,313 @@
+"""Fail when hot route query shapes fall back to sequential scans.
+
+Seeds a PostgreSQL database (migrated to head) with a synthetic club inside a
+transaction, runs ``EXPLAIN`` on the statements the API routes issue, and
+reports any plan that sequentially scans a table the shape is meant to reach
+through an index. The transaction is rolled back, so a development database
+can be used safely.
+
+    DATABASE_URL=postgresql+psycopg://... python scripts/check_query_plans.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import create_engine, func, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from apps.api.models import (  # noqa: E402
+    Album,
+    ListenEvent,
+    ListenSketch,
+    ListenSource,
+    Nomination,
+    Rating,
+    Track,
+    Week,
+)
+from apps.api.routes.feed import feed_query  # noqa: E402
+from apps.api.services.feed import timeline_query  # noqa: E402
+from apps.api.services.search_index import text_search_clause  # noqa: E402
+from apps.api.services.trending import (  # noqa: E402
+    TrendingEntity,
+    ranked_query,
+    snapshot_entries_query,
+)
+
+
+# ----------------------------------------------------------------------------
+# Seeding
+
+SEED_SQL = """
+INSERT INTO users (id, display_name, handle)
+SELECT ('00000000-0000-0000-0000-' || lpad(g::text, 12, '0'))::uuid, 'User ' || g, 'user' || g
+FROM generate_series(1, :users) g;
+
+INSERT INTO albums (id, title, artist_name, release_year)
+SELECT ('00000000-0000-0000-0001-' || lpad(g::text, 12, '0'))::uuid,
+       'Album ' || g, 'Artist ' || (g % 500), 1960 + g % 60
+FROM generate_series(1, :albums) g;
+
+INSERT INTO tracks (id, album_id, title, artist_name)
+SELECT ('00000000-0000-0000-0003-' || lpad(g::text, 12, '0'))::uuid,
+       ('00000000-0000-0000-0001-' || lpad((1 + g % :albums)::text, 12, '0'))::uuid,
+       'Track ' || g, 'Artist ' || (g % 500)
+FROM generate_series(1, :tracks) g;
+
+INSERT INTO weeks (id, label, week_number, created_at)
+SELECT ('00000000-0000-0000-0002-' || lpad(g::text, 12, '0'))::uuid, 'Week ' || g, g,
+       now() - (g || ' days')::interval
+FROM generate_series(1, :weeks) g;
+
+INSERT INTO nominations (id, week_id, user_id, album_id, genre, decade, country)
+SELECT gen_random_uuid(),
+       ('00000000-0000-0000-0002-' || lpad((1 + g % :weeks)::text, 12, '0'))::uuid,
+       ('00000000-0000-0000-0000-' || lpad((1 + g % :users)::text, 12, '0'))::uuid,
+       ('00000000-0000-0000-0001-' || lpad((1 + g % :albums)::text, 12, '0'))::uuid,
+       'Genre ' || (g % 150), (1950 + (g % 80)) || 's', 'Country ' || (g % 120)
+FROM generate_series(1, :nominations) g;
+
+INSERT INTO ratings (id, week_id, user_id, album_id, value)
+SELECT gen_random_uuid(),
+       ('00000000-0000-0000-0002-' || lpad((1 + g / :users)::text, 12, '0'))::uuid,
+       ('00000000-0000-0000-0000-' || lpad((1 + g % :users)::text, 12, '0'))::uuid,
+       ('00000000-0000-0000-0001-' || lpad((1 + g % :albums)::text, 12, '0'))::uuid,
+       1 + (g % 9) * 0.5
+FROM generate_series(0, :ratings - 1) g;
+
+INSERT INTO listen_events (id, user_id, track_id, played_at, source)
+SELECT gen_random_uuid(),
+       ('00000000-0000-0000-0000-' || lpad((1 + g % :users)::text, 12, '0'))::uuid,
+       ('00000000-0000-0000-0003-' || lpad((1 + g % :tracks)::text, 12, '0'))::uuid,
+       now() - (g || ' minutes')::interval,
+       (ARRAY['spotify', 'lastfm', 'listenbrainz', 'manual'])[1 + g % 4]::listen_source
+FROM generate_series(1, :listens) g;
+
+INSERT INTO follows (id, follower_id, followee_id)
+SELECT gen_random_uuid(),
+       ('00000000-0000-0000-0000-' || lpad((1 + g % :users)::text, 12, '0'))::uuid,
+       ('00000000-0000-0000-0000-' || lpad((1 + (g % :users + 1 + g / :users) % :users)::text, 12, '0'))::uuid
+FROM generate_series(0, :users * 20 - 1) g;
+
+INSERT INTO feed_entries (id, owner_id, actor_id, kind, subject_id, occurred_at, payload)
+SELECT gen_random_uuid(),
+       ('00000000-0000-0000-0000-' || lpad((1 + g % :users)::text, 12, '0'))::uuid,
+       ('00000000-0000-0000-0000-' || lpad((1 + (g / 7) % :users)::text, 12, '0'))::uuid,
+       'listen', gen_random_uuid(), now() - (g || ' seconds')::interval, '{}'
+FROM generate_series(1, :feed_entries) g;
+
+INSERT INTO trending_spans (span, anchor_at) VALUES ('7d', now());
+
+INSERT INTO trending_scores (span, entity_type, entity_key, title, artist_name, score)
+SELECT '7d', 'track', ('00000000-0000-0000-0003-' || lpad(g::text, 12, '0')),
+       'Track ' || g, 'Artist ' || (g % 500), random() * 100
+FROM generate_series(1, :tracks) g;
+
+INSERT INTO trending_snapshots (id, created_at, entry_count)
+SELECT g, now() - ((10 - g) || ' minutes')::interval, 300 FROM generate_series(1, 10) g;
+
+INSERT INTO trending_snapshot_entries
+    (snapshot_id, span, entity_type, rank, entity_key, title, artist_name, score)
+SELECT s, span, kind, r, 'key ' || r, 'Title ' || r, 'Artist ' || r, 1000.0 / r
+FROM generate_series(1, 10) s, generate_series(1, 100) r,
+     unnest(ARRAY['24h', '7d', '30d']) span, unnest(ARRAY['album', 'track', 'artist']) kind;
+
+INSERT INTO listen_sketches (scope, dimension, bucket_start, shard, total, error, counters, revision)
+SELECT ('00000000-0000-0000-0000-' || lpad(u::text, 12, '0')), dimension,
+       date_trunc('day', now()) - (d || ' days')::interval, 0, 0, 0, '{}', 1
+FROM generate_series(1, :users) u, generate_series(0, 59) d,
+     unnest(ARRAY['track', 'artist']) dimension;
+"""
+
+SEED_SIZES = {
+    "users": 500,
+    "albums": 5000,
+    "tracks": 20000,
+    "weeks": 2000,
+    "nominations": 8000,
+    "ratings": 20000,
+    "listens": 200000,
+    "feed_entries": 200000,
+}
+
+
+def _seed(conn: Connection, scale: float) -> None:
+    params = {key: max(1, int(value * scale)) for key, value in SEED_SIZES.items()}
+    params["ratings"] = min(params["ratings"], params["users"] * params["weeks"])
+    for statement in SEED_SQL.split(";\n"):
+        if statement.strip():
+            conn.execute(text(statement), params)
+    conn.execute(text("ANALYZE"))
+
+
+# ----------------------------------------------------------------------------
+# Query shapes (mirroring the statements in apps/api/routes and services)
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000007")
+ALBUM_IDS = [uuid.UUID(f"00000000-0000-0000-0001-{n:012d}") for n in (3, 14, 15)]
+
+
+def _shapes() -> Iterator[tuple[str, Select, set[str]]]:
+    yield (
+        "list_listen_events (user, played_at DESC)",
+        select(ListenEvent)
+        .where(ListenEvent.user_id == USER_ID)
+        .order_by(ListenEvent.played_at.desc())
+        .limit(100),
+        {"listen_events"},
+    )
+    yield (
+        "ingest._latest_played_ts (user, source)",
+        select(func.max(ListenEvent.played_at))
+        .where(ListenEvent.user_id == USER_ID)
+        .where(ListenEvent.source == ListenSource.LASTFM),
+        {"listen_events"},
+    )
+    yield (
+        "album rating aggregates (GROUP BY album_id)",
+        select(Rating.album_id, func.avg(Rating.value), func.count(Rating.id))
+        .where(Rating.album_id.in_(ALBUM_IDS))
+        .group_by(Rating.album_id),
+        {"ratings"},
+    )
+    yield (
+        "list_ratings (created_at DESC, id DESC)",
+        select(Rating).order_by(Rating.created_at.desc(), Rating.id.desc()).limit(51),
+        {"ratings"},
+    )
+    yield (
+        "list_ratings (user, created_at DESC, id DESC)",
+        select(Rating)
+        .where(Rating.user_id == USER_ID)
+        .order_by(Rating.created_at.desc(), Rating.id.desc())
+        .limit(51),
+        {"ratings"},
+    )
+    yield (
+        "weeks._find_existing_week (week_number or lower(label))",
+        select(Week).where(
+            or_(Week.week_number == 123, func.lower(Week.label) == "week 123")
+        ),
+        {"weeks"},
+    )
+    yield (
+        "search albums (pg_trgm ILIKE)",
+        select(Album).where(text_search_clause(Album, "bum 123", Album.title, Album.artist_name)),
+        {"albums"},
+    )
+    yield (
+        "search tracks (pg_trgm ILIKE)",
+        select(Track).where(text_search_clause(Track, "ack 1234", Track.title, Track.artist_name)),
+        {"tracks"},
+    )
+    yield (
+        "feed timeline_query (owner, occurred_at DESC)",
+        timeline_query(USER_ID, 20),
+        {"feed_entries"},
+    )
+    yield (
+        "feed feed_query (UNION ALL, deep cursor)",
+        feed_query(21, (datetime.now(timezone.utc) - timedelta(days=30), uuid.UUID(int=0))),
+        {"ratings", "follows", "listen_events", "weeks"},
+    )
+    yield (
+        "trending ranked_query (span, type, score DESC, cursor)",
+        ranked_query("7d", TrendingEntity.TRACK, 21, (50.0, "~")),
+        {"trending_scores"},
+    )
+    yield (
+        "trending snapshot page (snapshot, span, type, rank)",
+        snapshot_entries_query(10, "7d", TrendingEntity.ALBUM, 11, 40),
+        {"trending_snapshot_entries"},
+    )
+    yield (
+        "listen chart summaries (scope, dimension, bucket range)",
+        select(ListenSketch).where(
+            ListenSketch.scope == str(USER_ID),
+            ListenSketch.dimension == "artist",
+            ListenSketch.bucket_start >= datetime.now(timezone.utc) - timedelta(days=30),
+        ),
+        {"listen_sketches"},
+    )
+    for column in ("genre", "decade", "country"):
+        value = {"genre": "genre 7", "decade": "1987s", "country": "country 11"}[column]
+        yield (
+            f"list_weeks nomination filter lower({column})",
+            select(Nomination.week_id).where(
+                func.lower(getattr(Nomination, column)) == value
+            ),
+            {"nominations"},
+        )
+
+
+def _seq_scans(plan: dict[str, Any]) -> Iterator[str]:
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name", "?")
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+def _is_guarded(relation: str, guarded: set[str]) -> bool:
+    # Partitions of listen_events are reported under their own names.
+    return any(relation == name or relation.startswith(f"{name}_") for name in guarded)
+
+
+def check_plans(conn: Connection, report: Callable[[str], None]) -> list[str]:
+    failures: list[str] = []
+    for name, stmt, guarded in _shapes():
+        sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+        root = (plan if isinstance(plan, list) else json.loads(plan))[0]["Plan"]
+        scans = sorted({rel for rel in _seq_scans(root) if _is_guarded(rel, guarded)})
+        status = "ok" if not scans else f"SEQ SCAN on {', '.join(scans)}"
+        report(f"{name}: {status} (cost {root['Total Cost']:.1f})")
+        if scans:
+            failures.append(name)
+    return failures
+
+
+# ----------------------------------------------------------------------------
+# CLI
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check route query plans for seq scans")
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL"),
+        help="PostgreSQL URL of a database migrated to head (default: $DATABASE_URL)",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiplier for the seeded row counts"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.database_url or not args.database_url.startswith("postgresql"):
+        print("a PostgreSQL --database-url is required", file=sys.stderr)
+        return 2
+
+    engine = create_engine(args.database_url)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            _seed(conn, args.scale)
+            failures = check_plans(conn, print)
+        finally:
+            transaction.rollback()
+
+    if failures:
+        print(f"{len(failures)} query shape(s) fell back to sequential scans", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual CLI
+    raise SystemExit(main())